@@ -0,0 +1,29 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+# Binary checkpoint of RASPA shared by the restart hooks. The hooks run outside the
+# reference-scripts environment, so reference-scripts/modules/simulation_status.py keeps its own
+# copy of these definitions: keep both in sync
+
+import os
+import struct
+
+# Binary checkpoint written by RASPA every WriteBinaryRestartFileEvery cycles when
+# ContinueAfterCrash is enabled, relative to the working directory. RASPA resumes from it
+# automatically, ignoring the rest of the input file
+CRASH_RESTART_FILE = os.path.join('CrashRestart', 'binary_restart.dat')
+
+# RASPA closes every section of the binary checkpoint with this value
+CRASH_RESTART_SENTINEL = struct.pack('d', 123456789.0)
+
+
+def valid_crash_restart(crash_restart_file):
+    """
+    Returns True if the binary checkpoint exists and was completely written.
+    """
+    try:
+        with open(crash_restart_file, 'rb') as f:
+            f.seek(-len(CRASH_RESTART_SENTINEL), os.SEEK_END)
+            return f.read() == CRASH_RESTART_SENTINEL
+    except OSError:
+        return False
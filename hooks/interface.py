@@ -5,6 +5,7 @@ import json
 import tarfile
 import typing
 
+import numpy
 import pandas
 
 
@@ -23,31 +24,112 @@ def get_input_ids(input_id_file: str) -> typing.List[str]:
     return materials.splitlines()
 
 
-def get_properties(property_name: str, property_output_file: str, input_id_file: str) -> pandas.DataFrame:
+def _numeric_columns(contents: dict) -> typing.Dict[str, numpy.ndarray]:
+    """Extracts the numeric values of an isotherm or diffusion record as arrays.
+       Args:
+          contents: The JSON record of a material.
+       Returns:
+          Returns the pressures (bar), loadings and uncertainties of an isotherm, with one row
+          per pressure and one column per component, or the loadings, mean diffusion
+          coefficients and their uncertainties of a diffusion record, with one value per
+          component. Missing values are NaN.
+    """
+    data = contents.get('data', [])
+
+    if any('adsorption' in element for element in data):
+        adsorptions = [element['adsorption'] for element in data]
+        return {'pressure': numpy.array([element['pressure'] for element in data], dtype=float),
+                'loading': numpy.array([[adsorption['value'] for adsorption in element]
+                                        for element in adsorptions], dtype=float),
+                'uncertainty': numpy.array([[adsorption['uncertainty'] for adsorption in element]
+                                            for element in adsorptions], dtype=float)}
+
+    element = data[0] if data else {}
+    loadings = element.get('loading', [])
+    coefficients = element.get('diffusion_coefficient_mean', [])
+    return {'loading': numpy.array([loading['value'] for loading in loadings], dtype=float),
+            'diffusion_coefficient': numpy.array([coefficient['value']
+                                                  for coefficient in coefficients], dtype=float),
+            'uncertainty': numpy.array([coefficient['uncertainty']
+                                        for coefficient in coefficients], dtype=float)}
+
+
+def _read_records(property_output_file: str,
+                  material_names: typing.Set[str],
+                  property_name: str) -> typing.Dict[str, dict]:
+    """Reads the records of the requested materials in a single sequential pass.
+       Args:
+          property_output_file: An aggregate tarball with MaterialName-$PropertyName.json
+            members (any compression), or the consolidated JSON lines file written next to it.
+          material_names: Names of the materials to read.
+          property_name: The value of interface.propertiesSpec.name.
+       Returns:
+          Returns a dict with the parsed JSON of every material found, keyed by material name.
+    """
+    records = {}
+
+    if property_output_file.endswith('.jsonl'):
+        with open(property_output_file, 'r') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['material'] in material_names:
+                    records[record['material']] = record['property']
+        return records
+
+    # Members are read in archive order, so that compressed streams are never rewound
+    suffix = f'-{property_name}.json'
+    with tarfile.open(property_output_file, 'r:*') as tar:
+        for member in tar:
+            member_name = member.name.split('/')[-1]
+            if member.isfile() and member_name.endswith(suffix):
+                material_name = member_name[:-len(suffix)]
+                if material_name in material_names:
+                    records[material_name] = json.load(tar.extractfile(member))
+
+    return records
+
+
+def get_properties(property_name: str,
+                   property_output_file: str,
+                   input_id_file: str,
+                   numeric_columns: bool = False) -> pandas.DataFrame:
     """This hook discovers the values of a property for all measured input ids.
        Args:
           property_output_file: A file path. The value of interface.propertiesSpec.name.source.output
             for the given property name (see next field)
           property_name: The value of interface.propertiesSpec.name.
           input_id_file: A file path. The path to the input id file.
+          numeric_columns: Adds the pressure, loading, uncertainty (and diffusion_coefficient)
+            arrays of every record as extra columns.
        Returns:
           Returns a DataFrame with two columns (input-id, $PropertyName). Each row correspond to an input.
+          Inputs without a record in property_output_file keep their row, with a None
+          property (and NaN numeric columns), and are reported.
     """
 
-    file = tarfile.open(property_output_file)
-    file.extractall()
-    file.close()
+    materials = get_input_ids(input_id_file)
 
-    with open(input_id_file, "r+") as cifs:
-        materials = cifs.read()
+    # The archive is read in memory, nothing is extracted to the working directory
+    records = _read_records(property_output_file,
+                            {material.split("/")[1] for material in materials},
+                            property_name)
+
+    rows = []
+    missing = []
+    for material in materials:
+        contents = records.get(material.split("/")[1])
+        row = {'input-id': material, property_name: contents}
+        if contents is None:
+            missing.append(material)
+        elif numeric_columns:
+            row.update(_numeric_columns(contents))
+        rows.append(row)
+
+    if missing:
+        print(f'Warning! No {property_name} record in {property_output_file} for '
+              f'{len(missing)} of {len(materials)} inputs: {", ".join(missing)}')
 
-    result = pandas.DataFrame()
-    for material in materials.splitlines():
-        material_name = material.split("/")[1]
-        with open(f'{material_name}-{property_name}.json', 'r') as j:
-            contents = json.loads(j.read())
-        concat_result = pandas.DataFrame([[material, contents]],
-                                         columns=['input-id', property_name])
-        result = pandas.concat([result, concat_result], ignore_index=True)
+    if not rows:
+        return pandas.DataFrame(columns=['input-id', property_name])
 
-    return result
+    return pandas.DataFrame(rows)
@@ -1,8 +1,61 @@
 # SPDX-License-Identifier: Apache2.0
 # © Copyright IBM Corp. 2023 All Rights Reserved
 
+import glob
+import json
 import os
 import shutil
+import sys
+
+try:
+    from .crash_restart import CRASH_RESTART_FILE, valid_crash_restart
+except ImportError:
+    # Hook loaded from its file outside the hooks package
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from crash_restart import CRASH_RESTART_FILE, valid_crash_restart
+
+# Text restart files with the molecule positions, and the folder RASPA reads them from when the
+# input has RestartFile yes
+RESTART_FOLDER = os.path.join('Restart', 'System_0')
+RESTART_INITIAL_FOLDER = os.path.join('RestartInitial', 'System_0')
+
+SIMULATION_FOLDERS = ['Restart', 'Output', 'CrashRestart', 'MSDOrderN', 'Movies', 'VTK']
+
+# Status written by check_molecular_dynamics.py, see reference-scripts/modules/simulation_status.py
+STATUS_FILE = 'simulation_status.json'
+
+
+def valid_restart_files(restart_folder):
+    """
+    Returns the text restart files of a folder, or an empty list if any of them is truncated.
+    """
+    restart_files = glob.glob(os.path.join(restart_folder, 'restart_*'))
+    for restart_file in restart_files:
+        with open(restart_file, 'rb') as f:
+            content = f.read()
+        if b'Components:' not in content or not content.endswith(b'\n'):
+            return []
+
+    return restart_files
+
+
+def nan_found(status_file):
+    """
+    Returns True if the status of the last run reports NaN values.
+    """
+    try:
+        with open(status_file) as f:
+            return bool(json.load(f).get('nan_found', False))
+    except (OSError, ValueError):
+        return False
+
+
+def remove_folders(workingDirectory, folders):
+    """
+    Remove simulation folders of the working directory, ignoring the missing ones.
+    """
+    for folder in folders:
+        shutil.rmtree(os.path.join(workingDirectory, folder), ignore_errors=True)
 
 
 def Restart(workingDirectory, restarts, componentName, log, exitReason, exitCode):
@@ -31,11 +84,37 @@ def Restart(workingDirectory, restarts, componentName, log, exitReason, exitCode
     decision
     """
 
-    shutil.rmtree(os.path.join(workingDirectory, 'Restart'))
-    shutil.rmtree(os.path.join(workingDirectory, 'Output'))
-    shutil.rmtree(os.path.join(workingDirectory, 'CrashRestart'))
-    shutil.rmtree(os.path.join(workingDirectory, 'MSDOrderN'))
-    shutil.rmtree(os.path.join(workingDirectory, 'Movies'))
-    shutil.rmtree(os.path.join(workingDirectory, 'VTK'))
+    # check_molecular_dynamics.py failed on NaN values or an unfinished run. The checkpoint and
+    # the positions hold the failed state, so start a fresh run
+    status_file = os.path.join(workingDirectory, STATUS_FILE)
+    if exitReason == 'KnownIssue' or nan_found(status_file):
+        log.info(f'{componentName}: simulation failed, restarting from scratch '
+                 f'(restart {restarts})')
+        remove_folders(workingDirectory, SIMULATION_FOLDERS + ['RestartInitial'])
+        if os.path.exists(status_file):
+            os.remove(status_file)
+        return 'RestartContextRestartPossible'
+
+    # Resume from the binary checkpoint, keeping the output and MSD accumulators
+    if valid_crash_restart(os.path.join(workingDirectory, CRASH_RESTART_FILE)):
+        log.info(f'{componentName}: resuming from {CRASH_RESTART_FILE} (restart {restarts})')
+        return 'RestartContextRestartPossible'
+
+    # Otherwise start again from the last molecule positions. molecular_dynamics.py sets
+    # RestartFile yes when RESTART_INITIAL_FOLDER is present
+    restart_files = valid_restart_files(os.path.join(workingDirectory, RESTART_FOLDER))
+    if restart_files:
+        restart_initial_folder = os.path.join(workingDirectory, RESTART_INITIAL_FOLDER)
+        shutil.rmtree(restart_initial_folder, ignore_errors=True)
+        os.makedirs(restart_initial_folder)
+        for restart_file in restart_files:
+            shutil.copy(restart_file, restart_initial_folder)
+        log.info(f'{componentName}: binary checkpoint missing or corrupt, restarting from the '
+                 f'positions in {RESTART_FOLDER} (restart {restarts})')
+    else:
+        log.info(f'{componentName}: no valid checkpoint, restarting from scratch '
+                 f'(restart {restarts})')
+
+    remove_folders(workingDirectory, SIMULATION_FOLDERS)
 
     return 'RestartContextRestartPossible'
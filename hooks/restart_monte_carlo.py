@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import glob
+import os
+import shutil
+import sys
+
+try:
+    from .crash_restart import CRASH_RESTART_FILE, valid_crash_restart
+except ImportError:
+    # Hook loaded from its file outside the hooks package
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from crash_restart import CRASH_RESTART_FILE, valid_crash_restart
+
+OUTPUT_FOLDER = os.path.join('Output', 'System_0')
+
+
+def Restart(workingDirectory, restarts, componentName, log, exitReason, exitCode):
+    """
+    This function is expected to examine the components workingDirectory, optionally make \
+    modifications to it, and return a restart decision.
+
+    Parameters
+    ----------
+    workingDirectory: str
+        Directory containing simulation to be restarted
+    restarts: int
+        The number of times this function has been called for this component
+    componentName: str
+        The label the workflow engine uses to id this component
+    log: logging.Logger
+        A logger used to write output messages
+    exitReason: str
+        Defines why the program exited
+    exitCode: int
+        The exit-code returned by the program
+
+    Returns
+    -------
+    string: One of the strings defined by experiment.codes.restartContexts that capture the hooks \
+    decision
+    """
+
+    # The output of every pressure is kept. monte_carlo.py writes the input file for the pressures
+    # without a complete output, and resumes the interrupted one from the binary checkpoint
+    outputs = glob.glob(os.path.join(workingDirectory, OUTPUT_FOLDER, 'output_*.data'))
+    log.info(f'{componentName}: keeping {len(outputs)} pressure outputs (restart {restarts})')
+
+    crash_restart_file = os.path.join(workingDirectory, CRASH_RESTART_FILE)
+    if os.path.exists(crash_restart_file) and not valid_crash_restart(crash_restart_file):
+        log.info(f'{componentName}: removing corrupt {CRASH_RESTART_FILE}')
+        shutil.rmtree(os.path.dirname(crash_restart_file), ignore_errors=True)
+
+    return 'RestartContextRestartPossible'
@@ -4,9 +4,8 @@
 # © Copyright IBM Corp. 2022 All Rights Reserved
 
 import argparse
-import os
-import shutil
-import tarfile
+
+from modules.aggregate import COMPRESSION_MODES, CONSOLIDATED_EXTENSION, aggregate_json
 
 # Required parameters
 parser = argparse.ArgumentParser(description='Aggregating Diffusion Coefficients output to' +
@@ -25,18 +24,35 @@ parser.add_argument('--OutputFolders',
                     nargs='+',
                     metavar='OUTPUT_FOLDERS',
                     help='Directory for storing JSON output files.')
+
+# Optional parameters
+parser.add_argument('--Compression',
+                    type=str,
+                    default='bgz',
+                    action='store',
+                    required=False,
+                    metavar='COMPRESSION',
+                    choices=list(COMPRESSION_MODES),
+                    help='Compression codec of diffusion.tgz: none, gz, bz2, xz, or bgz (gzip '
+                         'blocks per material, indexed for random access).')
+parser.add_argument('--Consolidated',
+                    type=str,
+                    default=f'diffusion{CONSOLIDATED_EXTENSION}',
+                    action='store',
+                    required=False,
+                    metavar='CONSOLIDATED',
+                    help='JSON lines file with the diffusion of all materials, one per line.')
 arg = parser.parse_args()
 
 print(f'Aggregating Diffusion Coefficients json files from {0}, {1}'.format(arg.FrameworkName,
                                                                             arg.OutputFolders))
 
-# Copy diffusion.json from all given Output Folders to AggregateDiffusionCoefficients folder
-for i in range(len(arg.OutputFolders)):
-    src = os.path.join(arg.OutputFolders[i], 'diffusion.json')
-    shutil.copyfile(src, f'{arg.FrameworkName[i]}-diffusion.json')
-
-# Compress to create isotherms.tgz
-with tarfile.open('diffusion.tgz', 'w') as tar:
-    for file in os.listdir():
-        if file.endswith('.json'):
-            tar.add(file)
+# Stream diffusion.json from all given Output Folders into diffusion.tgz
+n_materials = aggregate_json(arg.FrameworkName,
+                             arg.OutputFolders,
+                             'diffusion.json',
+                             '-diffusion.json',
+                             'diffusion.tgz',
+                             compression=arg.Compression,
+                             consolidated_filename=arg.Consolidated)
+print(f'Aggregated {n_materials} materials into diffusion.tgz and {arg.Consolidated}')
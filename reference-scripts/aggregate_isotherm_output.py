@@ -4,9 +4,8 @@
 # © Copyright IBM Corp. 2022 All Rights Reserved
 
 import argparse
-import os
-import shutil
-import tarfile
+
+from modules.aggregate import COMPRESSION_MODES, CONSOLIDATED_EXTENSION, aggregate_json
 
 # Required parameters
 parser = argparse.ArgumentParser(description='Aggregating isotherm output to compressed file' +
@@ -25,17 +24,34 @@ parser.add_argument('--OutputFolders',
                     nargs='+',
                     metavar='OUTPUT_FOLDERS',
                     help='Directory for storing JSON output files.')
+
+# Optional parameters
+parser.add_argument('--Compression',
+                    type=str,
+                    default='bgz',
+                    action='store',
+                    required=False,
+                    metavar='COMPRESSION',
+                    choices=list(COMPRESSION_MODES),
+                    help='Compression codec of isotherms.tgz: none, gz, bz2, xz, or bgz (gzip '
+                         'blocks per material, indexed for random access).')
+parser.add_argument('--Consolidated',
+                    type=str,
+                    default=f'isotherms{CONSOLIDATED_EXTENSION}',
+                    action='store',
+                    required=False,
+                    metavar='CONSOLIDATED',
+                    help='JSON lines file with the isotherm of all materials, one per line.')
 arg = parser.parse_args()
 
 print(f'Aggregating isotherm output json files from {arg.FrameworkName}, {arg.OutputFolders}.')
 
-# Copy isothermProperties.json from all given Output Folders to AggregateIsotherms folder
-for i in range(len(arg.OutputFolders)):
-    src = os.path.join(arg.OutputFolders[i], 'isotherm.json')
-    shutil.copyfile(src, f'{arg.FrameworkName[i]}-isotherm.json')
-
-# Compress to create isotherms.tgz
-with tarfile.open('isotherms.tgz', 'w') as tar:
-    for file in os.listdir():
-        if file.endswith('.json'):
-            tar.add(file)
+# Stream isotherm.json from all given Output Folders into isotherms.tgz
+n_materials = aggregate_json(arg.FrameworkName,
+                             arg.OutputFolders,
+                             'isotherm.json',
+                             '-isotherm.json',
+                             'isotherms.tgz',
+                             compression=arg.Compression,
+                             consolidated_filename=arg.Consolidated)
+print(f'Aggregated {n_materials} materials into isotherms.tgz and {arg.Consolidated}')
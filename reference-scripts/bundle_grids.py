@@ -0,0 +1,48 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+
+from modules.grid_bundle import write_bundle
+from modules.grid_cache import default_grid_folder
+
+# Required parameters
+parser = argparse.ArgumentParser(description='Pack the energy grids of a framework into a grid '
+                                             'bundle with a manifest.')
+parser.add_argument('bundle',
+                    type=str,
+                    action='store',
+                    metavar='BUNDLE',
+                    help='Grid bundle to write, e.g. grids.tar.')
+parser.add_argument('--FrameworkName',
+                    type=str,
+                    required=True,
+                    action='store',
+                    metavar='FRAMEWORK_NAME',
+                    help='Name of the CIF file describing the nanoporous material structure.')
+
+# Optional parameters
+parser.add_argument('--GridFolder',
+                    type=str,
+                    default=default_grid_folder(),
+                    action='store',
+                    required=False,
+                    metavar='GRID_FOLDER',
+                    help='Folder where RASPA writes the grids of the Local force field.')
+parser.add_argument('--CompressLevel',
+                    type=int,
+                    default=1,
+                    action='store',
+                    required=False,
+                    metavar='COMPRESS_LEVEL',
+                    choices=range(0, 10),
+                    help='gzip compression level of every grid, from 0 to 9.')
+arg = parser.parse_args()
+
+number_of_grids = write_bundle(arg.bundle,
+                               arg.FrameworkName,
+                               arg.GridFolder,
+                               compresslevel=arg.CompressLevel)
+print(f'Packed {number_of_grids} grids of {arg.FrameworkName} into {arg.bundle}')
@@ -3,41 +3,44 @@
 # SPDX-License-Identifier: Apache2.0
 # © Copyright IBM Corp. 2023 All Rights Reserved
 
+import argparse
 import glob
 import os
 import sys
 
-PROPERTY_NAN_SEARCH = 'Conserved energy'
-
-raspa_out_file = glob.glob(os.path.join('Output', 'System_0', 'output_*_0.data'))[0]
-
-with open(raspa_out_file, 'r') as f:
-    raspa_string = f.read()
-
-raspa_out = raspa_string.split('\n')
-
-# Find the last block on RASPA output
-n = [i for i, line in enumerate(raspa_out) if '=' in line][-1]
-last_block = raspa_out[n:]
-
-# Check if the simulation finished without warnings
-warnings = [line for line in last_block if 'WARNING' in line]
-
-# Check if the simulation finished without errors
-errors = [line for line in last_block if 'ERROR' in line]
-
-# Check if the simulation finished successfully
-success_finished = any(['Simulation finished' in line for line in last_block])
-
-# Check if the simulation produced nan values
-conserved_energy_lines = [line for line in raspa_out if PROPERTY_NAN_SEARCH in line]
-nan_found = any(['nan' in line for line in conserved_energy_lines])
-
-if nan_found:
-    errors.append('NaN values found.')
-
-if not success_finished or nan_found:
+from modules.simulation_status import STATUS_FILENAME, check_simulation, write_status
+
+# Optional parameters
+parser = argparse.ArgumentParser(description='Check the output of a RASPA simulation.')
+parser.add_argument('--OutputFile',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='OUTPUT_FILE',
+                    help='RASPA output file. Defaults to Output/System_0/output_*_0.data.')
+parser.add_argument('--Status',
+                    type=str,
+                    default=STATUS_FILENAME,
+                    action='store',
+                    required=False,
+                    metavar='STATUS',
+                    help='JSON file where the status of the simulation is written.')
+arg = parser.parse_args()
+
+if arg.OutputFile is None:
+    arg.OutputFile = glob.glob(os.path.join('Output', 'System_0', 'output_*_0.data'))[0]
+
+status = check_simulation(arg.OutputFile)
+write_status(arg.Status, status)
+
+warnings = status['warnings']
+errors = status['errors']
+
+if not status['success']:
     ErrorMessage = 'Simulation failed!\n' + '\n'.join(errors)
+    if status['nan_found']:
+        ErrorMessage += f"\nFirst NaN value after cycle {status['first_nan_cycle']}."
     sys.exit(ErrorMessage)
 
 if len(warnings) > 0:
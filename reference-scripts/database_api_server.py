@@ -0,0 +1,99 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+
+from modules.stand_in_api import DatabaseStore, make_server
+
+# Optional parameters
+parser = argparse.ArgumentParser(description='Run a local stand-in of the database-api, to test '
+                                             'and benchmark the write stages offline.')
+parser.add_argument('--Host',
+                    type=str,
+                    default='127.0.0.1',
+                    action='store',
+                    required=False,
+                    metavar='HOST',
+                    help='Address to listen on.')
+parser.add_argument('--Port',
+                    type=int,
+                    default=8080,
+                    action='store',
+                    required=False,
+                    metavar='PORT',
+                    help='Port to listen on.')
+parser.add_argument('--Store',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='STORE',
+                    help='JSON lines file where the materials and properties are persisted. '
+                         'Kept in memory by default.')
+parser.add_argument('--CifFiles',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='CIF_FILES',
+                    help='cif_files.dat with Source/Name lines of the materials to create.')
+parser.add_argument('--NoAutoCreate',
+                    default=False,
+                    action='store_true',
+                    required=False,
+                    help='Do not create unknown materials when they are looked up.')
+parser.add_argument('--Latency',
+                    type=float,
+                    default=0.0,
+                    action='store',
+                    required=False,
+                    metavar='LATENCY',
+                    help='Latency added to every request in seconds.')
+parser.add_argument('--LatencyJitter',
+                    type=float,
+                    default=0.0,
+                    action='store',
+                    required=False,
+                    metavar='LATENCY_JITTER',
+                    help='Maximum random latency added on top of LATENCY in seconds.')
+parser.add_argument('--ErrorRate',
+                    type=float,
+                    default=0.0,
+                    action='store',
+                    required=False,
+                    metavar='ERROR_RATE',
+                    help='Fraction of requests answered with an HTTP 503 error.')
+parser.add_argument('--Verbose',
+                    default=False,
+                    action='store_true',
+                    required=False,
+                    help='Log every request.')
+arg = parser.parse_args()
+
+store = DatabaseStore(arg.Store, auto_create=not arg.NoAutoCreate)
+
+if arg.CifFiles is not None:
+    with open(arg.CifFiles, 'r') as f:
+        for line in f:
+            if '/' in line:
+                source, name = line.strip().split('/', 1)
+                store.add_material(name, source)
+
+server = make_server(store,
+                     host=arg.Host,
+                     port=arg.Port,
+                     latency=arg.Latency,
+                     latency_jitter=arg.LatencyJitter,
+                     error_rate=arg.ErrorRate,
+                     verbose=arg.Verbose)
+
+print(f'Serving the stand-in database-api on http://{arg.Host}:{server.server_port} '
+      f'with {len(store.materials)} materials and {store.count_properties()} properties')
+print(f'Use DATABASE_API_URL=http://{arg.Host}:{server.server_port} in the write stages')
+
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    server.server_close()
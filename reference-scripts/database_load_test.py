@@ -0,0 +1,171 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from modules.bulk_upload import upload_records
+from modules.database_api_calls import tDependentProp
+from modules.stand_in_api import DatabaseStore, make_server
+
+# Optional parameters
+parser = argparse.ArgumentParser(description='Measure the write throughput and latency of the '
+                                             'database write stages against a database-api.')
+parser.add_argument('--Mode',
+                    type=str,
+                    default='script',
+                    action='store',
+                    required=False,
+                    metavar='MODE',
+                    choices=['script', 'bulk'],
+                    help='script runs one write_diffusion_to_database.py process per record, '
+                         'bulk uploads all records with the pooled concurrent uploader.')
+parser.add_argument('--Records',
+                    type=int,
+                    default=100,
+                    action='store',
+                    required=False,
+                    metavar='RECORDS',
+                    help='Number of synthetic diffusion records to write.')
+parser.add_argument('--Concurrency',
+                    type=int,
+                    default=4,
+                    action='store',
+                    required=False,
+                    metavar='CONCURRENCY',
+                    help='Number of concurrent write processes or requests.')
+parser.add_argument('--URL',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='URL',
+                    help='Base URL of the database-api. An in-process stand-in server is started '
+                         'by default.')
+parser.add_argument('--Latency',
+                    type=float,
+                    default=0.02,
+                    action='store',
+                    required=False,
+                    metavar='LATENCY',
+                    help='Latency of every request of the stand-in server in seconds.')
+parser.add_argument('--LatencyJitter',
+                    type=float,
+                    default=0.0,
+                    action='store',
+                    required=False,
+                    metavar='LATENCY_JITTER',
+                    help='Maximum random latency added on top of LATENCY in seconds.')
+parser.add_argument('--ErrorRate',
+                    type=float,
+                    default=0.0,
+                    action='store',
+                    required=False,
+                    metavar='ERROR_RATE',
+                    help='Fraction of requests of the stand-in server answered with HTTP 503.')
+parser.add_argument('--Backoff',
+                    type=float,
+                    default=0.1,
+                    action='store',
+                    required=False,
+                    metavar='BACKOFF',
+                    help='Delay before the first retry of the bulk uploader in seconds.')
+arg = parser.parse_args()
+
+
+def synthetic_record(i: int) -> dict:
+    """
+    Returns a diffusion.json-like record of the i-th fictitious material, with its own provenance
+    and values so that every record has a distinct content and idempotency key.
+    """
+    return {'name': 'CO2_N2_diffusion',
+            'provenance': f'load-test {i}',
+            'temperature': 300.0,
+            'composition': [{'molecule': 'CO2', 'fraction': 0.5},
+                            {'molecule': 'N2', 'fraction': 0.5}],
+            'data': [{'pressure': float(pressure),
+                      'diffusion_coefficient_mean': [{'value': (1 + i) * 1e-12 * pressure}]}
+                     for pressure in [1e3, 1e4, 1e5]]}
+
+
+# Start the stand-in server
+server = None
+url = arg.URL
+if url is None:
+    server = make_server(DatabaseStore(),
+                         port=0,
+                         latency=arg.Latency,
+                         latency_jitter=arg.LatencyJitter,
+                         error_rate=arg.ErrorRate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}'
+    print(f'Stand-in database-api on {url}, latency {arg.Latency} s, error rate {arg.ErrorRate}')
+
+records = [(f'LOADTEST_{i:06d}', synthetic_record(i)) for i in range(arg.Records)]
+
+start = time.monotonic()
+if arg.Mode == 'script':
+    write_script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'write_diffusion_to_database.py')
+    environment = dict(os.environ, DATABASE_API_URL=url)
+
+    with tempfile.TemporaryDirectory() as work_folder:
+
+        def run_write_script(material_name: str, record: dict) -> dict:
+            output_folder = os.path.join(work_folder, material_name)
+            os.makedirs(output_folder)
+            with open(os.path.join(output_folder, 'diffusion.json'), 'w') as f:
+                json.dump(record, f)
+
+            record_start = time.monotonic()
+            process = subprocess.run([sys.executable, '-B', write_script, output_folder,
+                                      '--FrameworkName', material_name,
+                                      '--FrameworkSource', 'local'],
+                                     env=environment,
+                                     capture_output=True,
+                                     text=True)
+            elapsed = time.monotonic() - record_start
+
+            # The write stage exits with an error while its record is pending or rejected
+            status = 'sent' if process.returncode == 0 else 'failed'
+
+            return {'status': status, 'elapsed': elapsed}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=arg.Concurrency) as executor:
+            statuses = list(executor.map(run_write_script, *zip(*records)))
+
+elif arg.Mode == 'bulk':
+    os.environ['DATABASE_API_URL'] = url
+    statuses = upload_records([(material_name, 'local', tDependentProp(**record))
+                               for material_name, record in records],
+                              concurrency=arg.Concurrency,
+                              backoff=arg.Backoff)
+elapsed = time.monotonic() - start
+
+# Summary of the load test
+latencies = np.array([status['elapsed'] for status in statuses])
+counts = {}
+for status in statuses:
+    counts[status['status']] = counts.get(status['status'], 0) + 1
+
+print(f'Mode: {arg.Mode}, records: {len(statuses)}, concurrency: {arg.Concurrency}')
+print(f'Statuses: {counts}')
+print(f'Throughput: {len(statuses) / max(elapsed, 1e-9):.1f} records/s in {elapsed:.2f} s')
+print('Latency (s): ' + ', '.join(f'p{q} {np.percentile(latencies, q):.3f}'
+                                  for q in [50, 90, 95, 99])
+      + f', max {latencies.max():.3f}')
+
+if server is not None:
+    print(f'Properties stored by the stand-in server: {server.store.count_properties()}')
+    server.shutdown()
@@ -10,7 +10,11 @@ import os
 
 import numpy as np
 import pandas as pd
-import pymser
+
+from modules.equilibration import (EQUILIBRATE_BATCH_SIZE, average_observable, equilibrate_block,
+                                   equilibrate_observable)
+from modules.parallel import starmap
+from modules.timeseries import TIMESERIES_FILENAME, load_timeseries, read_header
 
 # Required parameters
 parser = argparse.ArgumentParser(description='Parse output of RASPA simulation.')
@@ -60,7 +64,7 @@ parser.add_argument('--EquilibrationRule',
                     help='Select between global or individual equilibration for each component.')
 parser.add_argument('--BatchSize',
                     type=int,
-                    default=5,
+                    default=EQUILIBRATE_BATCH_SIZE,
                     action='store',
                     required=False,
                     metavar='BATCH_SIZE',
@@ -75,65 +79,114 @@ parser.add_argument('--PrintResults',
                     required=False,
                     action='store_true',
                     help='Print the results of MSER and ADF test.')
+parser.add_argument('--MSEREngine',
+                    type=str,
+                    default='vectorized',
+                    action='store',
+                    required=False,
+                    metavar='MSER_ENGINE',
+                    choices=['vectorized', 'pymser'],
+                    help='Select between the vectorized MSER of all observables or pymser.')
+parser.add_argument('--Autocorrelation',
+                    type=str,
+                    default='pymser',
+                    action='store',
+                    required=False,
+                    metavar='AUTOCORRELATION',
+                    choices=['pymser', 'integrated'],
+                    help='Autocorrelation time of the vectorized MSER engine: the exponential fit '
+                         'half-life of pymser, or the integrated time from FFT, about twice as '
+                         'long.')
+parser.add_argument('--Workers',
+                    type=int,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='WORKERS',
+                    help='Number of parallel processes. Defaults to the CPUs available.')
 arg = parser.parse_args()
 
 # Manipulate ExternalPressure string
 externalPressures = list(map(float, arg.ExternalPressure.split(',')))
 
-# Iterate over the parsed raspa files on output folder
+# Read the time series file written by ParseOutput if present, otherwise the CSV files
+timeseries_filename = os.path.join(arg.output_folder, TIMESERIES_FILENAME)
+if os.path.exists(timeseries_filename):
+    header = read_header(timeseries_filename)
+else:
+    header = None
+
+# Read the parsed raspa files of all pressures
+datasets = {}
 for pressure in externalPressures:
 
-    # Reads the parsed result with pandas
-    csv_filename = f'raspa_{arg.ExternalTemperature:.6f}_{pressure:.0f}.csv'
-    data = pd.read_csv(os.path.join(arg.output_folder, csv_filename),
-                       sep=',\t',
-                       index_col=0,
-                       engine='python',
-                       usecols=lambda x: x != 'step')
-    NCycles = len(data)
+    if header is not None:
+        # Memory-map the columns of the given pressure
+        columns = load_timeseries(timeseries_filename, pressure, header=header)
+        NCycles = len(columns['cycle'])
+        data = {key: value for key, value in columns.items() if key not in ['cycle', 'step']}
+
+    else:
+        # Reads the parsed result with pandas
+        csv_filename = f'raspa_{arg.ExternalTemperature:.6f}_{pressure:.0f}.csv'
+        dataframe = pd.read_csv(os.path.join(arg.output_folder, csv_filename),
+                                sep=',\t',
+                                index_col=0,
+                                engine='python',
+                                usecols=lambda x: x != 'step')
+        NCycles = len(dataframe)
+        data = {key: dataframe[key].to_numpy() for key in dataframe.keys()}
+
+    datasets[pressure] = (NCycles, data)
+
+# List all (pressure, observable) pairs
+pairs_list = [(pressure, key) for pressure in externalPressures for key in datasets[pressure][1]]
+
+# Apply the vectorized MSER to all observables of each pressure at once
+if arg.MSEREngine == 'vectorized':
+    tasks = [(np.column_stack(list(datasets[pressure][1].values())),
+              list(datasets[pressure][1]).index('N_ads')
+              if arg.EquilibrationRule == 'global' else None,
+              arg.LLM,
+              arg.BatchSize,
+              arg.Uncertainty,
+              arg.PrintResults,
+              arg.Autocorrelation) for pressure in externalPressures]
+    results_list = [result for results_block in starmap(equilibrate_block, tasks, arg.Workers)
+                    for result in results_block]
+
+# If EquilibrationRule is 'global' only analyse the total number of molecules 'N_ads'
+elif arg.EquilibrationRule == 'global':
+    # Apply the MSER to get the index of the start of equilibrated data of each pressure
+    tasks = [(datasets[pressure][1]['N_ads'],
+              arg.LLM,
+              arg.BatchSize,
+              arg.Uncertainty,
+              arg.PrintResults) for pressure in externalPressures]
+    results_global = dict(zip(externalPressures,
+                              starmap(equilibrate_observable, tasks, arg.Workers)))
+
+    # Calculate the averages of every observable from the global start of equilibrated data
+    tasks = [(datasets[pressure][1][key],
+              results_global[pressure]['t0'],
+              arg.Uncertainty) for pressure, key in pairs_list]
+    results_list = starmap(average_observable, tasks, arg.Workers)
+
+# If EquilibrationRule is 'individual' apply MSER to each gas component individually
+elif arg.EquilibrationRule == 'individual':
+    tasks = [(datasets[pressure][1][key],
+              arg.LLM,
+              arg.BatchSize,
+              arg.Uncertainty,
+              arg.PrintResults) for pressure, key in pairs_list]
+    results_list = starmap(equilibrate_observable, tasks, arg.Workers)
+
+# Iterate over the results of each pressure
+for pressure in externalPressures:
+    NCycles = datasets[pressure][0]
 
     # Dictionary containg the results
-    results = {}
-
-    # If EquilibrationRule is 'global' only analyse the total number of molecules 'N_ads'
-    if arg.EquilibrationRule == 'global':
-        # Apply the MSER to get the index of the start of equilibrated data
-        results_global = pymser.equilibrate(input_data=data['N_ads'].to_numpy(),
-                                            LLM=arg.LLM,
-                                            batch_size=arg.BatchSize,
-                                            ADF_test=True,
-                                            uncertainty=arg.Uncertainty,
-                                            print_results=arg.PrintResults)
-
-        for key in data.keys():
-            # Calculate autocorrelation time and the number of uncorrelated samples
-            equilibrated = data[key][results_global['t0']:]
-            ac_time, uncorr_samples = pymser.calc_autocorrelation_time(equilibrated)
-
-            # Get the equilibrated averages and standard deviation
-            average, uncertainty = pymser.calc_equilibrated_average(data=data[key].to_numpy(),
-                                                                    eq_index=results_global['t0'],
-                                                                    uncertainty=arg.Uncertainty,
-                                                                    ac_time=ac_time)
-
-            # Adds the results on the resuts dictionary to output file
-            results[key] = {'average': average,
-                            'uncertainty': uncertainty,
-                            't0': results_global['t0'],
-                            'ac_time': ac_time,
-                            'uncorrelated_samples': uncorr_samples}
-
-    # If EquilibrationRule is 'individual' apply MSER to each gas component individually
-    if arg.EquilibrationRule == 'individual':
-
-        for key in data.keys():
-            # Apply the MSER to get the index of the start of equilibrated data
-            results[key] = pymser.equilibrate(input_data=data[key].to_numpy(),
-                                              LLM=arg.LLM,
-                                              batch_size=arg.BatchSize,
-                                              ADF_test=True,
-                                              uncertainty=arg.Uncertainty,
-                                              print_results=arg.PrintResults)
+    results = {key: result for (p, key), result in zip(pairs_list, results_list) if p == pressure}
 
     # Calculate selectivity for multi-component adsorbate gas
     if len(arg.FlueGasComposition) > 1:
@@ -15,8 +15,11 @@ do
     esac
 done
 
-echo -e "\nDecompressing RASPA CSV files..."
-tar --no-overwrite-dir -xvzf raspa_csv.tgz -C ${OutputFolder}
+# Only decompress CSV files if there is no time series file from ParseOutput
+if [[ ! -f ${OutputFolder}/raspa_timeseries.bin ]]; then
+    echo -e "\nDecompressing RASPA CSV files..."
+    tar --no-overwrite-dir -xvzf raspa_csv.tgz -C ${OutputFolder}
+fi
 
 echo -e "\nApply MSER to determine the start of equilibrated data..."
 equilibrate.py --ExternalPressure ${ExternalPressure} \
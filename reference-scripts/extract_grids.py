@@ -0,0 +1,85 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+import json
+import os
+
+from modules.calculate_properties import calculate_grid
+from modules.grid_bundle import extract_grids, read_manifest, select_grids
+from modules.grid_cache import default_grid_folder
+
+# Required parameters
+parser = argparse.ArgumentParser(description='Extract the energy grids needed by a simulation '
+                                             'from a grid bundle.')
+parser.add_argument('bundle',
+                    type=str,
+                    action='store',
+                    metavar='BUNDLE',
+                    help='Grid bundle written by bundle_grids.py, e.g. grids.tar.')
+parser.add_argument('--FrameworkName',
+                    type=str,
+                    required=True,
+                    action='store',
+                    metavar='FRAMEWORK_NAME',
+                    help='Name of the CIF file describing the nanoporous material structure.')
+
+# Optional parameters
+parser.add_argument('--FlueGasComposition',
+                    action='store',
+                    required=False,
+                    type=json.loads,
+                    default={'CO2': 1.0},
+                    metavar='FLUE_GAS_COMPOSITION',
+                    help='Dictionary containing flue gas component names and fractions.')
+parser.add_argument('--SpacingVDWGrid',
+                    type=float,
+                    default=0.1,
+                    action='store',
+                    required=False,
+                    metavar='SPACING_VDW_GRID',
+                    help='The grid spacing of the Van der Waals potentials [Angstrom].')
+parser.add_argument('--SpacingCoulombGrid',
+                    type=float,
+                    default=0.1,
+                    action='store',
+                    required=False,
+                    metavar='SPACING_COULOMB_GRID',
+                    help='The grid spacing of the Coulomb potential [Angstrom].')
+parser.add_argument('--GridFolder',
+                    type=str,
+                    default=default_grid_folder(),
+                    action='store',
+                    required=False,
+                    metavar='GRID_FOLDER',
+                    help='Folder where RASPA reads the grids of the Local force field.')
+parser.add_argument('--SharedFolder',
+                    type=str,
+                    default=os.getenv('GRID_SHARED_DIR') or None,
+                    action='store',
+                    required=False,
+                    metavar='SHARED_FOLDER',
+                    help='Folder shared by several jobs where the grids are extracted once and '
+                         'linked from GRID_FOLDER. Defaults to $GRID_SHARED_DIR. The grids are '
+                         'extracted into GRID_FOLDER when unset or empty.')
+arg = parser.parse_args()
+
+# Calculate grid types
+grid_types, _ = calculate_grid(arg.FlueGasComposition)
+
+manifest = read_manifest(arg.bundle)
+grids = select_grids(manifest, grid_types.split(), arg.SpacingVDWGrid, arg.SpacingCoulombGrid)
+
+missing = set(grid_types.split()) - {grid['type'] for grid in grids}
+if missing:
+    print(f'Warning! {arg.bundle} has no grids for {sorted(missing)}.')
+
+number_of_extracted = extract_grids(arg.bundle,
+                                    grids,
+                                    arg.FrameworkName,
+                                    arg.GridFolder,
+                                    shared_folder=arg.SharedFolder)
+print(f'Selected {len(grids)} of {len(manifest["grids"])} grids, '
+      f'decompressed {number_of_extracted}')
@@ -0,0 +1,61 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+import os
+
+from modules.geometry_index import (GEOMETRY_INDEX_FILENAME, build_geometry_index,
+                                    read_geometry_index, write_geometry_index)
+
+# Required parameters
+parser = argparse.ArgumentParser(description='Index the cell geometry of a CIF database.')
+parser.add_argument('database_folder',
+                    type=str,
+                    action='store',
+                    metavar='DATABASE_FOLDER',
+                    help='Root of the nanopore-database tree, with CIF files as Source/Name.cif.')
+
+# Optional parameters
+parser.add_argument('--LargestCutoff',
+                    type=float,
+                    default=12.8,
+                    action='store',
+                    required=False,
+                    metavar='LARGEST_CUTOFF',
+                    help='Largest cutoff radius used to calculate unit cells and molecules.')
+parser.add_argument('--IndexFile',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='INDEX_FILE',
+                    help='Index table to be written. Defaults to DATABASE_FOLDER/'
+                         f'{GEOMETRY_INDEX_FILENAME}.')
+parser.add_argument('--Rebuild',
+                    default=False,
+                    action='store_true',
+                    required=False,
+                    help='Read every CIF file again instead of reusing the unchanged entries.')
+parser.add_argument('--Workers',
+                    type=int,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='WORKERS',
+                    help='Number of processes reading CIF files. Defaults to the available CPUs.')
+arg = parser.parse_args()
+
+if arg.IndexFile is None:
+    arg.IndexFile = os.path.join(arg.database_folder, GEOMETRY_INDEX_FILENAME)
+
+# Reuse the entries of an existing index for the files that did not change
+previous_index = None
+if os.path.exists(arg.IndexFile) and not arg.Rebuild:
+    previous_index = read_geometry_index(arg.IndexFile)
+
+index = build_geometry_index(arg.database_folder, arg.LargestCutoff, arg.Workers, previous_index)
+write_geometry_index(arg.IndexFile, index)
+
+print(f'Cell geometry of {len(index)} structures written to {arg.IndexFile}')
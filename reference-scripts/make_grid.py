@@ -4,12 +4,17 @@
 # © Copyright IBM Corp. 2020 All Rights Reserved
 
 import argparse
+import glob
 import json
 import os
+import shutil
+import sys
 from textwrap import dedent
 
 from modules.calculate_properties import calculate_grid, calculate_UnitCells
 from modules.copy_files import copy_def_files
+from modules.grid_cache import (GridCache, coulomb_grid_file, default_grid_folder, grid_key,
+                                vdw_grid_files)
 
 # Required parameters
 parser = argparse.ArgumentParser(description='Create Ewald Sum grid for RASPA simulations.')
@@ -93,6 +98,26 @@ parser.add_argument('--SpacingCoulombGrid',
                     required=False,
                     metavar='SPACING_COULOMB_GRID',
                     help='The grid spacing of the Coulomb potential [Angstrom].')
+parser.add_argument('--GridCache',
+                    type=str,
+                    default=os.getenv('GRID_CACHE_DIR') or None,
+                    action='store',
+                    required=False,
+                    metavar='GRID_CACHE',
+                    help='Folder of the persistent grid cache, shared by the workflow instances. '
+                         'Defaults to $GRID_CACHE_DIR. The cache is not used when unset or empty.')
+parser.add_argument('--GridFolder',
+                    type=str,
+                    default=default_grid_folder(),
+                    action='store',
+                    required=False,
+                    metavar='GRID_FOLDER',
+                    help='Folder where RASPA writes the grids of the Local force field.')
+parser.add_argument('--StoreGrids',
+                    required=False,
+                    action='store_true',
+                    help='Store the grids computed by the MakeGrid simulation in the grid cache, '
+                         'instead of creating the input file.')
 arg = parser.parse_args()
 
 # Copy files to output directory
@@ -116,6 +141,66 @@ arg.UnitCells = calculate_UnitCells(cif_filename, largest_cutoff)
 # Determine whether existing partial atomic charges are considered or not
 arg.UseChargesFromCIFFile = 'no' if arg.IgnoreChargesFromCIFFile else 'yes'
 
+input_filename = os.path.join(arg.output_folder, 'simulation-MakeGrid.input')
+
+# Coulomb grid computed by MakeGrid, unless it is already cached
+arg.ChargeMethod = 'Ewald'
+
+# Look the grids up in the grid cache, one per pseudo atom type and spacing, keyed by everything
+# else they depend on. Only the missing grids are computed
+if arg.GridCache:
+    cache = GridCache(arg.GridCache)
+    key = grid_key(cif_filename,
+                   glob.glob(os.path.join(arg.output_folder, '*.def')),
+                   {name: getattr(arg, name) for name in ['UnitCells',
+                                                          'CutOffVDW',
+                                                          'CutOffChargeCharge',
+                                                          'CutOffChargeBondDipole',
+                                                          'CutOffBondDipoleBondDipole',
+                                                          'EwaldPrecision',
+                                                          'UseChargesFromCIFFile']})
+
+    if arg.StoreGrids:
+        number_of_files = cache.store(key, arg.FrameworkName, arg.GridFolder)
+        print(f'Stored {number_of_files} grid files in {cache.entry_folder(key)}')
+        sys.exit(0)
+
+    # Leftover grids are not trusted, and the restored ones are hard links: RASPA has to write
+    # new files rather than overwrite them
+    shutil.rmtree(os.path.join(arg.GridFolder, arg.FrameworkName), ignore_errors=True)
+
+    cached_grids = []
+    missing_types = []
+    for pseudo_atom in arg.GridTypes.split():
+        grid_file = cache.find(key, vdw_grid_files(pseudo_atom, arg.SpacingVDWGrid))
+        if grid_file is None:
+            missing_types.append(pseudo_atom)
+        else:
+            cached_grids.append(grid_file)
+
+    coulomb_grid = cache.find(key, [coulomb_grid_file(arg.SpacingCoulombGrid, arg.UnitCells)])
+    if coulomb_grid is not None:
+        cached_grids.append(coulomb_grid)
+        # RASPA computes the Coulomb grid after the VDW grids, and stops before it without a
+        # charge method
+        arg.ChargeMethod = 'None'
+
+    cache.restore(key, cached_grids, arg.FrameworkName, arg.GridFolder)
+    print(f'Restored {len(cached_grids)} grids from {cache.entry_folder(key)}')
+
+    if not missing_types and coulomb_grid is not None:
+        # make_grid.sh skips the simulation when there is no input file
+        if os.path.exists(input_filename):
+            os.remove(input_filename)
+        print('All grids are cached, nothing to compute.')
+        sys.exit(0)
+
+    arg.GridTypes, arg.NumberOfGrids = ' '.join(missing_types), len(missing_types)
+    print(f'Computing the grids of {missing_types}'
+          + ('' if coulomb_grid is not None else ' and the Coulomb grid'))
+elif arg.StoreGrids:
+    sys.exit(0)
+
 # Create input file as string
 inputfile = dedent("""\
 SimulationType                  MakeGrid
@@ -125,7 +210,7 @@ CutOffVDW                       {CutOffVDW}                     # float
 CutOffChargeCharge              {CutOffChargeCharge}            # float
 CutOffChargeBondDipole          {CutOffChargeBondDipole}        # float
 CutOffBondDipoleBondDipole      {CutOffBondDipoleBondDipole}    # float
-ChargeMethod                    Ewald                           # string
+ChargeMethod                    {ChargeMethod}                  # string
 EwaldPrecision                  {EwaldPrecision}                # float
 
 Framework                       0                               # int
@@ -140,5 +225,5 @@ SpacingCoulombGrid              {SpacingCoulombGrid}            # float
 """).format(**arg.__dict__)
 
 # Write string to file
-with open(os.path.join(arg.output_folder, 'simulation-MakeGrid.input'), 'w') as f:
+with open(input_filename, 'w') as f:
     f.write(inputfile)
@@ -4,31 +4,48 @@
 # © Copyright IBM Corp. 2020 All Rights Reserved
 
 # Parse input parameters
-while getopts u:o:n:c: flag
+while getopts u:o:n:c:g: flag
 do
     case "${flag}" in
         u) UseGrid=${OPTARG};;
         o) OutputFolder=${OPTARG};;
         n) FrameworkName=${OPTARG};;
         c) FlueGasComposition=${OPTARG};;
+        g) GridCache=${OPTARG};;
     esac
 done
 
+# Reuse the grids of earlier workflow instances if GridCache is set
+if [[ -n "${GridCache}" ]]; then
+    GridCacheFlag="--GridCache ${GridCache}"
+fi
+
 if [[ "${UseGrid}" -eq 1 ]]; then
     echo -e "\nDecompressing CIF files..."
     tar --no-overwrite-dir -xvzf charged_cif.tgz -C ${OutputFolder}
 
     echo -e "\nCreating MakeGrid input file..."
-    make_grid.py --FrameworkName ${FrameworkName} \
+    make_grid.py ${GridCacheFlag} \
+                 --FrameworkName ${FrameworkName} \
                  --FlueGasComposition ${FlueGasComposition} \
                  ${OutputFolder}
 
-    echo -e "\nRunning MakeGrid simulation..."
-    cd ${OutputFolder} && simulate -i simulation-MakeGrid.input
+    # The input file is not written when the grids are restored from the grid cache
+    cd ${OutputFolder}
+    if [[ -f simulation-MakeGrid.input ]]; then
+        echo -e "\nRunning MakeGrid simulation..."
+        simulate -i simulation-MakeGrid.input
+
+        echo -e "\nStoring MakeGrid output in the grid cache..."
+        make_grid.py --StoreGrids ${GridCacheFlag} \
+                     --FrameworkName ${FrameworkName} \
+                     --FlueGasComposition ${FlueGasComposition} \
+                     .
+    fi
 
-    echo -e "\nCompressing MakeGrid output from ${RASPA_DIR}/share/raspa/grids/..."
-    tar -cvzf grids.tgz ${RASPA_DIR}/share/raspa/grids/Local/${FrameworkName}/
+    echo -e "\nPacking MakeGrid output from ${RASPA_DIR}/share/raspa/grids/..."
+    bundle_grids.py --FrameworkName ${FrameworkName} grids.tar
 else
     echo -e "\nSkipping MakeGrid component..."
-    tar -cvzf grids.tgz -T /dev/null
+    tar -cvf grids.tar -T /dev/null
 fi;
@@ -0,0 +1,398 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import tarfile
+import tempfile
+import typing
+
+# Compression codecs of the aggregate tarballs, and the matching tarfile write modes. Readers
+# opening the tarballs with `tarfile.open(name)` detect the codec transparently. `bgz` compresses
+# every member as an independent gzip block: the tarball is still a valid gzip stream, but each
+# member can be decompressed on its own
+COMPRESSION_MODES = {'none': 'w', 'gz': 'w:gz', 'bz2': 'w:bz2', 'xz': 'w:xz', 'bgz': 'w'}
+
+# Codecs whose members can be read at random through the sidecar index
+INDEXED_CODECS = ['none', 'bgz']
+
+# Suffix of the consolidated JSON lines file written next to the tarball
+CONSOLIDATED_EXTENSION = '.jsonl'
+
+# Suffix of the sidecar index with the position of every member of the tarball
+INDEX_EXTENSION = '.index.json'
+
+# Bytes read at each end of a tarball to check that it matches its index
+FINGERPRINT_SIZE = 65536
+
+
+class _BlockGzipWriter:
+    """
+    Write-only file for `tarfile` that gzip-compresses the tar stream in independent blocks,
+    one per call to `end_block`.
+    """
+
+    def __init__(self, fileobj: typing.BinaryIO):
+        self.fileobj = fileobj
+        self.buffer = []
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        self.buffer.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def end_block(self) -> typing.Tuple[int, int]:
+        """
+        Compress the data written since the last block. Returns the offset and size of the
+        compressed block in the file.
+        """
+        block = gzip.compress(b''.join(self.buffer), mtime=0)
+        self.buffer = []
+
+        offset = self.fileobj.tell()
+        self.fileobj.write(block)
+
+        return offset, len(block)
+
+
+def write_aggregate(records: typing.Iterable[typing.Tuple[str, bytes, float]],
+                    member_suffix: str,
+                    archive_filename: str,
+                    compression: str = 'gz',
+                    consolidated_filename: typing.Optional[str] = None) -> int:
+    """
+    Write JSON records into an aggregate tarball, as they are produced.
+
+    Every record is added to the archive as `{framework_name}{member_suffix}` and written as one
+    line of a consolidated JSON lines file, with the material name in `material` and the parsed
+    JSON in `property`, so that readers of all materials do a single sequential read. Both files
+    are written to temporary names and renamed when complete.
+
+    Tarballs with an INDEXED_CODECS codec also get a sidecar index (`{archive}.index.json`) with
+    the position of every member, used by `read_members` to read single materials.
+
+    Parameters
+    ----------
+    records : iterable
+        Tuples with the material name, JSON content and modification time of every record.
+    member_suffix : string
+        Suffix of the archive members, e.g. `-isotherm.json`.
+    archive_filename : string
+        Name of the tarball.
+    compression : string, optional
+        Compression codec, one of COMPRESSION_MODES. The default is gz.
+    consolidated_filename : string, optional
+        Name of the consolidated JSON lines file. It is not written by default.
+
+    Returns
+    -------
+    n_materials : int
+        Number of materials written.
+    """
+    if compression not in COMPRESSION_MODES:
+        raise ValueError(f'{compression} is not a valid compression codec. '
+                         f'Use one of {list(COMPRESSION_MODES)}.')
+
+    directory = os.path.dirname(os.path.abspath(archive_filename))
+    archive = tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False)
+    consolidated = None
+    if consolidated_filename is not None:
+        consolidated = tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False)
+
+    stream = _BlockGzipWriter(archive) if compression == 'bgz' else archive
+    members = {}
+    n_materials = 0
+
+    try:
+        with tarfile.open(fileobj=stream, mode=COMPRESSION_MODES[compression]) as tar:
+            for framework_name, content, mtime in records:
+                member = tarfile.TarInfo(f'{framework_name}{member_suffix}')
+                member.size = len(content)
+                member.mtime = mtime
+                member.mode = 0o644
+
+                # Position of the header and data of the member in the tar stream
+                block_offset = tar.offset
+                tar.addfile(member, io.BytesIO(content))
+                block_size = tar.offset - block_offset
+                data_offset = block_size - tarfile.BLOCKSIZE * -(-len(content) // tarfile.BLOCKSIZE)
+
+                if compression == 'bgz':
+                    block_offset, block_size = stream.end_block()
+                members[member.name] = [block_offset, block_size, data_offset, len(content)]
+                n_materials += 1
+
+                if consolidated is not None:
+                    consolidated.write(json.dumps({'material': framework_name,
+                                                   'property': json.loads(content)}) + '\n')
+
+        # End of archive blocks
+        if compression == 'bgz':
+            stream.end_block()
+
+        for temporary, filename in [(archive, archive_filename),
+                                    (consolidated, consolidated_filename)]:
+            if temporary is not None:
+                temporary.close()
+                os.chmod(temporary.name, 0o644)
+                os.replace(temporary.name, filename)
+
+        if compression in INDEXED_CODECS:
+            write_index(archive_filename, compression, members)
+        elif os.path.exists(archive_filename + INDEX_EXTENSION):
+            os.remove(archive_filename + INDEX_EXTENSION)
+
+    finally:
+        for temporary in [archive, consolidated]:
+            if temporary is not None:
+                temporary.close()
+                if os.path.exists(temporary.name):
+                    os.remove(temporary.name)
+
+    return n_materials
+
+
+def aggregate_json(framework_names: typing.List[str],
+                   output_folders: typing.List[str],
+                   json_filename: str,
+                   member_suffix: str,
+                   archive_filename: str,
+                   compression: str = 'gz',
+                   consolidated_filename: typing.Optional[str] = None) -> int:
+    """
+    Stream the per-material JSON files of the output folders into an aggregate tarball.
+
+    Every source file is read once and written straight into the archive by `write_aggregate`,
+    without an intermediate copy in the working directory.
+
+    Parameters
+    ----------
+    framework_names : list
+        Names of the materials.
+    output_folders : list
+        Output folder of every material, holding `json_filename`.
+    json_filename : string
+        Name of the JSON file in every output folder, e.g. `isotherm.json`.
+    member_suffix : string
+        Suffix of the archive members, e.g. `-isotherm.json`.
+    archive_filename : string
+        Name of the tarball.
+    compression : string, optional
+        Compression codec, one of COMPRESSION_MODES. The default is gz.
+    consolidated_filename : string, optional
+        Name of the consolidated JSON lines file. It is not written by default.
+
+    Returns
+    -------
+    n_materials : int
+        Number of materials aggregated.
+    """
+    if len(framework_names) != len(output_folders):
+        raise ValueError(f'Got {len(framework_names)} framework names and '
+                         f'{len(output_folders)} output folders.')
+
+    def read_sources():
+        for framework_name, output_folder in zip(framework_names, output_folders):
+            with open(os.path.join(output_folder, json_filename), 'rb') as f:
+                yield framework_name, f.read(), os.fstat(f.fileno()).st_mtime
+
+    return write_aggregate(read_sources(), member_suffix, archive_filename, compression,
+                           consolidated_filename)
+
+
+def read_consolidated(consolidated_filename: str) -> typing.Iterator[typing.Tuple[str, dict]]:
+    """
+    Iterate over the materials of a consolidated JSON lines file.
+
+    Parameters
+    ----------
+    consolidated_filename : string
+        Name of the file written by `aggregate_json`.
+
+    Yields
+    ------
+    material_name : string
+        Name of the material.
+    property : dict
+        Parsed JSON of the material, in the order of the file.
+    """
+    with open(consolidated_filename, 'r') as f:
+        for line in f:
+            record = json.loads(line)
+            yield record['material'], record['property']
+
+
+def _fingerprint(archive_filename: str) -> str:
+    """
+    Returns a hash of the size and both ends of a file, which survives copies that do not keep
+    the modification time.
+    """
+    size = os.path.getsize(archive_filename)
+    fingerprint = hashlib.sha256(str(size).encode('utf-8'))
+    with open(archive_filename, 'rb') as f:
+        fingerprint.update(f.read(FINGERPRINT_SIZE))
+        f.seek(max(0, size - FINGERPRINT_SIZE))
+        fingerprint.update(f.read(FINGERPRINT_SIZE))
+
+    return fingerprint.hexdigest()
+
+
+def write_index(archive_filename: str,
+                compression: str,
+                members: typing.Dict[str, typing.List[int]]) -> None:
+    """
+    Atomically write the sidecar index of a tarball.
+
+    Parameters
+    ----------
+    archive_filename : string
+        Name of the tarball.
+    compression : string
+        Compression codec of the tarball, one of INDEXED_CODECS.
+    members : dict
+        Offset and size of the block holding every member in the file, and offset and size of
+        the member data in the uncompressed block, keyed by member name.
+    """
+    index = {'compression': compression,
+             'fingerprint': _fingerprint(archive_filename),
+             'members': members}
+
+    directory = os.path.dirname(os.path.abspath(archive_filename))
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as f:
+        json.dump(index, f)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, archive_filename + INDEX_EXTENSION)
+
+
+def read_index(archive_filename: str) -> typing.Optional[dict]:
+    """
+    Read the sidecar index of a tarball. Returns None if there is no index, or if the tarball
+    does not match the index anymore.
+    """
+    try:
+        with open(archive_filename + INDEX_EXTENSION, 'r') as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if index.get('fingerprint') != _fingerprint(archive_filename):
+        return None
+
+    return index
+
+
+def read_members(archive_filename: str,
+                 member_names: typing.List[str]) -> typing.Dict[str, bytes]:
+    """
+    Read some members of an aggregate tarball.
+
+    With an up-to-date sidecar index every member is read with one seek, decompressing only its
+    own block. Otherwise the tarball is scanned once in order.
+
+    Parameters
+    ----------
+    archive_filename : string
+        Name of the tarball.
+    member_names : list
+        Names of the members, e.g. `{framework_name}-isotherm.json`.
+
+    Returns
+    -------
+    contents : dict
+        Content of every member found, keyed by member name.
+    """
+    index = read_index(archive_filename)
+    contents = {}
+
+    if index is None:
+        wanted = set(member_names)
+        with tarfile.open(archive_filename, 'r:*') as tar:
+            for member in tar:
+                if member.isfile() and member.name in wanted:
+                    contents[member.name] = tar.extractfile(member).read()
+        return contents
+
+    members = index['members']
+    with open(archive_filename, 'rb') as f:
+        for member_name in sorted(set(member_names) & set(members), key=lambda n: members[n][0]):
+            block_offset, block_size, data_offset, size = members[member_name]
+            f.seek(block_offset)
+            block = f.read(block_size)
+            if index['compression'] == 'bgz':
+                block = gzip.decompress(block)
+            contents[member_name] = block[data_offset:data_offset + size]
+
+    return contents
+
+
+def read_records(archive_filename: str,
+                 framework_names: typing.List[str],
+                 member_suffix: str) -> typing.Dict[str, dict]:
+    """
+    Read the JSON records of some materials of an aggregate tarball.
+
+    Parameters
+    ----------
+    archive_filename : string
+        Name of the tarball.
+    framework_names : list
+        Names of the materials.
+    member_suffix : string
+        Suffix of the archive members, e.g. `-isotherm.json`.
+
+    Returns
+    -------
+    records : dict
+        Parsed JSON of every material found, keyed by material name.
+    """
+    member_names = [f'{framework_name}{member_suffix}' for framework_name in framework_names]
+    contents = read_members(archive_filename, member_names)
+
+    return {member_name[:-len(member_suffix)]: json.loads(content)
+            for member_name, content in contents.items()}
+
+
+def export_aggregate(archive_filename: str,
+                     framework_names: typing.List[str],
+                     member_suffix: str,
+                     export_filename: str,
+                     compression: str = 'gz',
+                     consolidated_filename: typing.Optional[str] = None) -> int:
+    """
+    Copy the records of some materials of an aggregate tarball into a new one, reading only
+    those members when the tarball has a sidecar index.
+
+    Parameters
+    ----------
+    archive_filename : string
+        Name of the source tarball.
+    framework_names : list
+        Names of the materials to export.
+    member_suffix : string
+        Suffix of the archive members, e.g. `-isotherm.json`.
+    export_filename : string
+        Name of the new tarball.
+    compression : string, optional
+        Compression codec of the new tarball, one of COMPRESSION_MODES. The default is gz.
+    consolidated_filename : string, optional
+        Name of a consolidated JSON lines file of the exported materials.
+
+    Returns
+    -------
+    n_materials : int
+        Number of materials exported.
+    """
+    member_names = [f'{framework_name}{member_suffix}' for framework_name in framework_names]
+    contents = read_members(archive_filename, member_names)
+    mtime = os.stat(archive_filename).st_mtime
+
+    return write_aggregate(((member_name[:-len(member_suffix)], contents[member_name], mtime)
+                            for member_name in member_names if member_name in contents),
+                           member_suffix, export_filename, compression, consolidated_filename)
@@ -0,0 +1,152 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import typing
+
+import numpy as np
+
+
+def autocorrelation_function(data: np.ndarray, eq_index: np.ndarray) -> np.ndarray:
+    """
+    Calculates the normalised autocorrelation function of the equilibrated part of every column.
+
+    The columns are centred on their equilibrated average and the rows before `eq_index` are set
+    to zero, so the ACF of all columns is obtained from a single FFT of the stacked block.
+
+    Parameters
+    ----------
+    data : array
+        2D array with cycles as rows and observables as columns.
+    eq_index : array
+        Index of the start of equilibrated data of each column.
+
+    Returns
+    -------
+    ACF : array
+        2D array with the autocorrelation function of each column for lags from 0 to n - 1.
+        Columns with zero variance have a NaN ACF.
+    """
+    n = len(data)
+    is_equilibrated = np.arange(n)[:, np.newaxis] >= np.asarray(eq_index)[np.newaxis, :]
+
+    lengths = is_equilibrated.sum(axis=0)
+    averages = np.where(is_equilibrated, data, 0.0).sum(axis=0) / lengths
+    centred = np.where(is_equilibrated, data - averages, 0.0)
+
+    # Zero padding to a power of two above 2n avoids the circular wrap of the correlation
+    fft_size = 1 << (2 * n - 1).bit_length()
+    transform = np.fft.rfft(centred, n=fft_size, axis=0)
+    autocovariance = np.fft.irfft(transform * np.conjugate(transform), n=fft_size, axis=0)[:n]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return autocovariance / autocovariance[0]
+
+
+def integrated_autocorrelation_time(ACF: np.ndarray, window_factor: float = 5.0) -> np.ndarray:
+    """
+    Calculates the integrated autocorrelation time of every column of the ACF.
+
+    The sum over the ACF is truncated with the automatic windowing rule of Sokal: the window is
+    the smallest lag M with M >= window_factor * tau(M).
+
+    Parameters
+    ----------
+    ACF : array
+        2D array with the autocorrelation function of each column.
+    window_factor : float, optional
+        Factor of the automatic windowing rule. The default is 5.
+
+    Returns
+    -------
+    tau : array
+        Integrated autocorrelation time of each column, in number of cycles.
+    """
+    # Running estimate of tau = 1 + 2 * sum(ACF[1:M])
+    taus = 2 * np.cumsum(ACF, axis=0) - 1
+
+    inside_window = np.arange(len(ACF))[:, np.newaxis] < window_factor * taus
+    window = np.where(inside_window.all(axis=0), len(ACF) - 1, np.argmin(inside_window, axis=0))
+
+    return taus[window, np.arange(ACF.shape[1])]
+
+
+def calc_autocorrelation_time(data: np.ndarray,
+                              eq_index: np.ndarray,
+                              window_factor: float = 5.0) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the autocorrelation time and number of uncorrelated samples of every column.
+
+    Parameters
+    ----------
+    data : array
+        2D array with cycles as rows and observables as columns.
+    eq_index : array
+        Index of the start of equilibrated data of each column.
+    window_factor : float, optional
+        Factor of the automatic windowing rule. The default is 5.
+
+    Returns
+    -------
+    autocorrelation_time : array
+        Integrated autocorrelation time of each column, rounded up to whole cycles. Columns with
+        zero variance on the equilibrated data have an autocorrelation time of 1.
+    uncorrelated_samples : array
+        Number of uncorrelated samples of each column.
+    """
+    ACF = autocorrelation_function(data, eq_index)
+    tau = integrated_autocorrelation_time(np.nan_to_num(ACF), window_factor)
+
+    autocorrelation_time = np.where(np.isfinite(ACF[0]), np.ceil(np.maximum(tau, 1)), 1.0)
+    uncorrelated_samples = (len(data) - np.asarray(eq_index)) / autocorrelation_time
+
+    return autocorrelation_time, uncorrelated_samples
+
+
+def calc_equilibrated_statistics(data: np.ndarray,
+                                 eq_index: np.ndarray,
+                                 window_factor: float = 5.0) -> typing.Dict[str, np.ndarray]:
+    """
+    Calculates the average and all versions of the uncertainty of every column in one call.
+
+    Parameters
+    ----------
+    data : array
+        2D array with cycles as rows and observables as columns.
+    eq_index : array
+        Index of the start of equilibrated data of each column.
+    window_factor : float, optional
+        Factor of the automatic windowing rule. The default is 5.
+
+    Returns
+    -------
+    results : dict
+        Arrays with the 'average', Standard Deviation ('SD'), Standard Error ('SE'), uncorrelated
+        Standard Deviation ('uSD'), uncorrelated Standard Error ('uSE'), autocorrelation time
+        ('ac_time') and number of uncorrelated samples ('uncorr_samples') of each column.
+    """
+    data = np.asarray(data, dtype=float)
+    eq_index = np.asarray(eq_index, dtype=int)
+    number_of_columns = data.shape[1]
+
+    ac_time, uncorr_samples = calc_autocorrelation_time(data, eq_index, window_factor)
+
+    results = {key: np.empty(number_of_columns) for key in ['average', 'SD', 'SE', 'uSD', 'uSE']}
+
+    for i in range(number_of_columns):
+        equilibrated_data = data[eq_index[i]:, i]
+        results['average'][i] = np.average(equilibrated_data)
+        results['SD'][i] = np.std(equilibrated_data)
+        results['SE'][i] = results['SD'][i] / np.sqrt(len(equilibrated_data))
+
+        # Average the data on uncorrelated chunks of ac_time cycles
+        batch_size = min(int(ac_time[i]), len(equilibrated_data))
+        number_of_batches = len(equilibrated_data) // batch_size
+        batches = equilibrated_data[:number_of_batches * batch_size].reshape(number_of_batches,
+                                                                             batch_size)
+        results['uSD'][i] = np.std(batches.mean(axis=1))
+        results['uSE'][i] = results['uSD'][i] / np.sqrt(number_of_batches)
+
+    results['ac_time'] = ac_time
+    results['uncorr_samples'] = uncorr_samples
+
+    return results
@@ -0,0 +1,182 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import concurrent.futures
+import json
+import tarfile
+import threading
+import time
+import typing
+
+import requests
+
+from modules.aggregate import CONSOLIDATED_EXTENSION, read_consolidated
+from modules.objectid_cache import ObjectIDCache
+from modules.outbox import RETRY_STATUS_CODES, idempotency_key, post_record
+
+# Suffixes of the JSON files written by the aggregate stages
+AGGREGATE_SUFFIXES = ['-isotherm.json', '-diffusion.json']
+
+
+def read_aggregate(archive_filename: str) -> typing.List[typing.Tuple[str, dict]]:
+    """
+    Read the property records of an aggregate tarball (`isotherms.tgz` or `diffusion.tgz`), or
+    of its consolidated JSON lines file (`isotherms.jsonl` or `diffusion.jsonl`).
+
+    Parameters
+    ----------
+    archive_filename : string
+        Name of the aggregate tarball or consolidated file.
+
+    Returns
+    -------
+    records : list
+        Tuples with the material name and the t-dependent property of every JSON member.
+    """
+    if archive_filename.endswith(CONSOLIDATED_EXTENSION):
+        return list(read_consolidated(archive_filename))
+
+    records = []
+    with tarfile.open(archive_filename, 'r:*') as tar:
+        for member in tar:
+            suffixes = [suffix for suffix in AGGREGATE_SUFFIXES if member.name.endswith(suffix)]
+            if not member.isfile() or not suffixes:
+                continue
+            material_name = member.name.split('/')[-1][:-len(suffixes[0])]
+            records.append((material_name, json.load(tar.extractfile(member))))
+
+    return records
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls to at most `rate` per second. A rate of zero or less
+    disables the limit.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_call = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        """
+        Blocks until the next call is allowed.
+        """
+        if self.interval == 0.0:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+def pooled_session(concurrency: int) -> requests.Session:
+    """
+    Returns a session whose connection pool keeps one connection alive per concurrent worker.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def upload_record(session: requests.Session,
+                  rate_limiter: RateLimiter,
+                  material_name: str,
+                  material_source: str,
+                  thermoProp: dict,
+                  max_retries: int = 5,
+                  backoff: float = 1.0,
+                  max_backoff: float = 60.0,
+                  cache: typing.Optional[ObjectIDCache] = None) -> dict:
+    """
+    Resolve the ObjectID of a material and post its t-dependent property.
+
+    Returns
+    -------
+    status : dict
+        Status of the record: 'sent', 'rejected' or 'failed', with the HTTP status code,
+        elapsed time and error message.
+    """
+    key = idempotency_key('t-dependent', material_name, material_source, thermoProp)
+    status = {'name': material_name, 'source': material_source, 'key': key}
+    start = time.monotonic()
+
+    try:
+        response = post_record(material_name, material_source, 't-dependent', thermoProp, key,
+                               session, max_retries, backoff, max_backoff, cache,
+                               throttle=rate_limiter.wait)
+
+        if response is None:
+            status.update(status='rejected', error='Material not found.')
+        else:
+            status['status_code'] = response.status_code
+            if response.ok:
+                status['status'] = 'sent'
+            elif response.status_code in RETRY_STATUS_CODES:
+                status.update(status='failed', error=response.text[:500])
+            else:
+                status.update(status='rejected', error=response.text[:500])
+
+    except requests.exceptions.RequestException as error:
+        status.update(status='failed', error=str(error))
+
+    status['elapsed'] = time.monotonic() - start
+
+    return status
+
+
+def upload_records(records: typing.List[typing.Tuple[str, str, dict]],
+                   concurrency: int = 8,
+                   rate: float = 0.0,
+                   max_retries: int = 5,
+                   backoff: float = 1.0,
+                   callback: typing.Optional[typing.Callable[[dict], None]] = None,
+                   cache: typing.Optional[ObjectIDCache] = None) -> typing.List[dict]:
+    """
+    Upload t-dependent property records concurrently over a pooled HTTP session.
+
+    Parameters
+    ----------
+    records : list
+        Tuples with the material name, material source and t-dependent property.
+    concurrency : int, optional
+        Maximum number of requests in flight. The default is 8.
+    rate : float, optional
+        Maximum number of requests per second. The default is 0, no limit.
+    max_retries : int, optional
+        Number of retries of each call. The default is 5.
+    backoff : float, optional
+        Delay before the first retry in seconds, doubled on each retry. The default is 1.
+    callback : callable, optional
+        Function called with the status of every record as soon as it is done.
+    cache : ObjectIDCache, optional
+        Cache of the ObjectIDs of the materials. An in-memory cache is used by default.
+
+    Returns
+    -------
+    statuses : list
+        Status of every record, in the order of `records`.
+    """
+    session = pooled_session(concurrency)
+    rate_limiter = RateLimiter(rate)
+    if cache is None:
+        cache = ObjectIDCache()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(upload_record, session, rate_limiter, name, source,
+                                   thermoProp, max_retries, backoff, cache=cache)
+                   for name, source, thermoProp in records]
+
+        for future in concurrent.futures.as_completed(futures):
+            if callback is not None:
+                callback(future.result())
+
+    return [future.result() for future in futures]
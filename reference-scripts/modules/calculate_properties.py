@@ -1,14 +1,225 @@
 # SPDX-License-Identifier: Apache2.0
 # © Copyright IBM Corp. 2020 All Rights Reserved
 
+import os
+
 import gemmi
 import numpy as np
 from scipy.signal import find_peaks
-from scipy.optimize import curve_fit
 import typing
 
 
-def calculate_perpendicular_widths(cif_filename: str) -> typing.Tuple[float, float, float]:
+class CellGeometry:
+    """
+    Geometry of a unit cell, built once from the cell parameters of a CIF file.
+
+    Holds the cell matrix, the volume and the perpendicular widths of the cell, and memoizes the
+    unit cell repetitions and number of molecules for each cut-off radius. Use `from_cif` to share
+    a single instance among every calculation on the same CIF file.
+
+    Parameters
+    ----------
+    a, b, c : float
+        Lengths of the cell vectors in Angstrom.
+    alpha, beta, gamma : float
+        Angles of the cell in degrees.
+    """
+
+    # Instances built from CIF files, keyed by real path, modification time and size
+    _cache: typing.Dict[tuple, 'CellGeometry'] = {}
+
+    def __init__(self, a: float, b: float, c: float, alpha: float, beta: float, gamma: float):
+        self.cell_parameters = (a, b, c, alpha, beta, gamma)
+
+        beta = beta * np.pi / 180.0
+        gamma = gamma * np.pi / 180.0
+        alpha = alpha * np.pi / 180.0
+
+        # Calculate the nu value
+        nu = (np.cos(alpha) - np.cos(gamma) * np.cos(beta)) / np.sin(gamma)
+
+        # Build the transformation matrix as a numpy array
+        self.cell_matrix = np.array([[a, 0.0, 0.0],
+                                     [b * np.cos(gamma), b * np.sin(gamma), 0.0],
+                                     [c * np.cos(beta), c * nu,
+                                      c * np.sqrt(1.0 - np.cos(beta)**2 - nu**2)]])
+
+        # Calculate the cross products
+        axb = np.cross(self.cell_matrix[0], self.cell_matrix[1])
+        bxc = np.cross(self.cell_matrix[1], self.cell_matrix[2])
+        cxa = np.cross(self.cell_matrix[2], self.cell_matrix[0])
+
+        # Calculates the volume of the unit cell
+        self.volume = np.dot(axb, self.cell_matrix[2])
+
+        # Calculate perpendicular widths
+        self.perpendicular_widths = (self.volume / np.linalg.norm(bxc),
+                                     self.volume / np.linalg.norm(cxa),
+                                     self.volume / np.linalg.norm(axb))
+
+        self._unit_cells = {}
+        self._number_of_molecules = {}
+
+    @classmethod
+    def from_cif(cls, cif_filename: str) -> 'CellGeometry':
+        """
+        Build the cell geometry of a CIF file, reusing the previous instance if the file was
+        already read and has not been modified since.
+
+        Parameters
+        ----------
+        cif_filename : string
+            Name of the cif file.
+
+        Returns
+        -------
+        geometry : CellGeometry
+            Geometry of the unit cell.
+        """
+        file_stat = os.stat(cif_filename)
+        key = (os.path.realpath(cif_filename), file_stat.st_mtime_ns, file_stat.st_size)
+
+        if key not in cls._cache:
+            # Read data from CIF file
+            cif = gemmi.cif.read_file(cif_filename).sole_block()
+            cls._cache[key] = cls(*[float(cif.find_value(tag).split('(')[0])
+                                    for tag in ['_cell_length_a',
+                                                '_cell_length_b',
+                                                '_cell_length_c',
+                                                '_cell_angle_alpha',
+                                                '_cell_angle_beta',
+                                                '_cell_angle_gamma']])
+
+        return cls._cache[key]
+
+    def unit_cells(self, cutoff: float) -> str:
+        """
+        Number of unit cell repetitions so that all supercell lengths are larger than twice the
+        interaction potential cut-off radius, as the `UnitCells` string used by RASPA.
+        """
+        if cutoff not in self._unit_cells:
+            uc_array = np.ceil(2.0 * cutoff / np.array(self.perpendicular_widths)).astype(int)
+            self._unit_cells[cutoff] = ' '.join(map(str, uc_array))
+
+        return self._unit_cells[cutoff]
+
+    def number_of_molecules(self, cutoff: float, unitcells: str) -> int:
+        """
+        Number of molecules in the supercell to ensure that there is at least `UnitCell` /
+        `CutOff**3` molecules per unit cell.
+        """
+        if (cutoff, unitcells) not in self._number_of_molecules:
+            # Get the mumber of unit cells
+            unitcells_array = np.array(unitcells.split(' ')).astype(int)
+
+            # Calculate the number of molecules
+            self._number_of_molecules[cutoff, unitcells] = int(
+                np.round(np.prod(unitcells_array) * self.volume / (cutoff)**3))
+
+        return self._number_of_molecules[cutoff, unitcells]
+
+
+def get_cell_geometry(cif_filename: typing.Union[str, CellGeometry]) -> CellGeometry:
+    """
+    Returns the cell geometry of a cif file name, or the geometry object itself.
+    """
+    if isinstance(cif_filename, CellGeometry):
+        return cif_filename
+
+    return CellGeometry.from_cif(cif_filename)
+
+
+CELL_TAGS = ['_cell_length_a',
+             '_cell_length_b',
+             '_cell_length_c',
+             '_cell_angle_alpha',
+             '_cell_angle_beta',
+             '_cell_angle_gamma']
+
+
+def read_cell_parameters(cif_filename: str) -> typing.Tuple[float, ...]:
+    """
+    Read only the `_cell_*` tags of a CIF file, without parsing the atomic coordinates.
+
+    The file is read line by line and closed as soon as the six cell parameters are found.
+
+    Parameters
+    ----------
+    cif_filename : string
+        Name of the cif file.
+
+    Returns
+    -------
+    cell_parameters : tuple
+        Lengths `a`, `b`, `c` in Angstrom and angles `alpha`, `beta`, `gamma` in degrees.
+    """
+    values = {}
+    with open(cif_filename, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) >= 2 and fields[0] in CELL_TAGS:
+                values[fields[0]] = float(fields[1].split('(')[0])
+                if len(values) == len(CELL_TAGS):
+                    break
+
+    missing_tags = [tag for tag in CELL_TAGS if tag not in values]
+    if missing_tags:
+        raise ValueError(f'{", ".join(missing_tags)} not found in {cif_filename}.')
+
+    return tuple(values[tag] for tag in CELL_TAGS)
+
+
+def calculate_cell_geometry_batch(cell_parameters: np.ndarray
+                                  ) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate the cell matrices, volumes and perpendicular widths of many unit cells at once.
+
+    Uses the same conventions as `CellGeometry` on a (N, 6) batch of cell parameters.
+
+    Parameters
+    ----------
+    cell_parameters : array
+        (N, 6) array with the lengths `a`, `b`, `c` in Angstrom and angles `alpha`, `beta`,
+        `gamma` in degrees of each cell.
+
+    Returns
+    -------
+    cell_matrices : array
+        (N, 3, 3) array with the cell vectors of each cell as rows.
+    volumes : array
+        (N,) array with the volume of each cell.
+    perpendicular_widths : array
+        (N, 3) array with the perpendicular widths in the directions of `b x c`, `c x a` and
+        `a x b` of each cell.
+    """
+    a, b, c = np.asarray(cell_parameters, dtype=float)[:, :3].T
+    alpha, beta, gamma = np.asarray(cell_parameters, dtype=float)[:, 3:].T * np.pi / 180.0
+
+    # Calculate the nu value
+    nu = (np.cos(alpha) - np.cos(gamma) * np.cos(beta)) / np.sin(gamma)
+
+    # Build the transformation matrices
+    cell_matrices = np.zeros((len(a), 3, 3))
+    cell_matrices[:, 0, 0] = a
+    cell_matrices[:, 1, 0] = b * np.cos(gamma)
+    cell_matrices[:, 1, 1] = b * np.sin(gamma)
+    cell_matrices[:, 2, 0] = c * np.cos(beta)
+    cell_matrices[:, 2, 1] = c * nu
+    cell_matrices[:, 2, 2] = c * np.sqrt(1.0 - np.cos(beta)**2 - nu**2)
+
+    # Cross products bxc, cxa and axb of every cell
+    cross_products = np.cross(np.roll(cell_matrices, -1, axis=1),
+                              np.roll(cell_matrices, -2, axis=1))
+
+    # Calculates the volumes and perpendicular widths of the unit cells
+    volumes = np.einsum('ij,ij->i', cross_products[:, 2], cell_matrices[:, 2])
+    perpendicular_widths = volumes[:, np.newaxis] / np.linalg.norm(cross_products, axis=2)
+
+    return cell_matrices, volumes, perpendicular_widths
+
+
+def calculate_perpendicular_widths(cif_filename: typing.Union[str, CellGeometry]
+                                   ) -> typing.Tuple[float, float, float]:
 
     """
     This finction calculate the perpendicular widths of the unit cell.
@@ -23,8 +234,8 @@ def calculate_perpendicular_widths(cif_filename: str) -> typing.Tuple[float, flo
 
     Parameters
     ----------
-    cif_filename : string
-        Name of the cif file.
+    cif_filename : string or CellGeometry
+        Name of the cif file or its cell geometry.
 
     Returns
     -------
@@ -35,48 +246,18 @@ def calculate_perpendicular_widths(cif_filename: str) -> typing.Tuple[float, flo
     p_width_3: float
         Perpendicular width in the direction of `c x a`.
     """
-    # Read data from CIF file
-    cif = gemmi.cif.read_file(cif_filename).sole_block()
-    a = float(cif.find_value('_cell_length_a').split('(')[0])
-    b = float(cif.find_value('_cell_length_b').split('(')[0])
-    c = float(cif.find_value('_cell_length_c').split('(')[0])
-    beta = float(cif.find_value('_cell_angle_beta').split('(')[0]) * np.pi / 180.0
-    gamma = float(cif.find_value('_cell_angle_gamma').split('(')[0]) * np.pi / 180.0
-    alpha = float(cif.find_value('_cell_angle_alpha').split('(')[0]) * np.pi / 180.0
+    return get_cell_geometry(cif_filename).perpendicular_widths
 
-    # Calculate the nu value
-    nu = (np.cos(alpha) - np.cos(gamma) * np.cos(beta)) / np.sin(gamma)
-
-    # Build the transformation matrix as a numpy array
-    CellBox = np.array([[a, 0.0, 0.0],
-                        [b * np.cos(gamma), b * np.sin(gamma), 0.0],
-                        [c * np.cos(beta), c * nu, c * np.sqrt(1.0 - np.cos(beta)**2 - nu**2)]])
-
-    # Calculate the cross products
-    axb = np.cross(CellBox[0], CellBox[1])
-    bxc = np.cross(CellBox[1], CellBox[2])
-    cxa = np.cross(CellBox[2], CellBox[0])
-
-    # Calculates the volume of the unit cell
-    V = np.dot(np.cross(CellBox[0], CellBox[1]), CellBox[2])
 
-    # Calculate perpendicular widths
-    p_width_1 = V / np.linalg.norm(bxc)
-    p_width_2 = V / np.linalg.norm(cxa)
-    p_width_3 = V / np.linalg.norm(axb)
-
-    return p_width_1, p_width_2, p_width_3
-
-
-def calculate_UnitCells(cif_filename: str, cutoff: float) -> str:
+def calculate_UnitCells(cif_filename: typing.Union[str, CellGeometry], cutoff: float) -> str:
     """
     Calculate the number of unit cell repetitions so that all supercell lengths are larger than
     twice the interaction potential cut-off radius.
 
     Parameters
     ----------
-    cif_filename : string
-        Name of the cif file.
+    cif_filename : string or CellGeometry
+        Name of the cif file or its cell geometry.
     cutoff : float
         Cut-off radius.
 
@@ -85,18 +266,12 @@ def calculate_UnitCells(cif_filename: str, cutoff: float) -> str:
     unit_cells : string
         String with the number of unit cells in each direction.
     """
-
-    # Calculate the perpendicular widths
-    p_width_1, p_width_2, p_width_3 = calculate_perpendicular_widths(cif_filename)
-
-    # Calculate UnitCells string
-    uc_array = np.ceil(2.0 * cutoff / np.array([p_width_1, p_width_2, p_width_3])).astype(int)
-    unit_cells = ' '.join(map(str, uc_array))
-
-    return unit_cells
+    return get_cell_geometry(cif_filename).unit_cells(cutoff)
 
 
-def calculate_NumberOfMolecules(cif_filename: str, cutoff: float, unitcells: str) -> int:
+def calculate_NumberOfMolecules(cif_filename: typing.Union[str, CellGeometry],
+                                cutoff: float,
+                                unitcells: str) -> int:
     """
     Calculate the number of molecules in the simulation box to ensure that
     there is at least `UnitCell` / `CutOff**3` molecules per unit cell.
@@ -105,8 +280,8 @@ def calculate_NumberOfMolecules(cif_filename: str, cutoff: float, unitcells: str
 
     Parameters
     ----------
-    cif_filename : string
-        Name of the cif file.
+    cif_filename : string or CellGeometry
+        Name of the cif file or its cell geometry.
     cutoff : float
         Cut-off radius.
     unitcells : str
@@ -116,34 +291,7 @@ def calculate_NumberOfMolecules(cif_filename: str, cutoff: float, unitcells: str
     -------
     number_of_molecules : int
     """
-
-    # Read data from CIF file
-    cif = gemmi.cif.read_file(cif_filename).sole_block()
-    a = float(cif.find_value('_cell_length_a').split('(')[0])
-    b = float(cif.find_value('_cell_length_b').split('(')[0])
-    c = float(cif.find_value('_cell_length_c').split('(')[0])
-    beta = float(cif.find_value('_cell_angle_beta').split('(')[0]) * np.pi / 180.0
-    gamma = float(cif.find_value('_cell_angle_gamma').split('(')[0]) * np.pi / 180.0
-    alpha = float(cif.find_value('_cell_angle_alpha').split('(')[0]) * np.pi / 180.0
-
-    # Calculate the nu value
-    nu = (np.cos(alpha) - np.cos(gamma) * np.cos(beta)) / np.sin(gamma)
-
-    # Build the transformation matrix as a numpy array
-    CellBox = np.array([[a, 0.0, 0.0],
-                        [b * np.cos(gamma), b * np.sin(gamma), 0.0],
-                        [c * np.cos(beta), c * nu, c * np.sqrt(1.0 - np.cos(beta)**2 - nu**2)]])
-
-    # Calculates the volume of the unit cell
-    V = np.dot(np.cross(CellBox[0], CellBox[1]), CellBox[2])
-
-    # Get the mumber of unit cells
-    unitcells_array = np.array(unitcells.split(' ')).astype(int)
-
-    # Calculate the number of molecules
-    NumberOfMolecules = int(np.round(np.prod(unitcells_array) * V / (cutoff)**3))
-
-    return NumberOfMolecules
+    return get_cell_geometry(cif_filename).number_of_molecules(cutoff, unitcells)
 
 
 def calculate_grid(composition: dict) -> typing.Tuple[str, int]:
@@ -202,6 +350,76 @@ def linear(x, slope, intercept):
     return slope * x + intercept
 
 
+def linear_fit_blocks(x: np.ndarray,
+                      y: np.ndarray,
+                      columns: np.ndarray,
+                      starts: np.ndarray,
+                      ends: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Least-squares linear fit of many blocks of data at once.
+
+    The sums needed by the normal equations of every block are differences of prefix sums, so all
+    blocks are fitted in closed form with O(n) work on the whole data. Non-finite points, e.g. the
+    logarithm of a zero time or MSD, are left out of the fits.
+
+    Parameters
+    ----------
+    x : array
+        1D array with the independent variable.
+    y : array
+        2D array with one dependent variable per column.
+    columns : array
+        Column of `y` fitted on each block.
+    starts : array
+        First index of each block.
+    ends : array
+        Index after the last point of each block.
+
+    Returns
+    -------
+    slope : array
+        Slope of the linear fit of each block.
+    intercept : array
+        Intercept of the linear fit of each block.
+    slope_error : array
+        Standard error of the slope of each block, as the one reported by `curve_fit`.
+    '''
+    columns, starts, ends = np.asarray(columns), np.asarray(starts), np.asarray(ends)
+
+    # Points of each column left out of the sums
+    x = np.broadcast_to(np.asarray(x, dtype=float)[:, np.newaxis], y.shape)
+    finite = np.isfinite(x) & np.isfinite(y)
+    number_of_finite = np.maximum(finite.sum(axis=0), 1)
+
+    # Centre the data to keep the differences of sums well conditioned
+    x_mean = np.where(finite, x, 0.0).sum(axis=0) / number_of_finite
+    y_mean = np.where(finite, y, 0.0).sum(axis=0) / number_of_finite
+    xc = np.where(finite, x - x_mean, 0.0)
+    yc = np.where(finite, y - y_mean, 0.0)
+
+    def block_sums(values):
+        prefix_sum = np.concatenate([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+        return prefix_sum[ends, columns] - prefix_sum[starts, columns]
+
+    n = block_sums(finite.astype(float))
+    sum_x = block_sums(xc)
+    sum_y = block_sums(yc)
+
+    # Sums of squares and cross products around the mean of each block
+    sxx = block_sums(xc**2) - sum_x**2 / n
+    sxy = block_sums(xc * yc) - sum_x * sum_y / n
+    syy = block_sums(yc**2) - sum_y**2 / n
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = sxy / sxx
+        intercept = y_mean[columns] + sum_y / n - slope * (x_mean[columns] + sum_x / n)
+
+        residuals = np.maximum(syy - slope * sxy, 0.0)
+        slope_error = np.sqrt(residuals / (n - 2) / sxx)
+
+    return slope, intercept, slope_error
+
+
 def find_diffusion_regime(time,
                           msd,
                           slope_target=1.0,
@@ -210,24 +428,28 @@ def find_diffusion_regime(time,
     This function search the region on the MSD data where the Einstein model
     for diffusion can be applied.
 
+    The MSD may be a 2D array with one direction per column, in which case all directions are
+    handled in one call and arrays are returned.
+
     Parameters
     ----------
     time : array
         Time array.
     msd : array
-        Mean Squared Displacement array.
-    slope_target : float, optional
-        Slope of the linear fit to the MSD data. The default is 1.0.
+        Mean Squared Displacement array, 1D or 2D with one direction per column.
+    slope_target : float or array, optional
+        Slope of the linear fit to the MSD data, for all columns or for each one. The default is
+        1.0.
     pore_limiting_diameter : float, optional
         Pore limiting diameter. The default is 0.0.
 
     Returns
     -------
-    diffusion_start : float
+    diffusion_start : int or array
         Start position of the diffusion regime.
-    diffusion_end : float
+    diffusion_end : int or array
         End position of the diffusion regime.
-    block_slope : float
+    block_slope : float or array
         Slope of the linear fit to the log(MSD) data.
     '''
 
@@ -235,51 +457,62 @@ def find_diffusion_regime(time,
     time_log = np.log10(time)
     msd_log = np.log10(msd)
 
-    # compute second derivative of MSD
-    second_d = np.gradient(np.gradient(msd_log))
+    is_1d = msd_log.ndim == 1
+    msd_log = msd_log.reshape(len(msd_log), -1)
+    number_of_columns = msd_log.shape[1]
+    slope_target = np.broadcast_to(slope_target, number_of_columns)
 
-    # Find the peaks in the second derivate
-    peaks, _ = find_peaks(second_d, distance=15)
+    # compute second derivative of MSD
+    second_d = np.gradient(np.gradient(msd_log, axis=0), axis=0)
 
-    # Add the last point on the list if it generates a block with more than 15 points
-    if len(msd_log[peaks[-1]:]) > 15:
-        peaks = np.append(peaks, [len(msd_log)], axis=0)
+    # Split the data of each column into blocks
+    columns, starts, ends = [], [], []
+    for j in range(number_of_columns):
 
-    # Split the data into blocks
-    block_dict = {}
+        # Find the peaks in the second derivate
+        peaks, _ = find_peaks(second_d[:, j], distance=15)
 
-    start = 0
-    for i, peak in enumerate(peaks):
+        # Add the last point on the list if it generates a block with more than 15 points
+        if len(msd_log[peaks[-1]:]) > 15:
+            peaks = np.append(peaks, [len(msd_log)], axis=0)
 
-        # Calculate the inclination in the block data
-        slope, intercept = np.polyfit(time_log[start:peak], msd_log[start:peak], 1)
+        columns += [j] * len(peaks)
+        starts += [0] + list(peaks[:-1])
+        ends += list(peaks)
 
-        # Store the block data
-        block_dict[i] = {'time': time_log[start:peak],
-                         'msd': msd_log[start:peak],
-                         'start': start,
-                         'end': peak,
-                         'is_valid': max(msd[start:peak]) > pore_limiting_diameter**2,
-                         'slope': slope,
-                         'intercept': intercept}
+    columns, starts, ends = np.array(columns), np.array(starts), np.array(ends)
 
-        # Update the start position
-        start = peak
+    # Calculate the inclination in the data of all blocks
+    slopes, _, _ = linear_fit_blocks(time_log, msd_log, columns, starts, ends)
 
     # Find the block with the slope closest to slope_target
-    block_index = np.argmin([abs(block_dict[i]['slope'] - slope_target) for i in block_dict])
+    distance = np.abs(slopes - slope_target[columns])
+    distance[np.isnan(distance)] = np.inf
+
+    diffusion_start = np.empty(number_of_columns, dtype=int)
+    diffusion_end = np.empty(number_of_columns, dtype=int)
+    block_slope = np.empty(number_of_columns)
+    for j in range(number_of_columns):
+        blocks = np.flatnonzero(columns == j)
+        block_index = blocks[np.argmin(distance[blocks])]
 
-    diffusion_start = block_dict[block_index]['start']
-    diffusion_end = block_dict[block_index]['end']
-    block_slope = block_dict[block_index]['slope']
+        diffusion_start[j] = starts[block_index]
+        diffusion_end[j] = ends[block_index]
+        block_slope[j] = slopes[block_index]
+
+    if is_1d:
+        return int(diffusion_start[0]), int(diffusion_end[0]), block_slope[0]
 
     return diffusion_start, diffusion_end, block_slope
 
 
-def calculate_directional_self_diffusivity(time, msd, cif_filename) -> typing.Tuple[float, float]:
+def calculate_self_diffusivity(time,
+                               msd,
+                               cif_filename: typing.Union[str, CellGeometry]
+                               ) -> typing.Tuple[list, list]:
     '''
-    Calculates the self-diffusivity (D) in a specific direction in space using the
-    least-squares regression on the MSD curve.
+    Calculates the self-diffusivity (D) on every direction of a 2D MSD array at once, using the
+    least-squares regression on the MSD curves.
 
     MSD(t) = a * t + b
 
@@ -290,61 +523,94 @@ def calculate_directional_self_diffusivity(time, msd, cif_filename) -> typing.Tu
     time : array
         Array containing the simulation time in ps
     msd : array
-        Array containing the Mean Squared Distance on a specific direction in Å^2
-    cif_filename : string
-        Name of the cif file.
+        2D array containing the Mean Squared Distance on each direction (columns) in Å^2
+    cif_filename : string or CellGeometry
+        Name of the cif file or its cell geometry.
 
     Returns
     -------
-    D: float
-        Self diffusivity in units of m^2/s
-    D_sd : float
-        Error of the self-diffusivity fit in units of m^2/s
+    D: list
+        Self diffusivity of each direction in units of m^2/s, or None if it failed.
+    D_sd : list
+        Error of the self-diffusivity fit of each direction in units of m^2/s, or None if it
+        failed.
     '''
 
     # Calculate the maximum perpendicular width of unit cell (in Angstrom)
     pld = max(calculate_perpendicular_widths(cif_filename))
 
     # Check if the maximum value of MSD indicates diffusion
-    if max(msd) > pld**2:
-        # Find the correct region to fit the Einstein equation
-        start, end, slope = find_diffusion_regime(time,
-                                                  msd,
-                                                  pore_limiting_diameter=pld)
+    max_msd = np.max(msd, axis=0)
+    is_diffusive = max_msd > pld**2
+
+    # Find the correct region to fit the Einstein equation
+    start, end, slope = find_diffusion_regime(time,
+                                              msd,
+                                              slope_target=np.where(is_diffusive, 1.0, 0.0),
+                                              pore_limiting_diameter=pld)
+
+    # Fit a linear function to the msd data of all directions
+    fit_slope, _, fit_error = linear_fit_blocks(time, msd, np.arange(msd.shape[1]), start, end)
+
+    D = [None] * msd.shape[1]
+    D_sd = [None] * msd.shape[1]
+    for j in range(msd.shape[1]):
+        if is_diffusive[j]:
+            if abs(slope[j] - 1) < 0.4:
+                # Convert to units of m^2/s
+                D[j] = fit_slope[j] / 2 * 1e-8
+                D_sd[j] = fit_error[j] * 1e-8
+
+            else:
+                print('Failed to find a region with normal diffusive regime!')
+                print(f'Closest slope to 1 is {slope[j]}. '
+                      'You may need to increase the NumberOfCycles.')
 
-        if abs(slope - 1) < 0.4:
-            # Fit a linear function to the msd data
-            [slope, _], pcov = curve_fit(linear, time[start:end], msd[start:end])
-            perr = np.sqrt(np.diag(pcov))
+        else:
+            print(f'Max MSD is {max_msd[j]}, shoud be greater the {pld**2}.')
 
-            # Convert to units of m^2/s
-            D = slope / 2 * 1e-8
-            D_sd = perr[0] * 1e-8
+            if abs(slope[j] - 0.0) < 0.4:
+                print('Molecule is in confined diffusion regime! Ds = Dc')
+                # Calculate the assintotic value of Dc and convert to units of m^2/s
+                D[j] = np.mean(msd[start[j]:end[j], j]) * 1e-20
+                D_sd[j] = np.std(msd[start[j]:end[j], j]) * 1e-20
 
-            return D, D_sd
+            else:
+                print('Failed to find a region with confined diffusive regime!')
+                print(f'Closest slope to 0 is {slope[j]}. '
+                      'You may need to increase the NumberOfCycles.')
 
-        else:
-            print('Failed to find a region with normal diffusive regime!')
-            print(f'Closest slope to 1 is {slope}. You may need to increase the NumberOfCycles.')
-            return None, None
-
-    else:
-        print(f'Max MSD is {max(msd)}, shoud be greater the {pld**2}.')
-        # Fit a linear function to the msd data
-        start, end, slope = find_diffusion_regime(time,
-                                                  msd,
-                                                  slope_target=0.0,
-                                                  pore_limiting_diameter=pld)
-
-        if abs(slope - 0.0) < 0.4:
-            print('Molecule is in confined diffusion regime! Ds = Dc')
-            # Calculate the assintotic value of Dc and convert to units of m^2/s
-            D = np.mean(msd[start:end]) * 1e-20
-            D_sd = np.std(msd[start:end]) * 1e-20
-
-            return D, D_sd
+    return D, D_sd
 
-        else:
-            print('Failed to find a region with confined diffusive regime!')
-            print(f'Closest slope to 0 is {slope}. You may need to increase the NumberOfCycles.')
-            return None, None
+
+def calculate_directional_self_diffusivity(time,
+                                           msd,
+                                           cif_filename: typing.Union[str, CellGeometry]
+                                           ) -> typing.Tuple[float, float]:
+    '''
+    Calculates the self-diffusivity (D) in a specific direction in space using the
+    least-squares regression on the MSD curve.
+
+    MSD(t) = a * t + b
+
+    D = a / 2
+
+    Parameters
+    ----------
+    time : array
+        Array containing the simulation time in ps
+    msd : array
+        Array containing the Mean Squared Distance on a specific direction in Å^2
+    cif_filename : string or CellGeometry
+        Name of the cif file or its cell geometry.
+
+    Returns
+    -------
+    D: float
+        Self diffusivity in units of m^2/s
+    D_sd : float
+        Error of the self-diffusivity fit in units of m^2/s
+    '''
+    D, D_sd = calculate_self_diffusivity(time, np.asarray(msd)[:, np.newaxis], cif_filename)
+
+    return D[0], D_sd[0]
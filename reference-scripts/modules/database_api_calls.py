@@ -2,28 +2,126 @@
 # © Copyright IBM Corp. 2021 All Rights Reserved
 
 import os
+import typing
 
 import requests
 
 
+def database_api_configured() -> bool:
+    """
+    Returns True if the database-api is reachable, either through the `INGRESS_SUBDOMAIN` of the
+    cluster or through an explicit `DATABASE_API_URL` (e.g. a local stand-in server).
+    """
+    if os.environ.get('DATABASE_API_URL'):
+        return True
+
+    return os.environ.get('INGRESS_SUBDOMAIN') not in [None, '', '${INGRESS}']
+
+
 def _url(path: str) -> str:
     """
     Returns the full endpoint URL by composing it with the base API URL.
+
+    The base URL can be overridden with the `DATABASE_API_URL` environment variable.
     """
-    return f'http://database-api.{os.environ["INGRESS_SUBDOMAIN"]}' + path
+    base_url = os.environ.get('DATABASE_API_URL')
+    if not base_url:
+        base_url = f'http://database-api.{os.environ["INGRESS_SUBDOMAIN"]}'
+
+    return base_url.rstrip('/') + path
 
 
-def get_objectID(materialName: str, materialSource: str) -> str:
+def get_material(materialName: str,
+                 materialSource: str,
+                 session: typing.Optional[requests.Session] = None) -> requests.models.Response:
     """
-    Retrieves the unique ObjectID of a material using a GET call.
+    Retrieves the records of a material using a GET call.
     """
     url = _url(f'/materials?name={materialName}&source={materialSource}')
-    response = requests.get(url).json()
+    return (session or requests).get(url)
+
+
+def list_materials(session: typing.Optional[requests.Session] = None) -> requests.models.Response:
+    """
+    Retrieves the records of all materials using a single GET call.
+    """
+    return (session or requests).get(_url('/materials'))
+
+
+def get_objectID(materialName: str,
+                 materialSource: str,
+                 session: typing.Optional[requests.Session] = None) -> str:
+    """
+    Retrieves the unique ObjectID of a material using a GET call.
+    """
+    response = get_material(materialName, materialSource, session).json()
     materials = response['materials']
     objectID = materials[0]['_id']
     return objectID
 
 
+def tDependentProp(name: str,
+                   provenance: str,
+                   temperature: float,
+                   composition: list[dict],
+                   data: list[dict]) -> dict:
+    """
+    Builds the body of a t-dependent property.
+    """
+    return {'name': str(name),
+            'provenance': str(provenance),
+            'temperature': float(temperature),
+            'composition': composition,
+            'data': data}
+
+
+def pDependentProp(name: str,
+                   provenance: str,
+                   pressure: float,
+                   composition: list[dict],
+                   data: list[dict]) -> dict:
+    """
+    Builds the body of a p-dependent property.
+    """
+    return {'name': str(name),
+            'provenance': str(provenance),
+            'pressure': float(pressure),
+            'composition': composition,
+            'data': data}
+
+
+def constantProp(name: str,
+                 RMSE: float,
+                 provenance: str,
+                 data: list[dict],
+                 pressures: float,
+                 temperatures: float,
+                 composition: list[dict]) -> dict:
+    """
+    Builds the body of a constant property.
+    """
+    return {'name': str(name),
+            'provenance': str(provenance),
+            'pressures': float(pressures),
+            'temperatures': float(temperatures),
+            'data': data,
+            'RMSE': float(RMSE),
+            'composition': composition}
+
+
+def post_thermodynamicProp(id: str,
+                           kind: str,
+                           thermoProp: dict,
+                           session: typing.Optional[requests.Session] = None,
+                           headers: typing.Optional[dict] = None) -> requests.models.Response:
+    """
+    Inserts a thermodynamic property of a given kind ('t-dependent', 'p-dependent' or
+    'constant') for a given material ID using a POST call.
+    """
+    url = _url(f'/materials/{id}/thermodynamic-properties/{kind}')
+    return (session or requests).post(url, json=thermoProp, headers=headers)
+
+
 def post_tDependentProp(id: str,
                         name: str,
                         provenance: str,
@@ -33,13 +131,8 @@ def post_tDependentProp(id: str,
     """
     Inserts a t-dependent property for a given material ID using a POST call.
     """
-    url = _url(f'/materials/{id}/thermodynamic-properties/t-dependent')
-    thermoProp = {'name': str(name),
-                  'provenance': str(provenance),
-                  'temperature': float(temperature),
-                  'composition': composition,
-                  'data': data}
-    return requests.post(url, json=thermoProp)
+    thermoProp = tDependentProp(name, provenance, temperature, composition, data)
+    return post_thermodynamicProp(id, 't-dependent', thermoProp)
 
 
 def post_pDependentProp(id: str,
@@ -51,13 +144,8 @@ def post_pDependentProp(id: str,
     """
     Inserts a p-dependent property for a given material ID using a POST call.
     """
-    url = _url(f'/materials/{id}/thermodynamic-properties/p-dependent')
-    thermoProp = {'name': str(name),
-                  'provenance': str(provenance),
-                  'pressure': float(pressure),
-                  'composition': composition,
-                  'data': data}
-    return requests.post(url, json=thermoProp)
+    thermoProp = pDependentProp(name, provenance, pressure, composition, data)
+    return post_thermodynamicProp(id, 'p-dependent', thermoProp)
 
 
 def post_constantProp(id: str,
@@ -71,12 +159,5 @@ def post_constantProp(id: str,
     """
     Inserts a constant property for a given material ID using a POST call.
     """
-    url = _url(f'/materials/{id}/thermodynamic-properties/constant')
-    thermoProp = {'name': str(name),
-                  'provenance': str(provenance),
-                  'pressures': float(pressures),
-                  'temperatures': float(temperatures),
-                  'data': data,
-                  'RMSE': float(RMSE),
-                  'composition': composition}
-    return requests.post(url, json=thermoProp)
+    thermoProp = constantProp(name, RMSE, provenance, data, pressures, temperatures, composition)
+    return post_thermodynamicProp(id, 'constant', thermoProp)
@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import typing
+
+import numpy as np
+import pymser
+
+from modules import mser
+
+# MSER settings of the Equilibrate component of the workflows, which runs equilibrate.sh -l:
+# equilibrate.py with --LLM and the default batch size
+EQUILIBRATE_LLM = True
+EQUILIBRATE_BATCH_SIZE = 5
+
+
+def equilibrate_observable(data: np.ndarray,
+                           LLM: bool = False,
+                           batch_size: int = 1,
+                           uncertainty: str = 'uSD',
+                           print_results: bool = True) -> dict:
+    """
+    Apply MSER to a single observable and keep the scalar results written to `stats_*.csv`.
+
+    Parameters
+    ----------
+    data : array
+        Time series of the observable.
+    LLM : bool, optional
+        Use the LLM version of MSER. The default is False.
+    batch_size : int, optional
+        Size of batch to take the average. The default is 1.
+    uncertainty : str, optional
+        Version of the uncertainty: 'SD', 'SE', 'uSD' or 'uSE'. The default is 'uSD'.
+    print_results : bool, optional
+        Print the results of MSER and ADF test. The default is True.
+
+    Returns
+    -------
+    results : dict
+        Average, uncertainty, start of equilibrated data, autocorrelation time and number of
+        uncorrelated samples.
+    """
+    results = pymser.equilibrate(input_data=data,
+                                 LLM=LLM,
+                                 batch_size=batch_size,
+                                 ADF_test=True,
+                                 uncertainty=uncertainty,
+                                 print_results=print_results)
+
+    return {'average': results['average'],
+            'uncertainty': results['uncertainty'],
+            't0': results['t0'],
+            'ac_time': results['ac_time'],
+            'uncorrelated_samples': results['uncorr_samples']}
+
+
+def average_observable(data: np.ndarray, t0: int, uncertainty: str = 'uSD') -> dict:
+    """
+    Calculate the average of an observable over the data equilibrated from `t0` onwards.
+
+    Parameters
+    ----------
+    data : array
+        Time series of the observable.
+    t0 : int
+        Index of the start of equilibrated data.
+    uncertainty : str, optional
+        Version of the uncertainty: 'SD', 'SE', 'uSD' or 'uSE'. The default is 'uSD'.
+
+    Returns
+    -------
+    results : dict
+        Average, uncertainty, start of equilibrated data, autocorrelation time and number of
+        uncorrelated samples.
+    """
+    # Calculate autocorrelation time and the number of uncorrelated samples
+    equilibrated = data[t0:]
+    ac_time, uncorr_samples = pymser.calc_autocorrelation_time(equilibrated)
+
+    # Get the equilibrated averages and standard deviation
+    average, avg_uncertainty = pymser.calc_equilibrated_average(data=data,
+                                                                eq_index=t0,
+                                                                uncertainty=uncertainty,
+                                                                ac_time=ac_time)
+
+    return {'average': average,
+            'uncertainty': avg_uncertainty,
+            't0': t0,
+            'ac_time': ac_time,
+            'uncorrelated_samples': uncorr_samples}
+
+
+def equilibrate_block(data: np.ndarray,
+                      global_column: typing.Optional[int] = None,
+                      LLM: bool = False,
+                      batch_size: int = 1,
+                      uncertainty: str = 'uSD',
+                      print_results: bool = True,
+                      autocorrelation: str = 'pymser') -> typing.List[dict]:
+    """
+    Apply the vectorized MSER engine to every observable of a pressure at once.
+
+    Parameters
+    ----------
+    data : array
+        2D array with cycles as rows and observables as columns.
+    global_column : int, optional
+        Column used to find a global start of equilibrated data for all observables, which are
+        then averaged from it as in `average_observable`. By default every observable is
+        equilibrated individually.
+    LLM : bool, optional
+        Use the LLM version of MSER. The default is False.
+    batch_size : int, optional
+        Size of batch to take the average. The default is 1.
+    uncertainty : str, optional
+        Version of the uncertainty: 'SD', 'SE', 'uSD' or 'uSE'. The default is 'uSD'.
+    print_results : bool, optional
+        Print a summary of the results of MSER. The default is True.
+    autocorrelation : str, optional
+        Estimator of the autocorrelation time, 'pymser' or 'integrated', see `mser.equilibrate`.
+        The default is 'pymser'.
+
+    Returns
+    -------
+    results : list
+        One dictionary per column, with the same keys and value types as `equilibrate_observable`.
+    """
+    eq_index = None
+    if global_column is not None:
+        # Apply the MSER to get the index of the start of equilibrated data
+        results_global = mser.equilibrate(data[:, [global_column]],
+                                          LLM=LLM,
+                                          batch_size=batch_size,
+                                          uncertainty=uncertainty,
+                                          print_results=print_results,
+                                          autocorrelation=autocorrelation)
+        eq_index = np.full(data.shape[1], results_global['t0'][0])
+
+    results = mser.equilibrate(data,
+                               LLM=LLM,
+                               batch_size=batch_size,
+                               uncertainty=uncertainty,
+                               eq_index=eq_index,
+                               print_results=print_results and global_column is None,
+                               autocorrelation=autocorrelation)
+
+    results_list = []
+    for i in range(data.shape[1]):
+        t0 = int(results['t0'][i]) if np.isfinite(results['t0'][i]) else np.nan
+        ac_time = results['ac_time'][i]
+        uncorr_samples = results['uncorr_samples'][i]
+
+        # Columns filled with zeros have integer autocorrelation results, as in pymser
+        if ac_time == 0:
+            ac_time, uncorr_samples = 0, 0
+
+        results_list.append({'average': results['average'][i],
+                             'uncertainty': results['uncertainty'][i],
+                             't0': t0,
+                             'ac_time': ac_time,
+                             'uncorrelated_samples': uncorr_samples})
+
+    return results_list
@@ -0,0 +1,240 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import csv
+import glob
+import os
+import typing
+
+import numpy as np
+
+from modules.calculate_properties import (CellGeometry, calculate_cell_geometry_batch,
+                                          read_cell_parameters)
+from modules.parallel import starmap
+
+GEOMETRY_INDEX_FILENAME = 'cell_geometry_index.csv'
+
+# Columns of the index table. Rows are keyed by `Source/Name`
+CELL_PARAMETER_COLUMNS = ['a', 'b', 'c', 'alpha', 'beta', 'gamma']
+FLOAT_COLUMNS = CELL_PARAMETER_COLUMNS + ['Volume',
+                                          'PerpendicularWidth1',
+                                          'PerpendicularWidth2',
+                                          'PerpendicularWidth3',
+                                          'Cutoff']
+INTEGER_COLUMNS = ['mtime_ns', 'size', 'NumberOfMolecules']
+INDEX_COLUMNS = (['Key', 'Source', 'Name', 'mtime_ns', 'size']
+                 + FLOAT_COLUMNS
+                 + ['UnitCells', 'NumberOfMolecules'])
+
+
+def find_cif_files(database_folder: str) -> typing.List[typing.Tuple[str, str, str]]:
+    """
+    List the CIF files of a `nanopore-database` tree, laid out as `Source/Name.cif`.
+
+    Parameters
+    ----------
+    database_folder : string
+        Root folder of the database.
+
+    Returns
+    -------
+    cif_files : list
+        Tuples with the source, name and path of every CIF file, sorted by source and name.
+    """
+    cif_files = []
+    for cif_filename in sorted(glob.glob(os.path.join(database_folder, '*', '*.cif'))):
+        source = os.path.basename(os.path.dirname(cif_filename))
+        name = os.path.splitext(os.path.basename(cif_filename))[0]
+        cif_files.append((source, name, cif_filename))
+
+    return cif_files
+
+
+def read_geometry_index(index_filename: str) -> typing.Dict[str, dict]:
+    """
+    Read a cell geometry index table.
+
+    Parameters
+    ----------
+    index_filename : string
+        Name of the index file.
+
+    Returns
+    -------
+    index : dict
+        Rows of the table keyed by `Source/Name`, with numeric columns converted.
+    """
+    index = {}
+    with open(index_filename, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            for column in INTEGER_COLUMNS:
+                row[column] = int(row[column])
+            for column in FLOAT_COLUMNS:
+                row[column] = float(row[column])
+            index[row['Key']] = row
+
+    return index
+
+
+def write_geometry_index(index_filename: str, index: typing.Dict[str, dict]) -> None:
+    """
+    Write a cell geometry index table, sorted by `Source/Name`.
+
+    Parameters
+    ----------
+    index_filename : string
+        Name of the index file.
+    index : dict
+        Rows of the table keyed by `Source/Name`.
+    """
+    with open(index_filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=INDEX_COLUMNS)
+        writer.writeheader()
+        for key in sorted(index):
+            writer.writerow({column: repr(value) if isinstance(value, float) else value
+                             for column, value in index[key].items()})
+
+
+def try_read_cell_parameters(cif_filename: str
+                             ) -> typing.Tuple[typing.Optional[typing.Tuple[float, ...]], str]:
+    """
+    Read the cell parameters of a CIF file, returning the error instead of raising it so that one
+    malformed file does not abort a batch.
+
+    Returns
+    -------
+    cell_parameters : tuple or None
+        Cell parameters, or None if the file could not be read.
+    error : string
+        Description of the error, empty on success.
+    """
+    try:
+        return read_cell_parameters(cif_filename), ''
+    except (OSError, UnicodeDecodeError, ValueError) as error:
+        return None, str(error)
+
+
+def build_geometry_index(database_folder: str,
+                         cutoff: float,
+                         workers: typing.Optional[int] = None,
+                         previous_index: typing.Optional[typing.Dict[str, dict]] = None
+                         ) -> typing.Dict[str, dict]:
+    """
+    Calculate the cell geometry of every CIF file of a `nanopore-database` tree.
+
+    The `_cell_*` tags are read with a pool of processes and the geometry of all cells is
+    calculated at once as a (N, 3, 3) batch. Rows of a previous index with the same cut-off and
+    file modification time and size are reused without reading the file again. Files whose cell
+    parameters can not be read, or give an invalid cell, are left out of the index with a warning
+    and are read again by the next build.
+
+    Parameters
+    ----------
+    database_folder : string
+        Root folder of the database.
+    cutoff : float
+        Largest cut-off radius of the interaction potentials.
+    workers : int, optional
+        Number of processes reading the CIF files. Defaults to the available CPUs.
+    previous_index : dict, optional
+        Index previously returned by `read_geometry_index`.
+
+    Returns
+    -------
+    index : dict
+        Rows of the table keyed by `Source/Name`.
+    """
+    if previous_index is None:
+        previous_index = {}
+
+    index = {}
+    pending = []
+    for source, name, cif_filename in find_cif_files(database_folder):
+        key = f'{source}/{name}'
+        file_stat = os.stat(cif_filename)
+        row = {'Key': key,
+               'Source': source,
+               'Name': name,
+               'mtime_ns': file_stat.st_mtime_ns,
+               'size': file_stat.st_size}
+
+        previous_row = previous_index.get(key)
+        if (previous_row is not None
+                and all(previous_row[column] == row[column] for column in ['mtime_ns', 'size'])
+                and previous_row['Cutoff'] == cutoff):
+            index[key] = previous_row
+        else:
+            index[key] = row
+            pending.append((key, cif_filename))
+
+    if not pending:
+        return index
+
+    # Read the cell parameters of the new or modified files
+    results = starmap(try_read_cell_parameters,
+                      [(cif_filename,) for _, cif_filename in pending],
+                      workers)
+
+    keys = []
+    for (key, _), (parameters, error) in zip(pending, results):
+        if parameters is None:
+            print(f'Warning! Skipping {key}: {error}')
+            del index[key]
+        else:
+            keys.append(key)
+    if not keys:
+        return index
+
+    cell_parameters = np.array([parameters for parameters, _ in results if parameters is not None])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        _, volumes, perpendicular_widths = calculate_cell_geometry_batch(cell_parameters)
+
+    # Cells with impossible angles or zero lengths have no volume
+    is_valid = (np.isfinite(volumes) & (volumes > 0)
+                & np.all(np.isfinite(perpendicular_widths) & (perpendicular_widths > 0), axis=1))
+    for i in np.flatnonzero(~is_valid):
+        print(f'Warning! Skipping {keys[i]}: invalid cell parameters {cell_parameters[i].tolist()}')
+        del index[keys[i]]
+    volumes = np.where(is_valid, volumes, 0.0)
+    perpendicular_widths = np.where(is_valid[:, np.newaxis], perpendicular_widths, 1.0)
+
+    # Calculate unit cell repetitions and number of molecules of all cells
+    unit_cells = np.ceil(2.0 * cutoff / perpendicular_widths).astype(int)
+    number_of_molecules = np.round(np.prod(unit_cells, axis=1) * volumes / cutoff**3).astype(int)
+
+    for i in np.flatnonzero(is_valid):
+        key = keys[i]
+        index[key].update(zip(CELL_PARAMETER_COLUMNS, cell_parameters[i].tolist()))
+        index[key].update({'Volume': float(volumes[i]),
+                           'PerpendicularWidth1': float(perpendicular_widths[i, 0]),
+                           'PerpendicularWidth2': float(perpendicular_widths[i, 1]),
+                           'PerpendicularWidth3': float(perpendicular_widths[i, 2]),
+                           'Cutoff': float(cutoff),
+                           'UnitCells': ' '.join(map(str, unit_cells[i])),
+                           'NumberOfMolecules': int(number_of_molecules[i])})
+
+    return index
+
+
+def lookup_cell_geometry(index: typing.Dict[str, dict], source: str, name: str) -> CellGeometry:
+    """
+    Build the cell geometry of a material from the index, without reading its CIF file.
+
+    Parameters
+    ----------
+    index : dict
+        Index returned by `read_geometry_index`.
+    source : string
+        Source folder of the material in the database.
+    name : string
+        Name of the material.
+
+    Returns
+    -------
+    geometry : CellGeometry
+        Geometry of the unit cell.
+    """
+    row = index[f'{source}/{name}']
+
+    return CellGeometry(*[row[column] for column in CELL_PARAMETER_COLUMNS])
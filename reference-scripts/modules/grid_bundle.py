@@ -0,0 +1,239 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+import tempfile
+import typing
+import zlib
+
+from modules.grid_cache import COULOMB_GRID_NAME, VDW_GRID_RULES, framework_grid_path
+
+# Last member of a grid bundle, describing every grid in it
+MANIFEST_MEMBER = 'manifest.json'
+
+# Suffix of the compressed grid members
+COMPRESSED_EXTENSION = '.gz'
+
+# Size of the chunks streamed through the compressors
+CHUNK_SIZE = 1 << 20
+
+
+def describe_grid(grid_file: str) -> dict:
+    """
+    Describe a grid from its path relative to the framework folder of RASPA, without the
+    framework name prefix of the file name, e.g. `0.100000/C_co2_shifted.grid` or
+    `0.100000/4x3x3/Electrostatics_Ewald.grid`.
+
+    Returns
+    -------
+    description : dict
+        `path`, `type` (pseudo atom type, or `Electrostatics_Ewald` for the Coulomb grid),
+        `spacing` [Angstrom] and, for the Coulomb grid, `unit_cells`.
+    """
+    parts = grid_file.split(os.sep)
+    name = parts[-1][:-len('.grid')]
+
+    description = {'path': grid_file, 'type': name, 'spacing': float(parts[0])}
+    if name == COULOMB_GRID_NAME:
+        description['unit_cells'] = parts[1]
+    else:
+        for rule in VDW_GRID_RULES:
+            if name.endswith('_' + rule):
+                description['type'] = name[:-len(rule) - 1]
+
+    return description
+
+
+def write_bundle(bundle_filename: str,
+                 framework_name: str,
+                 grid_folder: str,
+                 compresslevel: int = 1) -> int:
+    """
+    Write the grids of a framework folder of RASPA into a grid bundle.
+
+    The bundle is an uncompressed tarball holding every grid as an independently gzip-compressed
+    member, followed by a MANIFEST_MEMBER listing the path, type, spacing, size and SHA-256
+    checksum of each grid. Listing an uncompressed tarball only reads the member headers, so
+    consumers extract the grids they need without decompressing the others. The bundle is
+    written to a temporary name and renamed when complete.
+
+    Parameters
+    ----------
+    bundle_filename : string
+        Name of the bundle, e.g. grids.tar.
+    framework_name : string
+        Name of the framework in the RASPA input files.
+    grid_folder : string
+        Grid folder of the force field, e.g. `default_grid_folder()`.
+    compresslevel : int, optional
+        gzip compression level of the grids. The default is 1, the fastest.
+
+    Returns
+    -------
+    number_of_grids : int
+    """
+    framework_folder = os.path.join(grid_folder, framework_name)
+    prefix = framework_name + '_'
+
+    grid_files = sorted(os.path.relpath(os.path.join(folder, filename), framework_folder)
+                        for folder, _, filenames in os.walk(framework_folder)
+                        for filename in filenames
+                        if filename.endswith('.grid') and filename.startswith(prefix))
+
+    grids = []
+    temporary_filename = bundle_filename + '.tmp'
+    with tarfile.open(temporary_filename, 'w', format=tarfile.PAX_FORMAT) as tar:
+        for grid_file in grid_files:
+            # The bundle paths drop the framework name prefix of the file names
+            folder, filename = os.path.split(grid_file)
+            description = describe_grid(os.path.join(folder, filename[len(prefix):]))
+
+            checksum = hashlib.sha256()
+            size = 0
+            with open(os.path.join(framework_folder, grid_file), 'rb') as f, \
+                    tempfile.TemporaryFile() as compressed:
+                compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 31)
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    checksum.update(chunk)
+                    size += len(chunk)
+                    compressed.write(compressor.compress(chunk))
+                compressed.write(compressor.flush())
+
+                info = tarfile.TarInfo(description['path'] + COMPRESSED_EXTENSION)
+                info.size = compressed.tell()
+                compressed.seek(0)
+                tar.addfile(info, compressed)
+
+            description.update({'size': size,
+                                'compressed_size': info.size,
+                                'sha256': checksum.hexdigest()})
+            grids.append(description)
+
+        manifest = json.dumps({'framework_name': framework_name, 'grids': grids},
+                              indent=2).encode('utf-8')
+        info = tarfile.TarInfo(MANIFEST_MEMBER)
+        info.size = len(manifest)
+        tar.addfile(info, io.BytesIO(manifest))
+
+    os.replace(temporary_filename, bundle_filename)
+
+    return len(grids)
+
+
+def read_manifest(bundle_filename: str) -> dict:
+    """
+    Read the manifest of a grid bundle. Bundles without grids have an empty `grids` list.
+    """
+    with tarfile.open(bundle_filename, 'r:') as tar:
+        try:
+            f = tar.extractfile(MANIFEST_MEMBER)
+        except KeyError:
+            return {'framework_name': None, 'grids': []}
+        return json.load(f)
+
+
+def select_grids(manifest: dict,
+                 pseudo_atoms: typing.List[str],
+                 spacing_vdw: float,
+                 spacing_coulomb: float) -> typing.List[dict]:
+    """
+    Select the VDW grids of some pseudo atom types and the Coulomb grid of a bundle, at the grid
+    spacings of a simulation.
+    """
+    selected = []
+    for grid in manifest['grids']:
+        if grid['type'] == COULOMB_GRID_NAME:
+            if abs(grid['spacing'] - spacing_coulomb) < 1e-6:
+                selected.append(grid)
+        elif grid['type'] in pseudo_atoms and abs(grid['spacing'] - spacing_vdw) < 1e-6:
+            selected.append(grid)
+
+    return selected
+
+
+def _decompress(tar: tarfile.TarFile, grid: dict, filename: str) -> None:
+    """
+    Decompress a grid of a bundle to a temporary name, check its checksum and rename it.
+    """
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+    checksum = hashlib.sha256()
+    decompressor = zlib.decompressobj(31)
+    source = tar.extractfile(grid['path'] + COMPRESSED_EXTENSION)
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(filename),
+                                     prefix='.' + os.path.basename(filename) + '.',
+                                     delete=False) as f:
+        try:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                data = decompressor.decompress(chunk)
+                checksum.update(data)
+                f.write(data)
+            data = decompressor.flush()
+            checksum.update(data)
+            f.write(data)
+
+            if checksum.hexdigest() != grid['sha256']:
+                raise ValueError(f'Checksum mismatch for {grid["path"]}.')
+        except BaseException:
+            os.remove(f.name)
+            raise
+
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, filename)
+
+
+def extract_grids(bundle_filename: str,
+                  grids: typing.List[dict],
+                  framework_name: str,
+                  grid_folder: str,
+                  shared_folder: typing.Optional[str] = None) -> int:
+    """
+    Extract some grids of a bundle into the framework folder of RASPA.
+
+    Parameters
+    ----------
+    bundle_filename : string
+        Name of the bundle.
+    grids : list
+        Grids of the manifest to extract, e.g. from `select_grids`.
+    framework_name : string
+        Name of the framework in the RASPA input files.
+    grid_folder : string
+        Grid folder of the force field, e.g. `default_grid_folder()`.
+    shared_folder : string, optional
+        Folder readable by several jobs, e.g. on a shared volume. Grids are extracted there
+        once, named after their checksum, and symbolic links are created in the framework folder
+        of RASPA. Grids are extracted into the framework folder when it is None.
+
+    Returns
+    -------
+    number_of_extracted : int
+        Number of grids decompressed, excluding those found in the shared folder.
+    """
+    number_of_extracted = 0
+    with tarfile.open(bundle_filename, 'r:') as tar:
+        for grid in grids:
+            destination = os.path.join(grid_folder,
+                                       framework_name,
+                                       framework_grid_path(grid['path'], framework_name))
+
+            if shared_folder is None:
+                _decompress(tar, grid, destination)
+                number_of_extracted += 1
+                continue
+
+            shared_filename = os.path.join(shared_folder, grid['sha256'] + '.grid')
+            if not os.path.exists(shared_filename):
+                _decompress(tar, grid, shared_filename)
+                number_of_extracted += 1
+
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            if os.path.lexists(destination):
+                os.remove(destination)
+            os.symlink(os.path.abspath(shared_filename), destination)
+
+    return number_of_extracted
@@ -0,0 +1,216 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import typing
+
+# Version of the layout of the cache entries, part of every key
+GRID_CACHE_VERSION = 2
+
+# RASPA names the VDW grids after the shifted / truncated rule of the force field
+VDW_GRID_RULES = ['shifted', 'truncated']
+
+# Name of the Coulomb grid computed with the Ewald summation
+COULOMB_GRID_NAME = 'Electrostatics_Ewald'
+
+
+def default_grid_folder() -> str:
+    """
+    Returns the folder where RASPA reads and writes the grids of the `Local` force field.
+    """
+    return os.path.join(os.getenv('RASPA_DIR', ''), 'share', 'raspa', 'grids', 'Local')
+
+
+def file_digest(filename: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns the SHA-256 digest of the content of a file.
+    """
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def grid_key(cif_filename: str, def_filenames: typing.List[str], parameters: dict) -> str:
+    """
+    Calculate the key of the grids of a framework from everything they depend on, except the
+    pseudo atom types and grid spacings, which are part of the paths of the grid files.
+
+    Parameters
+    ----------
+    cif_filename : string
+        Name of the CIF file of the framework. Only its content is used, not its name.
+    def_filenames : list
+        Names of the force field `*.def` files.
+    parameters : dict
+        MakeGrid input parameters, e.g. UnitCells, cutoffs and EwaldPrecision.
+
+    Returns
+    -------
+    key : string
+        SHA-256 hexadecimal digest.
+    """
+    digests = {'version': GRID_CACHE_VERSION,
+               'parameters': parameters,
+               'cif': file_digest(cif_filename),
+               'def': {os.path.basename(def_filename): file_digest(def_filename)
+                       for def_filename in def_filenames}}
+
+    return hashlib.sha256(json.dumps(digests, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def vdw_grid_files(pseudo_atom: str, spacing: float) -> typing.List[str]:
+    """
+    Returns the possible paths of the VDW grid of a pseudo atom, relative to the framework folder
+    of RASPA and without the framework name prefix of the file name.
+    """
+    return [os.path.join(f'{spacing:f}', f'{pseudo_atom}_{rule}.grid') for rule in VDW_GRID_RULES]
+
+
+def coulomb_grid_file(spacing: float, unit_cells: str) -> str:
+    """
+    Returns the path of the Coulomb grid, relative to the framework folder of RASPA and without
+    the framework name prefix of the file name.
+    """
+    return os.path.join(f'{spacing:f}', 'x'.join(unit_cells.split()), f'{COULOMB_GRID_NAME}.grid')
+
+
+def framework_grid_path(relative_path: str, framework_name: str) -> str:
+    """
+    Prefix the file name of a grid path with the framework name, as RASPA names the grid files.
+    """
+    folder, filename = os.path.split(relative_path)
+
+    return os.path.join(folder, f'{framework_name}_{filename}')
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    """
+    Hard link a file, or copy it when the link is not possible, e.g. across file systems.
+    """
+    if os.path.lexists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+class GridCache:
+    """
+    Persistent, content-addressed store of RASPA energy grids.
+
+    Every entry is a folder named after the `grid_key` of a framework, holding one file per grid
+    with its path relative to the framework folder of RASPA, e.g. `0.100000/C_co2_shifted.grid`.
+    The framework name prefix of the file names is dropped, so that frameworks with the same
+    content but different names share the entries. Grids of new pseudo atoms or spacings are
+    added to existing entries. Every file is written to a temporary name and renamed when
+    complete, so concurrent jobs never see a partial grid.
+
+    Parameters
+    ----------
+    cache_folder : string
+        Folder of the store, e.g. on a volume shared by the workflow instances. It is created if
+        missing.
+    """
+
+    def __init__(self, cache_folder: str):
+        self.cache_folder = cache_folder
+        os.makedirs(cache_folder, exist_ok=True)
+
+    def entry_folder(self, key: str) -> str:
+        return os.path.join(self.cache_folder, key)
+
+    def find(self, key: str, grid_files: typing.List[str]) -> typing.Optional[str]:
+        """
+        Returns the first of the grid files present in an entry, or None.
+        """
+        for grid_file in grid_files:
+            if os.path.isfile(os.path.join(self.entry_folder(key), grid_file)):
+                return grid_file
+
+        return None
+
+    def restore(self,
+                key: str,
+                grid_files: typing.List[str],
+                framework_name: str,
+                grid_folder: str) -> None:
+        """
+        Restore grids of an entry into the framework folder of RASPA.
+
+        Parameters
+        ----------
+        key : string
+            Key of the framework.
+        grid_files : list
+            Paths of the grids in the entry, e.g. from `find`.
+        framework_name : string
+            Name of the framework in the RASPA input files.
+        grid_folder : string
+            Grid folder of the force field, e.g. `default_grid_folder()`.
+        """
+        for grid_file in grid_files:
+            destination = os.path.join(grid_folder,
+                                       framework_name,
+                                       framework_grid_path(grid_file, framework_name))
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            _link_or_copy(os.path.join(self.entry_folder(key), grid_file), destination)
+
+    def store(self, key: str, framework_name: str, grid_folder: str) -> int:
+        """
+        Store the grids of a framework folder of RASPA that are not in the entry yet, after a
+        MakeGrid simulation.
+
+        Parameters
+        ----------
+        key : string
+            Key of the framework.
+        framework_name : string
+            Name of the framework in the RASPA input files.
+        grid_folder : string
+            Grid folder of the force field, e.g. `default_grid_folder()`.
+
+        Returns
+        -------
+        number_of_files : int
+            Number of grid files stored.
+        """
+        framework_folder = os.path.join(grid_folder, framework_name)
+        prefix = framework_name + '_'
+
+        number_of_files = 0
+        for folder, _, filenames in os.walk(framework_folder):
+            for filename in filenames:
+                if not (filename.endswith('.grid') and filename.startswith(prefix)):
+                    continue
+
+                source = os.path.join(folder, filename)
+                grid_file = os.path.join(os.path.relpath(folder, framework_folder),
+                                         filename[len(prefix):])
+                destination = os.path.join(self.entry_folder(key), grid_file)
+                if os.path.exists(destination):
+                    continue
+
+                # The files are copied, not linked, so that RASPA never overwrites the cache
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                temporary_file = tempfile.NamedTemporaryFile(dir=os.path.dirname(destination),
+                                                             prefix=f'.{filename}.',
+                                                             delete=False)
+                try:
+                    with temporary_file, open(source, 'rb') as f:
+                        shutil.copyfileobj(f, temporary_file)
+                    os.chmod(temporary_file.name, 0o644)
+                    os.replace(temporary_file.name, destination)
+                except OSError:
+                    os.remove(temporary_file.name)
+                    raise
+                number_of_files += 1
+
+        return number_of_files
@@ -0,0 +1,40 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import fcntl
+import json
+import os
+import typing
+
+
+def append_lines(filename: str, lines: typing.List[str]) -> None:
+    """
+    Durably append lines to a file, holding an exclusive lock so that concurrent writers do not
+    interleave their records.
+    """
+    with open(filename, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.write(''.join(line + '\n' for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_lines(filename: str) -> typing.List[dict]:
+    """
+    Read the JSON lines of a file, ignoring a truncated last line left by an interrupted write.
+    """
+    if not os.path.exists(filename):
+        return []
+
+    records = []
+    with open(filename, 'r') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f'Warning! Skipping a corrupted line of {filename}.')
+
+    return records
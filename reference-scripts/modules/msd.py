@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import os
+import tempfile
+import typing
+
+import numpy as np
+
+# Columns of the RASPA MSDOrderN `msd_self_*.dat` files that are used. The file also has a
+# trailing `(count: N)` field with the number of samples, which is not read.
+MSD_COLUMNS = ['time', 'msd_xyz', 'msd_x', 'msd_y', 'msd_z']
+
+SIDECAR_EXTENSION = '.npy'
+
+
+def parse_msd_file(msd_filename: str) -> np.ndarray:
+    """
+    Parse the text of a RASPA MSDOrderN file, reading only the time and MSD columns.
+
+    Parameters
+    ----------
+    msd_filename : string
+        Name of the `msd_self_*.dat` file.
+
+    Returns
+    -------
+    msd_data : array
+        2D array with one row per column of MSD_COLUMNS.
+    """
+    msd_data = np.loadtxt(msd_filename,
+                          comments='#',
+                          usecols=range(len(MSD_COLUMNS)),
+                          dtype=float,
+                          ndmin=2)
+
+    return np.ascontiguousarray(msd_data.T)
+
+
+def write_sidecar(sidecar_filename: str, msd_data: np.ndarray) -> None:
+    """
+    Atomically write the parsed MSD data as a binary sidecar file.
+
+    Parameters
+    ----------
+    sidecar_filename : string
+        Name of the sidecar file.
+    msd_data : array
+        2D array with one row per column of MSD_COLUMNS.
+    """
+    directory = os.path.dirname(os.path.abspath(sidecar_filename))
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=SIDECAR_EXTENSION, delete=False) as f:
+        np.save(f, msd_data)
+    os.replace(f.name, sidecar_filename)
+
+
+def read_msd(msd_filename: str, use_sidecar: bool = True) -> typing.Tuple[np.ndarray, ...]:
+    """
+    Read the time and MSD columns of a RASPA MSDOrderN file.
+
+    The first read parses the text and stores the columns in a binary sidecar next to the file
+    (`msd_self_*.dat.npy`). Later reads memory-map the sidecar and skip the text parsing, as long
+    as the sidecar is not older than the text file.
+
+    Parameters
+    ----------
+    msd_filename : string
+        Name of the `msd_self_*.dat` file.
+    use_sidecar : bool, optional
+        Read and write the binary sidecar. The default is True.
+
+    Returns
+    -------
+    time : array
+        Simulation time in ps.
+    msd_xyz : array
+        Mean Squared Displacement averaged over the three directions in Å^2.
+    msd_x, msd_y, msd_z : array
+        Mean Squared Displacement on each direction in Å^2.
+    """
+    sidecar_filename = msd_filename + SIDECAR_EXTENSION
+
+    if (use_sidecar and os.path.exists(sidecar_filename)
+            and os.stat(sidecar_filename).st_mtime_ns >= os.stat(msd_filename).st_mtime_ns):
+        msd_data = np.load(sidecar_filename, mmap_mode='r')
+
+    else:
+        msd_data = parse_msd_file(msd_filename)
+
+        if use_sidecar:
+            try:
+                write_sidecar(sidecar_filename, msd_data)
+            except OSError as error:
+                print(f'Warning! Could not write {sidecar_filename}: {error}')
+
+    return tuple(msd_data)
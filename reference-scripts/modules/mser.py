@@ -0,0 +1,303 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import typing
+
+import numpy as np
+import pymser
+
+from modules.autocorrelation import calc_equilibrated_statistics
+
+
+def batch_average(data: np.ndarray, batch_size: int = 1) -> np.ndarray:
+    """
+    Converts every column of the data to batch averages with a given batch size.
+
+    The last rows are discarded to make closed batches, as in `pymser.batch_average_data`.
+
+    Parameters
+    ----------
+    data : array
+        2D array with cycles as rows and observables as columns.
+    batch_size : int, optional
+        Size of the batch to take the averages. The default is 1.
+
+    Returns
+    -------
+    averaged_batches : array
+        2D array containing the batch-averaged data.
+    """
+    if batch_size <= 1:
+        return data
+
+    number_of_batches = len(data) // batch_size
+    truncated_data = data[:number_of_batches * batch_size]
+
+    return truncated_data.reshape(number_of_batches, batch_size, -1).mean(axis=1)
+
+
+def calculate_MSEm(data: np.ndarray, batch_size: int = 1) -> np.ndarray:
+    """
+    Calculates the m-Marginal Standard Error (MSEm) curve of every column at once.
+
+    For each truncation point `k` the sum of squared deviations of the remaining `n - k` batches
+    is obtained from suffix sums of the data and of its square, so each column costs O(n) instead
+    of the O(n^2) of `pymser.calculate_MSEm`. The columns are centred first to keep the
+    difference of sums well conditioned.
+
+    Parameters
+    ----------
+    data : array
+        2D array with cycles as rows and observables as columns.
+    batch_size : int, optional
+        Size of the batch to take the averages. The default is 1.
+
+    Returns
+    -------
+    MSE : array
+        2D array with the `n - 2` Marginal Standard Error values of each column.
+    """
+    block_average = batch_average(np.asarray(data, dtype=float), batch_size)
+    block_average = block_average - block_average.mean(axis=0)
+
+    n = len(block_average)
+
+    # Sums of the data and of its square from k to the end
+    suffix_sum = np.cumsum(block_average[::-1], axis=0)[::-1]
+    suffix_sum_sq = np.cumsum(block_average[::-1]**2, axis=0)[::-1]
+
+    # Number of remaining batches for each truncation point
+    remaining = (n - np.arange(n))[:, np.newaxis]
+
+    sum_sq_diff = np.maximum(suffix_sum_sq - suffix_sum**2 / remaining, 0.0)
+
+    return (sum_sq_diff / remaining**2)[:n - 2]
+
+
+def MSERm_index(MSEm: np.ndarray, batch_size: int = 1) -> np.ndarray:
+    """
+    Applies the m-Marginal Standard Error Rule (MSERm) to every column of the MSEm curves.
+
+    Parameters
+    ----------
+    MSEm : array
+        2D array with the Marginal Standard Error curve of each column.
+    batch_size : int, optional
+        Size of the batch to take the average. The default is 1.
+
+    Returns
+    -------
+    equilibrated_index : array
+        Index of the start of equilibrated data of each column.
+    """
+    # Remove potential too low values that apears artificially on last points
+    MSEm = np.where(MSEm < 1e-9, MSEm.max(axis=0), MSEm)
+
+    return np.argmin(MSEm, axis=0) * batch_size
+
+
+def MSERm_LLM_index(MSEm: np.ndarray, batch_size: int = 1) -> np.ndarray:
+    """
+    Applies the LLM version of MSERm to every column, taking the first minimum of each MSEm
+    curve as the start of equilibrated data.
+
+    Parameters
+    ----------
+    MSEm : array
+        2D array with the Marginal Standard Error curve of each column.
+    batch_size : int, optional
+        Size of the batch to take the average. The default is 1.
+
+    Returns
+    -------
+    t0 : array
+        Start of the LLM equilibrated data of each column.
+    """
+    # Position of the first point that is not followed by a lower value
+    decreasing = MSEm[1:] < MSEm[:-1]
+    first_minimum = np.where(decreasing.all(axis=0), len(MSEm) - 1, np.argmin(decreasing, axis=0))
+
+    return first_minimum * batch_size
+
+
+def calc_equilibrated_average(data: np.ndarray,
+                              eq_index: np.ndarray,
+                              uncertainty: str = 'uSD',
+                              ac_time: typing.Optional[np.ndarray] = None
+                              ) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the average and uncertainty of every column on its equilibrated part, as
+    `pymser.calc_equilibrated_average`.
+
+    Parameters
+    ----------
+    data : array
+        2D array with cycles as rows and observables as columns.
+    eq_index : array
+        Index of the start of equilibrated data of each column.
+    uncertainty : str, optional
+        Version of the uncertainty: 'SD', 'SE', 'uSD' or 'uSE'. The default is 'uSD'.
+    ac_time : array, optional
+        Autocorrelation time of each column. Only used by 'uSD' and 'uSE'.
+
+    Returns
+    -------
+    equilibrated_average : array
+        Average on the equilibrated data of each column.
+    equilibrated_uncertainty : array
+        Uncertainty of the average of each column.
+    """
+    number_of_columns = data.shape[1]
+    if ac_time is None:
+        ac_time = np.ones(number_of_columns)
+
+    equilibrated_average = np.empty(number_of_columns)
+    equilibrated_uncertainty = np.empty(number_of_columns)
+
+    for i in range(number_of_columns):
+        # Remove the initial transient of the data
+        equilibrated_data = data[eq_index[i]:, i]
+        equilibrated_average[i] = np.average(equilibrated_data)
+
+        # Divide the equilibrated data on uncorrelated chunks
+        if uncertainty in ['uSD', 'uSE']:
+            equilibrated_data = batch_average(equilibrated_data[:, np.newaxis],
+                                              int(np.ceil(ac_time[i])))[:, 0]
+
+        equilibrated_uncertainty[i] = np.std(equilibrated_data)
+        if uncertainty in ['SE', 'uSE']:
+            equilibrated_uncertainty[i] /= np.sqrt(len(equilibrated_data))
+
+    return equilibrated_average, equilibrated_uncertainty
+
+
+def equilibrate(data: np.ndarray,
+                LLM: bool = False,
+                batch_size: int = 1,
+                uncertainty: str = 'uSD',
+                eq_index: typing.Optional[np.ndarray] = None,
+                print_results: bool = False,
+                autocorrelation: str = 'pymser') -> typing.Dict[str, np.ndarray]:
+    """
+    Apply MSER to every column of a 2D array in a single vectorized pass.
+
+    Follows `pymser.equilibrate`: columns with non-finite values give NaN results and columns
+    filled with zeros give zero results. When `eq_index` is given, every column is averaged from
+    it as `pymser.calc_autocorrelation_time` and `pymser.calc_equilibrated_average` do instead,
+    whatever its values.
+
+    Parameters
+    ----------
+    data : array
+        2D array with cycles as rows and observables as columns.
+    LLM : bool, optional
+        Use the LLM version of MSER. The default is False.
+    batch_size : int, optional
+        Size of batch to take the average. The default is 1.
+    uncertainty : str, optional
+        Version of the uncertainty: 'SD', 'SE', 'uSD' or 'uSE'. The default is 'uSD'.
+    eq_index : array, optional
+        Start of the equilibrated data of each column. If given, MSER is not applied. Columns
+        with a non-finite start give NaN results.
+    print_results : bool, optional
+        Print a summary of the results of each column. The default is False.
+    autocorrelation : str, optional
+        Estimator of the autocorrelation time: 'pymser', the half-life of an exponential fit to
+        the ACF of each column, as `pymser.calc_autocorrelation_time`, or 'integrated', the
+        integrated autocorrelation time of all columns from one FFT. The default is 'pymser'.
+
+    Returns
+    -------
+    results : dict
+        Arrays with the start of equilibrated data ('t0'), 'average', 'uncertainty',
+        autocorrelation time ('ac_time') and number of uncorrelated samples ('uncorr_samples')
+        of each column. All arrays are float, with NaN on the columns with non-finite values.
+    """
+    if uncertainty not in ['SD', 'SE', 'uSD', 'uSE']:
+        raise Exception(f"""{uncertainty} is not a valid option!
+            Only Standard Deviation (SD), Standard Error (SE), uncorrelated
+            Standard Deviation (uSD), and uncorrelated Standard Error (uSE)
+            are valid options.""")
+
+    if autocorrelation not in ['pymser', 'integrated']:
+        raise Exception(f'{autocorrelation} is not a valid autocorrelation time estimator!')
+
+    data = np.asarray(data, dtype=float)
+    n, number_of_columns = data.shape
+
+    if eq_index is None:
+        is_all_finite = np.all(np.isfinite(data), axis=0)
+        is_all_zero = np.all(data == 0, axis=0)
+        valid = is_all_finite & ~is_all_zero
+
+        # Results of the invalid columns
+        t0 = np.where(is_all_finite, 0.0, np.nan)
+    else:
+        # The start of equilibrated data is given, so only a non-finite start is invalid
+        t0 = np.array(eq_index, dtype=float)
+        valid = np.isfinite(t0)
+
+    average = t0.copy()
+    avg_uncertainty = t0.copy()
+    ac_time = t0.copy()
+    uncorr_samples = t0.copy()
+
+    if np.any(valid):
+        valid_data = data[:, valid]
+
+        if eq_index is None:
+            # Calculate the Marginal Standard Error curves
+            MSEm_curves = calculate_MSEm(valid_data, batch_size=batch_size)
+
+            # Apply the MSER or MSER-LLM to get the index of the start of equilibrated data
+            if LLM:
+                valid_t0 = MSERm_LLM_index(MSEm_curves, batch_size=batch_size)
+            else:
+                valid_t0 = MSERm_index(MSEm_curves, batch_size=batch_size)
+            t0[valid] = valid_t0
+        else:
+            valid_t0 = t0[valid].astype(int)
+
+        # The integrated estimator needs finite columns that are not constant zero
+        integrated = np.zeros(number_of_columns, dtype=bool)
+        if autocorrelation == 'integrated':
+            integrated[valid] = (np.all(np.isfinite(valid_data), axis=0)
+                                 & ~np.all(valid_data == 0, axis=0))
+
+        if np.any(integrated):
+            # Calculates the average, uncertainty and autocorrelation time on the equilibrated data
+            statistics = calc_equilibrated_statistics(data[:, integrated],
+                                                      valid_t0[integrated[valid]])
+            average[integrated] = statistics['average']
+            avg_uncertainty[integrated] = statistics[uncertainty]
+            ac_time[integrated] = statistics['ac_time']
+            uncorr_samples[integrated] = statistics['uncorr_samples']
+
+        fitted = valid & ~integrated
+        if np.any(fitted):
+            fitted_data = data[:, fitted]
+            fitted_t0 = valid_t0[fitted[valid]]
+
+            # Calculate autocorrelation time and the number of uncorrelated samples
+            for i, column in enumerate(np.flatnonzero(fitted)):
+                ac_time[column], uncorr_samples[column] = pymser.calc_autocorrelation_time(
+                    fitted_data[fitted_t0[i]:, i])
+
+            # Calculates the average and uncertainty on the equilibrated data
+            average[fitted], avg_uncertainty[fitted] = calc_equilibrated_average(fitted_data,
+                                                                                 fitted_t0,
+                                                                                 uncertainty,
+                                                                                 ac_time[fitted])
+
+    if print_results:
+        print('Column       t0  Equilibrated        Average    Uncertainty   ac_time  uncorrelated')
+        for i in range(number_of_columns):
+            eq_status = 'Yes' if t0[i] < 0.75 * n else 'No'
+            print(f'{i:6d} {t0[i]:8.0f}  {eq_status:>12} {average[i]:14.4f}'
+                  f' {avg_uncertainty[i]:14.4f} {ac_time[i]:9.1f} {uncorr_samples[i]:13.1f}')
+
+    return {'t0': t0,
+            'average': average,
+            'uncertainty': avg_uncertainty,
+            'ac_time': ac_time,
+            'uncorr_samples': uncorr_samples}
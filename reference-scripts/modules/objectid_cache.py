@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import json
+import os
+import threading
+import typing
+
+import requests
+
+from modules.database_api_calls import list_materials
+from modules.jsonl import append_lines, read_lines
+
+OBJECTID_CACHE_FILENAME = 'objectid_cache.jsonl'
+
+
+def default_cache_filename(output_folder: str = '.') -> str:
+    """
+    Returns the ObjectID cache shared by the write stages of a workflow instance:
+    `$DATABASE_OBJECTID_CACHE`, or OBJECTID_CACHE_FILENAME in `$INSTANCE_DIR`, or in
+    `output_folder` when the stage does not run inside a workflow instance.
+    """
+    if os.environ.get('DATABASE_OBJECTID_CACHE'):
+        return os.environ['DATABASE_OBJECTID_CACHE']
+
+    return os.path.join(os.environ.get('INSTANCE_DIR') or output_folder, OBJECTID_CACHE_FILENAME)
+
+
+def read_cif_files(cif_files_filename: str) -> typing.List[typing.Tuple[str, str]]:
+    """
+    Read the materials listed in a `cif_files.dat` file.
+
+    Parameters
+    ----------
+    cif_files_filename : string
+        Name of the file, with one `Source/Name` line per material.
+
+    Returns
+    -------
+    materials : list
+        Tuples with the name and source of every material.
+    """
+    materials = []
+    with open(cif_files_filename, 'r') as f:
+        for line in f:
+            if '/' in line:
+                source, name = line.strip().split('/', 1)
+                materials.append((name, source))
+
+    return materials
+
+
+class ObjectIDCache:
+    """
+    Persistent cache of the database ObjectIDs of the materials, keyed by name and source.
+
+    ObjectIDs never change once a material is created, so entries are only dropped when the
+    database-api answers 404 to a call that uses them. The cache is an append-only JSON lines file
+    shared by concurrent write stages; later lines take precedence and invalidations are stored as
+    entries with a null `_id`.
+
+    Parameters
+    ----------
+    filename : string, optional
+        Name of the cache file. It is created on the first write. The cache is kept in memory
+        when it is None.
+    """
+
+    def __init__(self, filename: typing.Optional[str] = None):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.objectIDs = {}
+
+        if filename is not None:
+            for entry in read_lines(filename):
+                self.objectIDs[entry['name'], entry['source']] = entry['_id']
+
+    def __len__(self) -> int:
+        return sum(objectID is not None for objectID in self.objectIDs.values())
+
+    def get(self, material_name: str, material_source: str) -> typing.Optional[str]:
+        """
+        Returns the cached ObjectID of a material, or None if it is not cached.
+        """
+        with self.lock:
+            return self.objectIDs.get((material_name, material_source))
+
+    def update(self, objectIDs: typing.Dict[typing.Tuple[str, str], typing.Optional[str]]) -> None:
+        """
+        Store the ObjectIDs of several materials, keyed by name and source. Unchanged entries are
+        not written again.
+        """
+        with self.lock:
+            changed = {material: objectID for material, objectID in objectIDs.items()
+                       if self.objectIDs.get(material) != objectID}
+            if not changed:
+                return
+
+            if self.filename is not None:
+                append_lines(self.filename,
+                             [json.dumps({'name': name, 'source': source, '_id': objectID})
+                              for (name, source), objectID in changed.items()])
+            self.objectIDs.update(changed)
+
+    def set(self, material_name: str, material_source: str, objectID: str) -> None:
+        """
+        Store the ObjectID of a material.
+        """
+        self.update({(material_name, material_source): objectID})
+
+    def invalidate(self, material_name: str, material_source: str) -> None:
+        """
+        Drop the ObjectID of a material, after the database-api answered 404 to a call using it.
+        """
+        self.update({(material_name, material_source): None})
+
+    def warm(self,
+             materials: typing.List[typing.Tuple[str, str]],
+             session: typing.Optional[requests.Session] = None) -> int:
+        """
+        Cache the ObjectIDs of many materials with a single listing call to the database-api.
+        No call is made when all of them are already cached.
+
+        Parameters
+        ----------
+        materials : list
+            Tuples with the name and source of the materials, e.g. from `read_cif_files`.
+        session : requests.Session, optional
+            HTTP session to reuse.
+
+        Returns
+        -------
+        missing : int
+            Number of uncached materials that are not in the database.
+        """
+        wanted = {material for material in materials if self.get(*material) is None}
+        if not wanted:
+            return 0
+
+        response = list_materials(session)
+        response.raise_for_status()
+
+        objectIDs = {}
+        for material in response.json().get('materials', []):
+            key = (material['name'], material['source'])
+            if key in wanted:
+                objectIDs[key] = material['_id']
+
+        self.update(objectIDs)
+
+        return len(wanted) - len(objectIDs)
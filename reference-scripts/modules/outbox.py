@@ -0,0 +1,288 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import hashlib
+import json
+import random
+import time
+import typing
+
+import requests
+
+from modules.database_api_calls import get_material, post_thermodynamicProp
+from modules.jsonl import append_lines, read_lines
+from modules.objectid_cache import ObjectIDCache
+
+OUTBOX_FILENAME = 'database_outbox.jsonl'
+
+# Acknowledgements of the outbox records are appended to a second file next to the outbox
+ACK_EXTENSION = '.acked'
+
+# Kinds of thermodynamic properties accepted by the database-api
+PROPERTY_KINDS = ['t-dependent', 'p-dependent', 'constant']
+
+# HTTP status codes worth retrying. Any other error is a permanent rejection of the record
+RETRY_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+
+
+def idempotency_key(kind: str, material_name: str, material_source: str, thermoProp: dict) -> str:
+    """
+    Returns a key that identifies a record by its content, so that enqueuing or sending the same
+    property twice is detected.
+    """
+    content = json.dumps([kind, material_name, material_source, thermoProp], sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def enqueue(outbox_filename: str,
+            kind: str,
+            material_name: str,
+            material_source: str,
+            thermoProp: dict) -> str:
+    """
+    Append a thermodynamic property record to the outbox.
+
+    Parameters
+    ----------
+    outbox_filename : string
+        Name of the append-only outbox file.
+    kind : string
+        Kind of property: 't-dependent', 'p-dependent' or 'constant'.
+    material_name : string
+        Name of the material.
+    material_source : string
+        Source of the material.
+    thermoProp : dict
+        Body of the property, as built by `database_api_calls`.
+
+    Returns
+    -------
+    key : string
+        Idempotency key of the record.
+    """
+    if kind not in PROPERTY_KINDS:
+        raise ValueError(f'{kind} is not a valid thermodynamic property kind.')
+
+    key = idempotency_key(kind, material_name, material_source, thermoProp)
+
+    # The same record is only stored once
+    if key not in {record['key'] for record in read_lines(outbox_filename)}:
+        record = {'key': key,
+                  'kind': kind,
+                  'name': material_name,
+                  'source': material_source,
+                  'created': time.time(),
+                  'thermoProp': thermoProp}
+        append_lines(outbox_filename, [json.dumps(record)])
+
+    return key
+
+
+def acknowledge(outbox_filename: str, acknowledgements: typing.List[dict]) -> None:
+    """
+    Record the final status of outbox records, so that they are not sent again.
+    """
+    if acknowledgements:
+        append_lines(outbox_filename + ACK_EXTENSION,
+                     [json.dumps(acknowledgement) for acknowledgement in acknowledgements])
+
+
+def read_pending(outbox_filename: str) -> typing.List[dict]:
+    """
+    Returns the records of the outbox that were neither sent nor rejected, in insertion order.
+    """
+    acknowledged = {ack['key'] for ack in read_lines(outbox_filename + ACK_EXTENSION)}
+
+    return [record for record in read_lines(outbox_filename) if record['key'] not in acknowledged]
+
+
+def call_with_backoff(call: typing.Callable,
+                      max_retries: int,
+                      backoff: float,
+                      max_backoff: float) -> typing.Any:
+    """
+    Call `call` until it returns a response that should not be retried, sleeping with exponential
+    backoff and jitter between attempts. Connection errors are raised after the last attempt.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            response = call()
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                return response
+            reason = f'HTTP {response.status_code}'
+        except requests.exceptions.RequestException as error:
+            if attempt == max_retries:
+                raise
+            reason = repr(error)
+
+        delay = min(max_backoff, backoff * 2**attempt) * random.uniform(0.5, 1.0)
+        print(f'Attempt {attempt + 1} failed ({reason}), retrying in {delay:.1f} s')
+        time.sleep(delay)
+
+
+def resolve_objectID(material_name: str,
+                     material_source: str,
+                     session: typing.Optional[requests.Session] = None,
+                     max_retries: int = 5,
+                     backoff: float = 1.0,
+                     max_backoff: float = 60.0,
+                     cache: typing.Optional[ObjectIDCache] = None) -> typing.Optional[str]:
+    """
+    Retrieves the ObjectID of a material, retrying transient failures with backoff.
+
+    The ObjectID is taken from `cache` when it is there, and stored in it after a lookup.
+    Returns None if the material does not exist. Raises `requests.exceptions.RequestException`
+    if the database-api is still unavailable after the last retry.
+    """
+    if cache is not None and cache.get(material_name, material_source) is not None:
+        return cache.get(material_name, material_source)
+
+    response = call_with_backoff(lambda: get_material(material_name, material_source, session),
+                                 max_retries, backoff, max_backoff)
+    if response.status_code in RETRY_STATUS_CODES:
+        raise requests.exceptions.HTTPError(f'HTTP {response.status_code}')
+
+    materials = response.json().get('materials', []) if response.ok else []
+    objectID = materials[0]['_id'] if materials else None
+
+    if cache is not None and objectID is not None:
+        cache.set(material_name, material_source, objectID)
+
+    return objectID
+
+
+def post_record(material_name: str,
+                material_source: str,
+                kind: str,
+                thermoProp: dict,
+                key: str,
+                session: typing.Optional[requests.Session] = None,
+                max_retries: int = 5,
+                backoff: float = 1.0,
+                max_backoff: float = 60.0,
+                cache: typing.Optional[ObjectIDCache] = None,
+                throttle: typing.Optional[typing.Callable[[], None]] = None
+                ) -> typing.Optional[requests.models.Response]:
+    """
+    Resolve the ObjectID of a material and post one of its thermodynamic properties, with the
+    idempotency key of the record in the `Idempotency-Key` header.
+
+    A 404 answer to a post with a cached ObjectID invalidates the cache entry, and the post is
+    retried once with a fresh ObjectID. `throttle` is called before every HTTP call.
+
+    Returns None if the material does not exist, or the response of the post otherwise.
+    """
+    if throttle is None:
+        def throttle():
+            pass
+
+    for attempt in range(2):
+        if cache is None or cache.get(material_name, material_source) is None:
+            throttle()
+        objectID = resolve_objectID(material_name, material_source, session,
+                                    max_retries, backoff, max_backoff, cache)
+        if objectID is None:
+            return None
+
+        def post():
+            throttle()
+            return post_thermodynamicProp(objectID, kind, thermoProp, session=session,
+                                          headers={'Idempotency-Key': key})
+
+        response = call_with_backoff(post, max_retries, backoff, max_backoff)
+        if response.status_code != 404 or cache is None or attempt == 1:
+            return response
+
+        print(f'ObjectID {objectID} of {material_name} ({material_source}) not found, '
+              'invalidating the cache')
+        cache.invalidate(material_name, material_source)
+
+    return response
+
+
+def replay(outbox_filename: str,
+           session: typing.Optional[requests.Session] = None,
+           max_retries: int = 5,
+           backoff: float = 1.0,
+           max_backoff: float = 60.0,
+           batch_size: int = 100,
+           cache: typing.Optional[ObjectIDCache] = None) -> typing.Dict[str, int]:
+    """
+    Send the pending records of the outbox to the database-api.
+
+    All records are sent over one HTTP session, resolving the ObjectID of each material once.
+    Every POST carries the idempotency key of the record in the `Idempotency-Key` header.
+    Transient failures are retried with exponential backoff. If the API is still unavailable the
+    replay stops and the remaining records stay pending for the next replay.
+
+    Parameters
+    ----------
+    outbox_filename : string
+        Name of the append-only outbox file.
+    session : requests.Session, optional
+        HTTP session to reuse. A new one is created by default.
+    max_retries : int, optional
+        Number of retries of each call. The default is 5.
+    backoff : float, optional
+        Delay before the first retry in seconds, doubled on each retry. The default is 1.
+    max_backoff : float, optional
+        Maximum delay between retries in seconds. The default is 60.
+    batch_size : int, optional
+        Number of acknowledgements written to disk at once. The default is 100.
+    cache : ObjectIDCache, optional
+        Cache of the ObjectIDs of the materials. An in-memory cache is used by default.
+
+    Returns
+    -------
+    summary : dict
+        Number of records 'sent', 'rejected' and still 'pending'.
+    """
+    pending = read_pending(outbox_filename)
+    summary = {'sent': 0, 'rejected': 0, 'pending': len(pending)}
+    if not pending:
+        return summary
+
+    if session is None:
+        session = requests.Session()
+
+    if cache is None:
+        cache = ObjectIDCache()
+
+    acknowledgements = []
+    try:
+        for record in pending:
+            response = post_record(record['name'], record['source'], record['kind'],
+                                   record['thermoProp'], record['key'], session,
+                                   max_retries, backoff, max_backoff, cache)
+
+            if response is None:
+                acknowledgement = {'status': 'rejected',
+                                   'reason': f"Material {record['name']} ({record['source']}) "
+                                             'not found.'}
+            else:
+                if response.status_code in RETRY_STATUS_CODES:
+                    raise requests.exceptions.HTTPError(f'HTTP {response.status_code}')
+
+                acknowledgement = {'status': 'sent' if response.ok else 'rejected',
+                                   'status_code': response.status_code}
+                if not response.ok:
+                    acknowledgement['reason'] = response.text[:500]
+
+            acknowledgement.update(key=record['key'], time=time.time())
+            acknowledgements.append(acknowledgement)
+            summary[acknowledgement['status']] += 1
+            summary['pending'] -= 1
+            print(f"{record['kind']} property of {record['name']} ({record['source']}): "
+                  f"{acknowledgement['status']}")
+
+            if len(acknowledgements) >= batch_size:
+                acknowledge(outbox_filename, acknowledgements)
+                acknowledgements = []
+
+    except requests.exceptions.RequestException as error:
+        print(f'Database-api unavailable, {summary["pending"]} records left pending: {error}')
+
+    finally:
+        acknowledge(outbox_filename, acknowledgements)
+
+    return summary
@@ -0,0 +1,59 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import math
+import multiprocessing
+import os
+import typing
+
+
+def available_cpus() -> int:
+    """
+    Returns the number of CPUs available to the container.
+
+    The CPU quota of the cgroup (set by Kubernetes from the pod CPU limit) takes precedence over
+    the CPU affinity of the process, which reports every core of the node.
+    """
+    cpus = len(os.sched_getaffinity(0))
+
+    # cgroup v2
+    try:
+        with open('/sys/fs/cgroup/cpu.max', 'r') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        # cgroup v1
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us', 'r') as f:
+                quota = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us', 'r') as f:
+                period = int(f.read())
+            if quota > 0:
+                cpus = min(cpus, math.ceil(quota / period))
+        except (OSError, ValueError):
+            pass
+
+    return max(1, cpus)
+
+
+def starmap(function: typing.Callable,
+            arguments: typing.List[tuple],
+            workers: typing.Optional[int] = None) -> list:
+    """
+    Applies `function` to every tuple of `arguments` using a pool of `workers` processes.
+
+    Results are returned in the order of `arguments`. If `workers` is None the pool is sized to
+    the CPUs available to the container. With a single worker, or a single task, the function is
+    called in the current process.
+    """
+    if workers is None:
+        workers = available_cpus()
+
+    workers = min(workers, len(arguments))
+
+    if workers <= 1:
+        return [function(*args) for args in arguments]
+
+    with multiprocessing.Pool(workers) as pool:
+        return pool.starmap(function, arguments)
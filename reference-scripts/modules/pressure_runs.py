@@ -0,0 +1,289 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import glob
+import os
+import re
+import shutil
+import subprocess
+import typing
+
+import numpy as np
+
+from modules import mser
+from modules.equilibration import EQUILIBRATE_BATCH_SIZE, EQUILIBRATE_LLM
+from modules.parallel import starmap
+from modules.raspa_output import parse_output_file
+from modules.simulation_status import simulation_finished
+
+# Folder of the per-pressure simulations, relative to the output folder
+PRESSURE_RUNS_FOLDER = 'pressures'
+
+INPUT_FILENAME = 'simulation-MonteCarlo.input'
+
+# Standard output and error of RASPA in every per-pressure folder
+LOG_FILENAME = 'simulate.log'
+
+# Molecule positions written by RASPA at the end of a simulation, and read when RestartFile is yes
+RESTART_FOLDER = os.path.join('Restart', 'System_0')
+RESTART_INITIAL_FOLDER = os.path.join('RestartInitial', 'System_0')
+
+
+def pressure_folder(output_folder: str, pressure: str) -> str:
+    """
+    Returns the folder of the simulation of one pressure.
+    """
+    return os.path.join(output_folder, PRESSURE_RUNS_FOLDER, pressure)
+
+
+def prepare_pressure_folder(output_folder: str,
+                            pressure: str,
+                            shared_files: typing.List[str]) -> str:
+    """
+    Create the folder of the simulation of one pressure, with relative symbolic links to the
+    files shared by all pressures, e.g. the CIF and force field files.
+
+    Parameters
+    ----------
+    output_folder : string
+        Output folder of the MonteCarlo component.
+    pressure : string
+        External pressure [Pascal], as given in the input file.
+    shared_files : list
+        Names of the shared files.
+
+    Returns
+    -------
+    folder : string
+        Folder of the simulation. Files of an interrupted simulation are kept.
+    """
+    folder = pressure_folder(output_folder, pressure)
+    os.makedirs(folder, exist_ok=True)
+
+    for shared_file in shared_files:
+        link = os.path.join(folder, os.path.basename(shared_file))
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(os.path.relpath(shared_file, folder), link)
+
+    return folder
+
+
+def run_simulation(folder: str, simulate: str = 'simulate') -> int:
+    """
+    Run RASPA in a folder, appending its output to LOG_FILENAME. Returns the exit code.
+    """
+    with open(os.path.join(folder, LOG_FILENAME), 'a') as log:
+        return subprocess.run([simulate, '-i', INPUT_FILENAME],
+                              cwd=folder,
+                              stdout=log,
+                              stderr=subprocess.STDOUT).returncode
+
+
+def run_simulations(folders: typing.List[str],
+                    workers: typing.Optional[int] = None,
+                    simulate: str = 'simulate') -> typing.List[int]:
+    """
+    Run RASPA in several folders at the same time, with a pool of `workers` processes sized to
+    the available CPUs by default. Returns the exit codes in the order of `folders`.
+    """
+    return starmap(run_simulation, [(folder, simulate) for folder in folders], workers)
+
+
+def gather_outputs(output_folder: str) -> int:
+    """
+    Move the finished RASPA output and restart files of the per-pressure simulations to
+    `Output/System_0` and `Restart/System_0`, the layout of a simulation of all pressures, and
+    remove their folders. Unfinished simulations are left in place to be resumed.
+
+    Returns
+    -------
+    number_of_outputs : int
+        Number of output files moved.
+    """
+    output_system_folder = os.path.join(output_folder, 'Output', 'System_0')
+    restart_folder = os.path.join(output_folder, RESTART_FOLDER)
+
+    number_of_outputs = 0
+    for folder in sorted(glob.glob(os.path.join(output_folder, PRESSURE_RUNS_FOLDER, '*'))):
+        output_files = glob.glob(os.path.join(folder, 'Output', 'System_0', 'output_*.data'))
+        if not output_files or not all(simulation_finished(fn) for fn in output_files):
+            continue
+
+        os.makedirs(output_system_folder, exist_ok=True)
+        for output_file in output_files:
+            os.replace(output_file, os.path.join(output_system_folder,
+                                                 os.path.basename(output_file)))
+            number_of_outputs += 1
+
+        # The pressure ladder warm-starts the next pressure from the last molecule positions
+        for restart_file in glob.glob(os.path.join(folder, RESTART_FOLDER, 'restart_*')):
+            os.makedirs(restart_folder, exist_ok=True)
+            os.replace(restart_file, os.path.join(restart_folder, os.path.basename(restart_file)))
+        shutil.rmtree(folder)
+
+    return number_of_outputs
+
+
+def read_input_parameters(input_filename: str) -> dict:
+    """
+    Read the keywords of a RASPA input file, e.g. `NumberOfCycles`, as strings. The number of
+    `Component` blocks is returned as `NumberOfComponents`.
+    """
+    parameters = {'NumberOfComponents': 0}
+    with open(input_filename, 'r') as f:
+        for line in f:
+            words = line.split('#', 1)[0].split()
+            if len(words) < 2:
+                continue
+            if words[0] == 'Component':
+                parameters['NumberOfComponents'] += 1
+            else:
+                parameters.setdefault(words[0], words[1])
+
+    return parameters
+
+
+def set_input_parameters(input_filename: str, parameters: dict) -> None:
+    """
+    Set the value of keywords of a RASPA input file, keeping the layout of the lines.
+    """
+    with open(input_filename, 'r') as f:
+        inputfile = f.read()
+
+    for keyword, value in parameters.items():
+        inputfile = re.sub(rf'^({keyword}\s+)\S+', rf'\g<1>{value}', inputfile, flags=re.MULTILINE)
+
+    with open(input_filename, 'w') as f:
+        f.write(inputfile)
+
+
+def restart_pressure(restart_filename: str) -> float:
+    """
+    Returns the pressure [Pascal] of a RASPA restart file, the last field of its name.
+    """
+    return float(os.path.basename(restart_filename).rsplit('_', 1)[1])
+
+
+def equilibration_cycles(output_filename: str,
+                         number_of_components: int,
+                         number_of_cycles: int,
+                         print_every: int = 1) -> typing.Optional[int]:
+    """
+    Find the start of equilibrated data of the total number of adsorbed molecules of a RASPA
+    output file with MSER, with the settings of the Equilibrate component and the global rule.
+
+    Returns
+    -------
+    cycles : int
+        Number of production cycles before the start of equilibrated data, or None if it could
+        not be found, e.g. for a NaN or an all-zero loading.
+    """
+    columns = parse_output_file(output_filename, number_of_components, number_of_cycles,
+                                print_every)
+
+    # MSER gives a start of 0 to an all-zero loading, which says nothing about the relaxation
+    if np.all(columns['N_ads'] == 0):
+        return None
+
+    t0 = mser.equilibrate(columns['N_ads'][:, np.newaxis],
+                          LLM=EQUILIBRATE_LLM,
+                          batch_size=EQUILIBRATE_BATCH_SIZE)['t0'][0]
+    if not np.isfinite(t0):
+        return None
+
+    return int(t0) * print_every
+
+
+def warm_start(output_folder: str, pressure: str) -> typing.Optional[str]:
+    """
+    Start the simulation of a pressure from the final molecule positions of the highest completed
+    lower pressure, gathered by `gather_outputs`, instead of an empty framework.
+
+    The restart file is copied to `RestartInitial/System_0` under the name RASPA expects for
+    this pressure, and `RestartFile` is enabled. The number of initialization cycles is set to
+    the start of equilibrated data that MSER finds in the output of the lower pressure: the
+    cycles it took to relax from the pressure before it. Pressures without a lower completed
+    pressure, or whose lower pressure can not be equilibrated, start from an empty framework
+    with the initialization cycles of the input file.
+
+    Parameters
+    ----------
+    output_folder : string
+        Output folder of the MonteCarlo component.
+    pressure : string
+        External pressure [Pascal], as given in the input file.
+
+    Returns
+    -------
+    restart_filename : string
+        Restart file of the lower pressure, or None for a cold start.
+    """
+    folder = pressure_folder(output_folder, pressure)
+    input_filename = os.path.join(folder, INPUT_FILENAME)
+
+    # Drop the molecule positions of a previous attempt
+    shutil.rmtree(os.path.join(folder, 'RestartInitial'), ignore_errors=True)
+    set_input_parameters(input_filename, {'RestartFile': 'no'})
+
+    restart_files = [restart_file
+                     for restart_file in glob.glob(os.path.join(output_folder,
+                                                                RESTART_FOLDER,
+                                                                'restart_*'))
+                     if restart_pressure(restart_file) < float(pressure)]
+    if not restart_files:
+        return None
+    restart_file = max(restart_files, key=restart_pressure)
+
+    # RASPA names the output files as the restart files, with the `.data` extension
+    output_filename = os.path.join(output_folder,
+                                   'Output',
+                                   'System_0',
+                                   'output_' + os.path.basename(restart_file)[len('restart_'):]
+                                   + '.data')
+    parameters = read_input_parameters(input_filename)
+    try:
+        cycles = equilibration_cycles(output_filename,
+                                      parameters['NumberOfComponents'],
+                                      int(parameters['NumberOfCycles']),
+                                      int(parameters['PrintEvery']))
+    except (OSError, ValueError):
+        cycles = None
+    if cycles is None:
+        return None
+
+    restart_initial_folder = os.path.join(folder, RESTART_INITIAL_FOLDER)
+    os.makedirs(restart_initial_folder)
+    shutil.copyfile(restart_file,
+                    os.path.join(restart_initial_folder,
+                                 os.path.basename(restart_file).rsplit('_', 1)[0]
+                                 + f'_{float(pressure):g}'))
+    set_input_parameters(input_filename, {'RestartFile': 'yes',
+                                          'NumberOfInitializationCycles': cycles})
+
+    return restart_file
+
+
+def run_ladder(output_folder: str,
+               pressures: typing.List[str],
+               simulate: str = 'simulate') -> typing.List[int]:
+    """
+    Run RASPA in the folders of several pressures one after the other, in increasing pressure
+    order, warm-starting every pressure from the previous one with `warm_start`. The outputs
+    are gathered after every simulation. Returns the exit codes in the order of `pressures`.
+    """
+    exit_codes = {}
+    for pressure in sorted(pressures, key=float):
+        restart_file = warm_start(output_folder, pressure)
+        if restart_file is not None:
+            input_filename = os.path.join(pressure_folder(output_folder, pressure), INPUT_FILENAME)
+            parameters = read_input_parameters(input_filename)
+            print(f'Pressure {pressure}: starting from {os.path.basename(restart_file)} with '
+                  f'{parameters["NumberOfInitializationCycles"]} initialization cycles')
+        else:
+            print(f'Pressure {pressure}: starting from an empty framework')
+
+        exit_codes[pressure] = run_simulation(pressure_folder(output_folder, pressure), simulate)
+        gather_outputs(output_folder)
+
+    return [exit_codes[pressure] for pressure in pressures]
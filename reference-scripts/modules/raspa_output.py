@@ -0,0 +1,231 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import math
+import typing
+
+import numpy as np
+
+CYCLE_PREFIX = 'Current cycle:'
+COMPONENT_PREFIX = 'Component '
+COMPONENT_KEY = 'current number of integer/fractional/reaction molecules:'
+ADSORBATES_PREFIX = 'Number of Adsorbates:'
+UNIT_CELLS_KEY = 'Number of unitcells'
+TO_MOL_KG_KEY = 'Conversion factor molecules/unit cell -> mol/kg'
+
+
+def parse_loadings(output_filename: str,
+                   number_of_components: int,
+                   number_of_cycles: int,
+                   print_every: int = 1) -> typing.Tuple[list, np.ndarray, np.ndarray, float]:
+    """
+    Stream a RASPA `output_*.data` file line by line and extract the per-cycle loadings.
+
+    Only the production blocks (`Current cycle: N out of M`) are read. Initialization and
+    equilibration blocks are skipped. The file is never loaded into memory as a whole, so memory
+    usage is given by the preallocated arrays only.
+
+    Parameters
+    ----------
+    output_filename : string
+        Name of the RASPA output file.
+    number_of_components : int
+        Number of adsorbate components in the simulation.
+    number_of_cycles : int
+        Total number of Monte Carlo cycles executed in the simulation.
+    print_every : int, optional
+        Interval in cycles between two printed blocks. The default is 1.
+
+    Returns
+    -------
+    component_names : list
+        Molecule names of each component.
+    number_of_adsorbates : array
+        Total number of adsorbates on each printed cycle.
+    number_of_molecules : array
+        Number of integer molecules on each printed cycle (rows) and component (columns).
+    to_mol_kg : float
+        Conversion factor from molecules in the supercell to mol/kg.
+    """
+    number_of_rows = math.ceil(number_of_cycles / print_every)
+
+    # Preallocate output arrays. Unfilled rows are flagged with -1
+    number_of_adsorbates = np.full(number_of_rows, -1, dtype=np.int64)
+    number_of_molecules = np.full((number_of_rows, number_of_components), -1, dtype=np.int64)
+    component_names = [None] * number_of_components
+
+    unit_cells = []
+    to_mol_kg = None
+    row = None
+
+    with open(output_filename, 'r') as f:
+        for line in f:
+            # Start of a production block
+            if line.startswith(CYCLE_PREFIX):
+                cycle = int(line[len(CYCLE_PREFIX):].split()[0])
+                row = cycle // print_every if cycle % print_every == 0 else None
+                if row is not None and row >= number_of_rows:
+                    row = None
+
+            # Any other block delimited by a cycle header ends the production block
+            elif CYCLE_PREFIX in line:
+                row = None
+
+            elif row is not None:
+                if line.startswith(COMPONENT_PREFIX) and COMPONENT_KEY in line:
+                    component = int(line.split(None, 2)[1])
+                    if component < number_of_components:
+                        molecules = line.split(COMPONENT_KEY, 1)[1].split('/', 1)[0]
+                        number_of_molecules[row, component] = int(molecules)
+                        if component_names[component] is None:
+                            component_names[component] = line[line.index('(') + 1:
+                                                              line.index(')')]
+                elif line.startswith(ADSORBATES_PREFIX):
+                    number_of_adsorbates[row] = int(line.split(':', 1)[1].split()[0])
+
+            # Header information is read on the way
+            elif UNIT_CELLS_KEY in line:
+                unit_cells.append(int(line.split(':')[1]))
+
+            elif to_mol_kg is None and TO_MOL_KG_KEY in line:
+                to_mol_kg = float(line.split(':', 1)[1].split()[0])
+
+    if to_mol_kg is None:
+        raise ValueError(f'{TO_MOL_KG_KEY} not found in {output_filename}.')
+
+    missing_rows = np.flatnonzero((number_of_adsorbates < 0)
+                                  | np.any(number_of_molecules < 0, axis=1))
+    if missing_rows.size > 0:
+        raise ValueError(f'Cycle {missing_rows[0] * print_every} out of {number_of_cycles} '
+                         f'not found in {output_filename}.')
+
+    # Calculate mol/kg conversion factor for the supercell
+    to_mol_kg /= math.prod(unit_cells)
+
+    return component_names, number_of_adsorbates, number_of_molecules, to_mol_kg
+
+
+def format_loadings_csv(component_names: list,
+                        number_of_adsorbates: np.ndarray,
+                        number_of_molecules: np.ndarray,
+                        to_mol_kg: float,
+                        print_every: int = 1) -> str:
+    """
+    Format the per-cycle loadings as the `raspa_*.csv` text written by ParseOutput.
+
+    Parameters
+    ----------
+    component_names : list
+        Molecule names of each component.
+    number_of_adsorbates : array
+        Total number of adsorbates on each printed cycle.
+    number_of_molecules : array
+        Number of integer molecules on each printed cycle (rows) and component (columns).
+    to_mol_kg : float
+        Conversion factor from molecules in the supercell to mol/kg.
+    print_every : int, optional
+        Interval in cycles between two printed blocks. The default is 1.
+
+    Returns
+    -------
+    csv_output : string
+        CSV text with the cycle, step, total and per-component loadings.
+    """
+    # Build header string
+    header = 'cycle,\tstep,\tN_ads'
+    for molecule_name in component_names:
+        header += (
+            f',\t{molecule_name}_[molecules/uc]'
+            f',\t{molecule_name}_[mol/kg]'
+        )
+
+    # Build line template
+    template = '{},\t{},\t{}' + ',\t{:7},\t{:.7f}' * len(component_names)
+
+    cycles = range(0, len(number_of_adsorbates) * print_every, print_every)
+    steps = np.cumsum(np.maximum(20, number_of_adsorbates)).tolist()
+    molecules = number_of_molecules.tolist()
+
+    lines = [header]
+    for cycle, step, adsorbates, row in zip(cycles, steps, number_of_adsorbates.tolist(),
+                                            molecules):
+        values = []
+        for number in row:
+            values += [number, number * to_mol_kg]
+        lines.append(template.format(cycle, step, adsorbates, *values))
+
+    return '\n'.join(lines) + '\n'
+
+
+def loadings_to_columns(component_names: list,
+                        number_of_adsorbates: np.ndarray,
+                        number_of_molecules: np.ndarray,
+                        to_mol_kg: float,
+                        print_every: int = 1) -> typing.Dict[str, np.ndarray]:
+    """
+    Arrange the per-cycle loadings as the typed columns of the `raspa_*.csv` file.
+
+    Parameters
+    ----------
+    component_names : list
+        Molecule names of each component.
+    number_of_adsorbates : array
+        Total number of adsorbates on each printed cycle.
+    number_of_molecules : array
+        Number of integer molecules on each printed cycle (rows) and component (columns).
+    to_mol_kg : float
+        Conversion factor from molecules in the supercell to mol/kg.
+    print_every : int, optional
+        Interval in cycles between two printed blocks. The default is 1.
+
+    Returns
+    -------
+    columns : dict
+        Column names mapped to 1D arrays, in the order of the CSV header.
+    """
+    columns = {'cycle': np.arange(len(number_of_adsorbates), dtype=np.int64) * print_every,
+               'step': np.cumsum(np.maximum(20, number_of_adsorbates)),
+               'N_ads': number_of_adsorbates}
+
+    for component, molecule_name in enumerate(component_names):
+        columns[f'{molecule_name}_[molecules/uc]'] = number_of_molecules[:, component]
+        columns[f'{molecule_name}_[mol/kg]'] = number_of_molecules[:, component] * to_mol_kg
+
+    return columns
+
+
+def parse_output_file(output_filename: str,
+                      number_of_components: int,
+                      number_of_cycles: int,
+                      print_every: int = 1,
+                      csv_filename: typing.Optional[str] = None) -> typing.Dict[str, np.ndarray]:
+    """
+    Parse a RASPA output file into typed columns and optionally export them as `raspa_*.csv`.
+
+    Parameters
+    ----------
+    output_filename : string
+        Name of the RASPA output file.
+    number_of_components : int
+        Number of adsorbate components in the simulation.
+    number_of_cycles : int
+        Total number of Monte Carlo cycles executed in the simulation.
+    print_every : int, optional
+        Interval in cycles between two printed blocks. The default is 1.
+    csv_filename : string, optional
+        Name of the CSV file to be written. No CSV file is written by default.
+
+    Returns
+    -------
+    columns : dict
+        Column names mapped to 1D arrays, in the order of the CSV header.
+    """
+    # Stream the file into per-cycle loading arrays
+    loadings = parse_loadings(output_filename, number_of_components, number_of_cycles, print_every)
+
+    if csv_filename is not None:
+        # Format the loadings as CSV string and write it into file
+        with open(csv_filename, 'w') as f:
+            f.write(format_loadings_csv(*loadings, print_every))
+
+    return loadings_to_columns(*loadings, print_every)
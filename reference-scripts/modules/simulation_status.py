@@ -0,0 +1,205 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import glob
+import json
+import math
+import os
+import struct
+import typing
+
+from modules.raspa_output import CYCLE_PREFIX
+
+# Property whose NaN values flag a failed Molecular Dynamics simulation
+PROPERTY_NAN_SEARCH = 'Conserved energy'
+
+STATUS_FILENAME = 'simulation_status.json'
+
+# Binary checkpoint written by RASPA when ContinueAfterCrash is enabled, relative to the working
+# directory. RASPA closes every section of it with CRASH_RESTART_SENTINEL. The restart hooks can not
+# import this module and share their own copy in hooks/crash_restart.py: keep both in sync
+CRASH_RESTART_FILE = os.path.join('CrashRestart', 'binary_restart.dat')
+CRASH_RESTART_SENTINEL = struct.pack('d', 123456789.0)
+
+
+def read_last_block(output_filename: str, chunk_size: int = 65536) -> typing.List[str]:
+    """
+    Read the last block of a RASPA output file, from the last line holding a `=` to the end.
+
+    The file is read backwards in chunks from its end, so only the last block and at most one
+    extra chunk are loaded, regardless of the size of the file.
+
+    Parameters
+    ----------
+    output_filename : string
+        Name of the RASPA output file.
+    chunk_size : int, optional
+        Number of bytes read on each step. The default is 65536.
+
+    Returns
+    -------
+    last_block : list
+        Lines of the last block. The whole file if no line holds a `=`.
+    """
+    with open(output_filename, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b''
+        searched = 0
+
+        while True:
+            size = min(chunk_size, position)
+            position -= size
+            f.seek(position)
+            data = f.read(size) + data
+
+            lines = data.split(b'\n')
+
+            # The first line is incomplete until the start of the file is reached
+            first = 0 if position == 0 else 1
+            for i in range(len(lines) - 1 - searched, first - 1, -1):
+                if b'=' in lines[i]:
+                    return [line.decode('utf-8', 'replace') for line in lines[i:]]
+            searched = len(lines) - first
+
+            if position == 0:
+                return [line.decode('utf-8', 'replace') for line in lines]
+
+
+def simulation_finished(output_filename: str) -> bool:
+    """
+    Returns True if the last block of a RASPA output file reports the end of the simulation.
+    """
+    return any('Simulation finished' in line for line in read_last_block(output_filename))
+
+
+def valid_crash_restart(crash_restart_filename: str) -> bool:
+    """
+    Returns True if a RASPA binary checkpoint exists and was completely written.
+    """
+    try:
+        with open(crash_restart_filename, 'rb') as f:
+            f.seek(-len(CRASH_RESTART_SENTINEL), os.SEEK_END)
+            return f.read() == CRASH_RESTART_SENTINEL
+    except OSError:
+        return False
+
+
+def find_pressure_outputs(output_folder: str,
+                          framework_name: str,
+                          temperature: float,
+                          pressures: typing.List[str]) -> typing.Dict[str, typing.Optional[str]]:
+    """
+    Find the RASPA output file of every pressure of a Monte Carlo simulation.
+
+    RASPA names the files `output_{framework}_{unit cells}_{temperature:.6f}_{pressure:g}.data`,
+    so the pressures are compared as numbers rather than as text.
+
+    Parameters
+    ----------
+    output_folder : string
+        Folder with the RASPA output files, usually `Output/System_0`.
+    framework_name : string
+        Name of the framework.
+    temperature : float
+        External temperature [Kelvin].
+    pressures : list
+        External pressures [Pascal], as given in the input file.
+
+    Returns
+    -------
+    outputs : dict
+        Name of the output file of every pressure, or None if it was not written yet.
+    """
+    output_files = glob.glob(os.path.join(output_folder,
+                                          f'output_{framework_name}_*_{temperature:.6f}_*.data'))
+
+    outputs = {}
+    for pressure in pressures:
+        outputs[pressure] = None
+        for output_file in output_files:
+            try:
+                file_pressure = float(output_file[:-len('.data')].rsplit('_', 1)[1])
+            except ValueError:
+                continue
+            # %g keeps six significant digits
+            if math.isclose(file_pressure, float(pressure), rel_tol=1e-5):
+                outputs[pressure] = output_file
+                break
+
+    return outputs
+
+
+def find_first_nan(output_filename: str,
+                   property_name: str = PROPERTY_NAN_SEARCH) -> typing.Tuple[bool, int]:
+    """
+    Stream a RASPA output file once, looking for the first NaN value of a property.
+
+    Parameters
+    ----------
+    output_filename : string
+        Name of the RASPA output file.
+    property_name : string, optional
+        Text identifying the lines of the property. The default is PROPERTY_NAN_SEARCH.
+
+    Returns
+    -------
+    nan_found : bool
+        True if a NaN value was found.
+    cycle : int
+        Last cycle printed before the first NaN value, or -1 if no NaN was found or no cycle
+        was printed before it.
+    """
+    cycle = -1
+    with open(output_filename, 'r', errors='replace') as f:
+        for line in f:
+            if CYCLE_PREFIX in line:
+                try:
+                    cycle = int(line.split(CYCLE_PREFIX, 1)[1].split()[0])
+                except (IndexError, ValueError):
+                    pass
+            elif property_name in line and 'nan' in line.lower():
+                return True, cycle
+
+    return False, -1
+
+
+def check_simulation(output_filename: str) -> dict:
+    """
+    Check if a RASPA simulation finished successfully.
+
+    Parameters
+    ----------
+    output_filename : string
+        Name of the RASPA output file.
+
+    Returns
+    -------
+    status : dict
+        `success` is True if the simulation finished without NaN values. `warnings` and `errors`
+        hold the WARNING and ERROR lines of the last block, `nan_found` and `first_nan_cycle`
+        the result of `find_first_nan`.
+    """
+    last_block = read_last_block(output_filename)
+    nan_found, first_nan_cycle = find_first_nan(output_filename)
+
+    finished = any('Simulation finished' in line for line in last_block)
+
+    errors = [line for line in last_block if 'ERROR' in line]
+    if nan_found:
+        errors.append('NaN values found.')
+
+    return {'output_file': output_filename,
+            'success': finished and not nan_found,
+            'finished': finished,
+            'warnings': [line for line in last_block if 'WARNING' in line],
+            'errors': errors,
+            'nan_found': nan_found,
+            'first_nan_cycle': first_nan_cycle}
+
+
+def write_status(status_filename: str, status: dict) -> None:
+    """
+    Write the status of a simulation as JSON.
+    """
+    with open(status_filename, 'w') as f:
+        json.dump(status, f, indent=2)
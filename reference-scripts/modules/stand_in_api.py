@@ -0,0 +1,261 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import typing
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from modules.outbox import PROPERTY_KINDS
+
+PROPERTY_PATH = re.compile(r'^/materials/(?P<id>[^/]+)/thermodynamic-properties/(?P<kind>[^/]+)$')
+
+
+class DatabaseStore:
+    """
+    Thread-safe local store with the materials and thermodynamic properties of the database-api.
+
+    Every change is appended to an optional JSON lines file, which is replayed when the store is
+    created, so the content survives restarts of the stand-in server.
+
+    Parameters
+    ----------
+    filename : string, optional
+        JSON lines file where the store is persisted. The store is kept in memory by default.
+    auto_create : bool, optional
+        Create unknown materials when they are looked up. The default is True.
+    """
+
+    def __init__(self, filename: typing.Optional[str] = None, auto_create: bool = True):
+        self.filename = filename
+        self.auto_create = auto_create
+        self.lock = threading.Lock()
+
+        self.materials = {}
+        self.material_ids = {}
+        self.properties = {}
+        self.idempotency_keys = {}
+
+        if filename is not None and os.path.exists(filename):
+            with open(filename, 'r') as f:
+                for line in f:
+                    self._apply(json.loads(line))
+
+    def _apply(self, event: dict) -> None:
+        """
+        Apply a change to the in-memory store.
+        """
+        if event['type'] == 'material':
+            material = event['material']
+            self.materials[material['_id']] = material
+            self.material_ids[material['name'], material['source']] = material['_id']
+            self.properties.setdefault(material['_id'], [])
+        elif event['type'] == 'property':
+            self.properties[event['material_id']].append(event['property'])
+            if event.get('key'):
+                self.idempotency_keys[event['key']] = event['property']['_id']
+
+    def _record(self, event: dict) -> None:
+        """
+        Apply a change and append it to the persistence file.
+        """
+        self._apply(event)
+        if self.filename is not None:
+            with open(self.filename, 'a') as f:
+                f.write(json.dumps(event) + '\n')
+
+    def add_material(self, name: str, source: str) -> dict:
+        """
+        Add a material, or return the existing one with the same name and source.
+        """
+        with self.lock:
+            if (name, source) not in self.material_ids:
+                material_id = hashlib.sha256(f'{source}/{name}'.encode('utf-8')).hexdigest()[:24]
+                self._record({'type': 'material',
+                              'material': {'_id': material_id, 'name': name, 'source': source}})
+            return self.materials[self.material_ids[name, source]]
+
+    def find_materials(self, name: str, source: str) -> typing.List[dict]:
+        """
+        Returns the materials with a given name and source.
+        """
+        if (name, source) not in self.material_ids:
+            if not self.auto_create:
+                return []
+            self.add_material(name, source)
+
+        return [self.materials[self.material_ids[name, source]]]
+
+    def list_materials(self) -> typing.List[dict]:
+        """
+        Returns all the materials.
+        """
+        with self.lock:
+            return list(self.materials.values())
+
+    def add_property(self,
+                     material_id: str,
+                     kind: str,
+                     thermoProp: dict,
+                     key: typing.Optional[str] = None) -> typing.Tuple[int, dict]:
+        """
+        Insert a thermodynamic property of a material.
+
+        Returns the HTTP status code and body of the response. A property sent again with the
+        same idempotency key is not inserted twice.
+        """
+        with self.lock:
+            if material_id not in self.materials:
+                return 404, {'error': f'Material {material_id} not found.'}
+
+            if key and key in self.idempotency_keys:
+                return 200, {'_id': self.idempotency_keys[key], 'duplicate': True}
+
+            thermoProp = dict(thermoProp, _id=uuid.uuid4().hex[:24], kind=kind)
+            self._record({'type': 'property',
+                          'material_id': material_id,
+                          'key': key,
+                          'property': thermoProp})
+
+            return 201, {'_id': thermoProp['_id']}
+
+    def count_properties(self) -> int:
+        """
+        Returns the number of stored thermodynamic properties.
+        """
+        with self.lock:
+            return sum(len(properties) for properties in self.properties.values())
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Implements the endpoints of the database-api used by the write stages, on top of the
+    `DatabaseStore` of the server, with the latency and errors configured in the server.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status_code: int, body: dict) -> None:
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _inject(self) -> bool:
+        """
+        Sleep for the configured latency and decide if the request fails with an injected error.
+        """
+        latency = self.server.latency + random.uniform(0, self.server.latency_jitter)
+        if latency > 0:
+            time.sleep(latency)
+
+        if random.random() < self.server.error_rate:
+            self._reply(503, {'error': 'Injected error.'})
+            return True
+
+        return False
+
+    def do_GET(self):
+        if self._inject():
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == '/materials' and 'name' in query:
+            name = query['name'][0]
+            source = query.get('source', [''])[0]
+            self._reply(200, {'materials': self.server.store.find_materials(name, source)})
+            return
+
+        if url.path == '/materials':
+            self._reply(200, {'materials': self.server.store.list_materials()})
+            return
+
+        match = PROPERTY_PATH.match(url.path)
+        if match and match['id'] in self.server.store.materials:
+            properties = [thermoProp for thermoProp in self.server.store.properties[match['id']]
+                          if thermoProp['kind'] == match['kind']]
+            self._reply(200, {'thermodynamic-properties': properties})
+            return
+
+        self._reply(404, {'error': f'{url.path} not found.'})
+
+    def do_POST(self):
+        # Always consume the body to keep the connection usable
+        content = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        if self._inject():
+            return
+
+        match = PROPERTY_PATH.match(urlparse(self.path).path)
+        if not match or match['kind'] not in PROPERTY_KINDS:
+            self._reply(404, {'error': f'{self.path} not found.'})
+            return
+
+        try:
+            thermoProp = json.loads(content)
+        except json.JSONDecodeError as error:
+            self._reply(400, {'error': str(error)})
+            return
+
+        status_code, body = self.server.store.add_property(match['id'],
+                                                           match['kind'],
+                                                           thermoProp,
+                                                           self.headers.get('Idempotency-Key'))
+        self._reply(status_code, body)
+
+
+def make_server(store: DatabaseStore,
+                host: str = '127.0.0.1',
+                port: int = 8080,
+                latency: float = 0.0,
+                latency_jitter: float = 0.0,
+                error_rate: float = 0.0,
+                verbose: bool = False) -> ThreadingHTTPServer:
+    """
+    Create a stand-in database-api server.
+
+    Parameters
+    ----------
+    store : DatabaseStore
+        Store of the materials and properties.
+    host : string, optional
+        Address to listen on. The default is 127.0.0.1.
+    port : int, optional
+        Port to listen on, 0 picks a free port. The default is 8080.
+    latency : float, optional
+        Added latency of every request in seconds. The default is 0.
+    latency_jitter : float, optional
+        Maximum random latency added on top of `latency` in seconds. The default is 0.
+    error_rate : float, optional
+        Fraction of requests answered with an injected HTTP 503. The default is 0.
+    verbose : bool, optional
+        Log every request. The default is False.
+
+    Returns
+    -------
+    server : ThreadingHTTPServer
+        Server ready to `serve_forever`. Its URL is `http://{host}:{server.server_port}`.
+    """
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.store = store
+    server.latency = latency
+    server.latency_jitter = latency_jitter
+    server.error_rate = error_rate
+    server.verbose = verbose
+
+    return server
@@ -0,0 +1,144 @@
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import json
+import struct
+import typing
+
+import numpy as np
+
+TIMESERIES_FILENAME = 'raspa_timeseries.bin'
+
+# File layout: magic, little-endian uint64 header length, JSON header, column data.
+# The header is padded so that every column starts on an ALIGNMENT byte boundary.
+MAGIC = b'RASPATS1'
+ALIGNMENT = 64
+
+
+def _align(position: int) -> int:
+    """
+    Returns the first position greater or equal to `position` aligned to ALIGNMENT bytes.
+    """
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def write_timeseries(filename: str,
+                     metadata: dict,
+                     pressures: typing.List[float],
+                     blocks: typing.List[typing.Dict[str, np.ndarray]]) -> None:
+    """
+    Write the time series of all pressures of a material to a single columnar binary file.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the binary file.
+    metadata : dict
+        JSON-serialisable metadata stored in the header (e.g. framework name, temperature).
+    pressures : list
+        External pressures [Pascal], one for each block.
+    blocks : list
+        One dictionary per pressure mapping the column names to 1D arrays of the same length.
+    """
+    # Lay out the columns after a placeholder header to know the size of the data section
+    layout = []
+    position = 0
+    for pressure, block in zip(pressures, blocks):
+        columns = {}
+        for name, array in block.items():
+            array = np.ascontiguousarray(array)
+            columns[name] = {'dtype': array.dtype.str, 'offset': position}
+            position = _align(position + array.nbytes)
+        layout.append({'pressure': float(pressure),
+                       'rows': len(next(iter(block.values()))),
+                       'columns': columns})
+
+    header = dict(metadata, pressures=[float(p) for p in pressures], blocks=layout)
+    header_bytes = json.dumps(header).encode('utf-8')
+
+    # Column offsets are stored relative to the start of the data section
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+    header_bytes = header_bytes.ljust(data_start - len(MAGIC) - 8, b' ')
+
+    with open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for block, block_layout in zip(blocks, layout):
+            for name, array in block.items():
+                f.seek(data_start + block_layout['columns'][name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + position)
+
+
+def read_header(filename: str) -> dict:
+    """
+    Read the JSON header of a binary time series file.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the binary file.
+
+    Returns
+    -------
+    header : dict
+        Metadata, pressures and column layout of every block. The key `data_start` holds the byte
+        position where the column data starts.
+    """
+    with open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{filename} is not a RASPA time series file.')
+        header_length, = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+
+    header['data_start'] = len(MAGIC) + 8 + header_length
+
+    return header
+
+
+def load_timeseries(filename: str,
+                    pressure: float,
+                    columns: typing.Optional[typing.List[str]] = None,
+                    header: typing.Optional[dict] = None) -> typing.Dict[str, np.ndarray]:
+    """
+    Memory-map the columns of a given pressure from a binary time series file.
+
+    The returned arrays are read-only views on the mapped file, no data is copied.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the binary file.
+    pressure : float
+        External pressure [Pascal]. Matched with the same `{:.0f}` rounding used in file names.
+    columns : list, optional
+        Names of the columns to load. All columns are loaded by default.
+    header : dict, optional
+        Header previously returned by `read_header`, to avoid reading it again.
+
+    Returns
+    -------
+    data : dict
+        Column names mapped to read-only 1D arrays, in the order they were written.
+    """
+    if header is None:
+        header = read_header(filename)
+
+    blocks = [block for block in header['blocks']
+              if f"{block['pressure']:.0f}" == f'{pressure:.0f}']
+    if not blocks:
+        raise KeyError(f'Pressure {pressure:.0f} Pa not found in {filename}.')
+    block = blocks[0]
+
+    mapped = np.memmap(filename, dtype=np.uint8, mode='r')
+
+    data = {}
+    for name, column in block['columns'].items():
+        if columns is not None and name not in columns:
+            continue
+        dtype = np.dtype(column['dtype'])
+        start = header['data_start'] + column['offset']
+        data[name] = mapped[start:start + block['rows'] * dtype.itemsize].view(dtype)
+
+    return data
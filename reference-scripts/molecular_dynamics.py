@@ -194,6 +194,18 @@ if arg.NumberOfMolecules is None:
 # Calculate grid types and number of grids
 arg.GridTypes, arg.NumberOfGrids = calculate_grid(arg.FlueGasComposition)
 
+# Continue from the molecule positions left by an interrupted run in RestartInitial, skipping the
+# initialization and the creation of molecules
+restart_initial_folder = os.path.join(arg.output_folder, 'RestartInitial', 'System_0')
+if os.path.isdir(restart_initial_folder) and os.listdir(restart_initial_folder):
+    print(f'Restarting from the molecule positions in {restart_initial_folder}')
+    arg.RestartFile = 'yes'
+    arg.NumberOfInitializationCycles = 0
+    arg.CreateNumberOfMolecules = 0
+else:
+    arg.RestartFile = 'no'
+    arg.CreateNumberOfMolecules = arg.NumberOfMolecules
+
 # Determine whether movies snapshots should be saved
 arg.Movies = 'yes' if arg.WriteMoviesEvery else 'no'
 
@@ -208,6 +220,7 @@ NumberOfInitializationCycles        {NumberOfInitializationCycles}          # in
 NumberOfEquilibrationCycles         {NumberOfEquilibrationCycles}           # int
 PrintEvery                          {PrintEvery}                            # int
 
+RestartFile                         {RestartFile}                           # yes / no
 ContinueAfterCrash                  yes                                     # yes / no
 WriteBinaryRestartFileEvery         {WriteBinaryRestartFileEvery}           # int
 Movies                              {Movies}                                # yes / no
@@ -260,7 +273,7 @@ for name, fraction in arg.FlueGasComposition.items():
                     RotationProbability           0.2
                     ReinsertionProbability        0.2
                     ExtraFrameworkMolecule        no
-                    CreateNumberOfMolecules       {int(arg.NumberOfMolecules * fraction)}
+                    CreateNumberOfMolecules       {int(arg.CreateNumberOfMolecules * fraction)}
 
         """)
     else:
@@ -272,7 +285,7 @@ for name, fraction in arg.FlueGasComposition.items():
                     RotationProbability           0.2
                     ReinsertionProbability        0.2
                     ExtraFrameworkMolecule        no
-                    CreateNumberOfMolecules       {int(arg.NumberOfMolecules * fraction)}
+                    CreateNumberOfMolecules       {int(arg.CreateNumberOfMolecules * fraction)}
 
         """)
 # Write string to file
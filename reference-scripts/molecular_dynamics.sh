@@ -4,7 +4,7 @@
 # © Copyright IBM Corp. 2022 All Rights Reserved
 
 # Parse input parameters
-while getopts u:o:n:c:t: flag
+while getopts u:o:n:c:t:s: flag
 do
     case "${flag}" in
         u) UseGrid=${OPTARG};;
@@ -12,16 +12,25 @@ do
         n) FrameworkName=${OPTARG};;
         c) FlueGasComposition=${OPTARG};;
         t) ExternalTemperature=${OPTARG};;
+        s) SharedFolder=${OPTARG};;
     esac
 done
 
 echo -e "\nDecompressing CIF files from ChargeAssignment component..."
 tar --no-overwrite-dir -xvzf charged_cif.tgz -C ${OutputFolder}
 
+# Extract the grids once into SharedFolder, shared by the other jobs, if it is set
+if [[ -n "${SharedFolder}" ]]; then
+    SharedFolderFlag="--SharedFolder ${SharedFolder}"
+fi
+
 # Only decompress grid files if UseGrid is true
 if [[ "${UseGrid}" -eq 1 ]]; then
-    echo -e "\nDecompressing MakeGrid output to ${RASPA_DIR}/share/raspa/grids/..."
-    tar --no-overwrite-dir -xvzf grids.tgz -C /
+    echo -e "\nExtracting the grids of the flue gas from the MakeGrid bundle..."
+    extract_grids.py ${SharedFolderFlag} \
+                     --FrameworkName ${FrameworkName} \
+                     --FlueGasComposition ${FlueGasComposition} \
+                     grids.tar
 
     # Define --UseTabularGrid environment variable
     UseTabularGrid="--UseTabularGrid"
@@ -4,12 +4,18 @@
 # © Copyright IBM Corp. 2020 All Rights Reserved
 
 import argparse
+import glob
 import json
 import os
+import shutil
+import sys
 from textwrap import dedent
 
 from modules.calculate_properties import calculate_grid, calculate_UnitCells
 from modules.copy_files import copy_def_files
+from modules.pressure_runs import INPUT_FILENAME, gather_outputs, prepare_pressure_folder
+from modules.simulation_status import (CRASH_RESTART_FILE, find_pressure_outputs,
+                                       simulation_finished, valid_crash_restart)
 
 # Required parameters
 parser = argparse.ArgumentParser(description='Run RASPA GCMC simulation.')
@@ -155,10 +161,70 @@ parser.add_argument('--WriteMoviesEvery',
                     required=False,
                     metavar='WRITE_MOVIES_EVERY',
                     help='Write snapshots of the simulation every \'WRITE_MOVIES_EVERY\' cycles.')
+parser.add_argument('--FanOut',
+                    required=False,
+                    action='store_true',
+                    help='Write one simulation folder per pressure, to be run at the same time by '
+                         'run_pressures.py, instead of a single input file for all pressures.')
+parser.add_argument('--Ladder',
+                    required=False,
+                    action='store_true',
+                    help='Write one simulation folder per pressure, to be run in increasing '
+                         'pressure order by run_pressures.py --Ladder. Every pressure starts from '
+                         'the final molecule positions of the previous one instead of an empty '
+                         'framework.')
 arg = parser.parse_args()
 
+# The pressure ladder runs the same per-pressure folders as the fan-out, one after the other
+per_pressure = arg.FanOut or arg.Ladder
+
+input_filename = os.path.join(arg.output_folder, INPUT_FILENAME)
+
+# Collect the outputs of the per-pressure simulations that finished before an interruption
+if per_pressure:
+    gathered = gather_outputs(arg.output_folder)
+    if gathered:
+        print(f'Gathered {gathered} outputs of per-pressure simulations')
+
+# Resume an interrupted simulation: skip the pressures whose output is complete
+pressures = arg.ExternalPressure.split(',')
+outputs = find_pressure_outputs(os.path.join(arg.output_folder, 'Output', 'System_0'),
+                                arg.FrameworkName,
+                                arg.ExternalTemperature,
+                                pressures)
+completed = [pressure for pressure in pressures
+             if outputs[pressure] is not None and simulation_finished(outputs[pressure])]
+remaining = [pressure for pressure in pressures if pressure not in completed]
+if completed:
+    print(f'Completed pressures: {completed}, remaining pressures: {remaining}')
+
+if not remaining:
+    # monte_carlo.sh skips the simulation when there is no input file
+    if os.path.exists(input_filename):
+        os.remove(input_filename)
+    print('All pressures are complete, nothing to simulate.')
+    sys.exit(0)
+
+# With a binary checkpoint RASPA ignores the rest of the input file and restores the pressure list,
+# the current pressure and the cycle from it. RASPA never removes it, so keep it only if it was
+# written for the interrupted pressure, after every complete output. Otherwise the input file
+# below starts the remaining pressures from scratch
+crash_restart_filename = os.path.join(arg.output_folder, CRASH_RESTART_FILE)
+if os.path.exists(crash_restart_filename) and not per_pressure:
+    interrupted_output = outputs[remaining[0]]
+    resume = (interrupted_output is not None
+              and valid_crash_restart(crash_restart_filename)
+              and all(os.path.getmtime(outputs[pressure])
+                      <= os.path.getmtime(crash_restart_filename) for pressure in completed))
+    if resume:
+        print(f'Resuming pressure {remaining[0]} from {CRASH_RESTART_FILE}')
+    else:
+        print(f'Removing {CRASH_RESTART_FILE}, it is incomplete or does not belong to '
+              f'pressure {remaining[0]}')
+        shutil.rmtree(os.path.dirname(crash_restart_filename), ignore_errors=True)
+
 # Manipulate ExternalPressure string
-arg.ExternalPressure = arg.ExternalPressure.replace(',', ' ')
+arg.ExternalPressure = ' '.join(remaining)
 
 # Copy files to output directory
 copy_def_files(arg.output_folder, arg.ForcefieldFolder)
@@ -181,16 +247,21 @@ arg.GridTypes, arg.NumberOfGrids = calculate_grid(arg.FlueGasComposition)
 # Determine whether movies snapshots should be saved
 arg.Movies = 'yes' if arg.WriteMoviesEvery else 'no'
 
+# Start from an empty framework. run_pressures.py --Ladder enables the restart file of every
+# pressure after the first
+arg.RestartFile = 'no'
+
 # Determine whether existing partial atomic charges are considered or not
 arg.UseChargesFromCIFFile = 'no' if arg.IgnoreChargesFromCIFFile else 'yes'
 
-# Create file header as string
+# Create file header as string, formatted with the pressures when written
 inputfile = dedent("""\
 SimulationType                      MonteCarlo
 NumberOfCycles                      {NumberOfCycles}                        # int
 NumberOfInitializationCycles        {NumberOfInitializationCycles}          # int
 PrintEvery                          {PrintEvery}                            # int
 
+RestartFile                         {RestartFile}                           # yes / no
 ContinueAfterCrash                  yes                                     # yes / no
 Movies                              {Movies}                                # yes / no
 WriteMoviesEvery                    {WriteMoviesEvery}                      # int
@@ -218,7 +289,7 @@ SpacingVDWGrid                      {SpacingVDWGrid}                        # fl
 SpacingCoulombGrid                  {SpacingCoulombGrid}                    # float
 UseTabularGrid                      {UseTabularGrid}                        # yes / no
 
-""").format(**arg.__dict__)
+""")
 
 # Create component list as string
 for name, fraction in arg.FlueGasComposition.items():
@@ -258,6 +329,28 @@ for name, fraction in arg.FlueGasComposition.items():
 
         """)
 
-# Write string to file
-with open(os.path.join(arg.output_folder, 'simulation-MonteCarlo.input'), 'w') as f:
-    f.write(inputfile)
+if per_pressure:
+    # One simulation folder per pressure, with links to the CIF and force field files. RASPA
+    # reads the grids from its own folder, shared by all simulations
+    shared_files = [cif_filename] + glob.glob(os.path.join(arg.output_folder, '*.def'))
+    for pressure in remaining:
+        folder = prepare_pressure_folder(arg.output_folder, pressure, shared_files)
+
+        # A complete binary checkpoint resumes the interrupted simulation of this pressure
+        crash_restart_filename = os.path.join(folder, CRASH_RESTART_FILE)
+        if os.path.exists(crash_restart_filename):
+            if valid_crash_restart(crash_restart_filename):
+                print(f'Resuming pressure {pressure} from {CRASH_RESTART_FILE}')
+            else:
+                shutil.rmtree(os.path.dirname(crash_restart_filename), ignore_errors=True)
+
+        with open(os.path.join(folder, INPUT_FILENAME), 'w') as f:
+            f.write(inputfile.format(**{**arg.__dict__, 'ExternalPressure': pressure}))
+
+    # monte_carlo.sh runs the per-pressure simulations only
+    if os.path.exists(input_filename):
+        os.remove(input_filename)
+else:
+    # Write string to file
+    with open(input_filename, 'w') as f:
+        f.write(inputfile.format(**arg.__dict__))
@@ -4,7 +4,7 @@
 # © Copyright IBM Corp. 2020 All Rights Reserved
 
 # Parse input parameters
-while getopts u:o:n:p:c:t: flag
+while getopts u:o:n:p:c:t:f:l:s: flag
 do
     case "${flag}" in
         u) UseGrid=${OPTARG};;
@@ -13,32 +13,71 @@ do
         p) ExternalPressure=${OPTARG};;
         c) FlueGasComposition=${OPTARG};;
         t) ExternalTemperature=${OPTARG};;
+        f) FanOut=${OPTARG};;
+        l) Ladder=${OPTARG};;
+        s) SharedFolder=${OPTARG};;
     esac
 done
 
 echo -e "\nDecompressing CIF files from ChargeAssignment component..."
 tar --no-overwrite-dir -xvzf charged_cif.tgz -C ${OutputFolder}
 
+# Extract the grids once into SharedFolder, shared by the other jobs, if it is set
+if [[ -n "${SharedFolder}" ]]; then
+    SharedFolderFlag="--SharedFolder ${SharedFolder}"
+fi
+
 # Only decompress grid files if UseGrid is true
 if [[ "${UseGrid}" -eq 1 ]]; then
-    echo -e "\nDecompressing MakeGrid output to ${RASPA_DIR}/share/raspa/grids/..."
-    tar --no-overwrite-dir -xvzf grids.tgz -C /
-    rm -vf grids.tgz
+    echo -e "\nExtracting the grids of the flue gas from the MakeGrid bundle..."
+    # grids.tar is kept for the restarts of the component
+    extract_grids.py ${SharedFolderFlag} \
+                     --FrameworkName ${FrameworkName} \
+                     --FlueGasComposition ${FlueGasComposition} \
+                     grids.tar
 
     # Define --UseTabularGrid environment variable
     UseTabularGrid="--UseTabularGrid"
 fi
 
+# Simulate the pressures at the same time, one folder per pressure, if FanOut is true
+if [[ "${FanOut}" -eq 1 ]]; then
+    FanOutFlag="--FanOut"
+fi
+
+# Simulate the pressures in increasing order, each from the previous one, if Ladder is true
+if [[ "${Ladder}" -eq 1 ]]; then
+    LadderFlag="--Ladder"
+fi
+
 echo -e "\nCreating MonteCarlo input file..."
-monte_carlo.py ${UseTabularGrid} \
+monte_carlo.py ${UseTabularGrid} ${FanOutFlag} ${LadderFlag} \
                --FrameworkName ${FrameworkName} \
                --ExternalPressure ${ExternalPressure} \
                --FlueGasComposition ${FlueGasComposition} \
                --ExternalTemperature ${ExternalTemperature} \
                ${OutputFolder}
 
-echo -e "\nRunning MonteCarlo simulation..."
-cd ${OutputFolder} && simulate -i simulation-MonteCarlo.input
+# The input file only holds the pressures without a complete output, and is not written when
+# every pressure of an interrupted run is already complete. The exit code of the simulations is
+# returned after the output is packed, so that a failed pressure runs the restart hook
+cd ${OutputFolder}
+ExitCode=0
+if [[ "${Ladder}" -eq 1 ]]; then
+    echo -e "\nRunning MonteCarlo simulations of every pressure as a pressure ladder..."
+    run_pressures.py --Ladder .
+    ExitCode=$?
+elif [[ "${FanOut}" -eq 1 ]]; then
+    echo -e "\nRunning MonteCarlo simulations of every pressure at the same time..."
+    run_pressures.py .
+    ExitCode=$?
+elif [[ -f simulation-MonteCarlo.input ]]; then
+    echo -e "\nRunning MonteCarlo simulation..."
+    simulate -i simulation-MonteCarlo.input
+    ExitCode=$?
+fi
 
 echo -e "\nCompressing RASPA output files..."
 tar -cvzf output_data.tgz -C Output/System_0/ .
+
+exit ${ExitCode}
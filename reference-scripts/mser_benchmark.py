@@ -0,0 +1,188 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+import warnings
+
+import numpy as np
+import pymser
+
+from modules import mser
+from modules.equilibration import average_observable, equilibrate_block, equilibrate_observable
+
+KEYS = ['t0', 'average', 'uncertainty', 'ac_time', 'uncorr_samples']
+BLOCK_KEYS = ['t0', 'average', 'uncertainty', 'ac_time', 'uncorrelated_samples']
+
+# Optional parameters
+parser = argparse.ArgumentParser(description='Check the vectorized MSER engine against pymser and '
+                                             'compare their speed.')
+parser.add_argument('--Series',
+                    type=int,
+                    default=50,
+                    action='store',
+                    required=False,
+                    metavar='SERIES',
+                    help='Number of random series of the equivalence check.')
+parser.add_argument('--Cycles',
+                    type=int,
+                    default=5000,
+                    action='store',
+                    required=False,
+                    metavar='CYCLES',
+                    help='Number of cycles of the benchmark series. pymser scales as the square '
+                         'of the cycles.')
+parser.add_argument('--Observables',
+                    type=int,
+                    default=9,
+                    action='store',
+                    required=False,
+                    metavar='OBSERVABLES',
+                    help='Number of observables of the benchmark, e.g. 9 for a 4-component flue '
+                         'gas: N_ads and the loadings of each component in two units.')
+parser.add_argument('--Seed',
+                    type=int,
+                    default=0,
+                    action='store',
+                    required=False,
+                    metavar='SEED',
+                    help='Seed of the random series.')
+arg = parser.parse_args()
+
+rng = np.random.default_rng(arg.Seed)
+
+
+def random_series(n):
+    """
+    AR(1) series with an exponential transient, as the loadings of a GCMC simulation.
+    """
+    phi = rng.uniform(0.0, 0.95)
+    noise = rng.normal(size=n)
+    series = np.empty(n)
+    series[0] = noise[0]
+    for i in range(1, n):
+        series[i] = phi * series[i - 1] + noise[i]
+
+    return series + rng.uniform(0, 50) * np.exp(-np.arange(n) / rng.uniform(1, n / 4))
+
+
+def run_pymser(column, LLM, batch_size, uncertainty):
+    # pymser prints the failed fits of the autocorrelation function
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return pymser.equilibrate(column,
+                                  LLM=LLM,
+                                  batch_size=batch_size,
+                                  ADF_test=False,
+                                  uncertainty=uncertainty,
+                                  print_results=False)
+
+
+def run_vectorized(data, LLM, batch_size, uncertainty):
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return mser.equilibrate(data, LLM=LLM, batch_size=batch_size, uncertainty=uncertainty)
+
+
+# Random series, loadings rounded to whole molecules, and the edge cases of pymser
+cases = []
+for i in range(arg.Series):
+    series = random_series(int(rng.integers(50, 500)))
+    cases.append((f'random {i}', series))
+    cases.append((f'rounded {i}', np.round(series)))
+cases += [('all zeros', np.zeros(200)),
+          ('constant', np.full(200, 3.0)),
+          ('alternating', np.arange(200.0) % 2),
+          ('short', random_series(100))]
+
+# Columns with non-finite values have NaN averages and uncertainties in both engines
+nan_series = random_series(200)
+nan_series[100] = np.nan
+
+mismatches = 0
+checks = 0
+skipped = 0
+for LLM in [False, True]:
+    for batch_size in [1, 5]:
+        for uncertainty in ['SD', 'SE', 'uSD', 'uSE']:
+            for name, series in cases:
+                # pymser fails on MSE curves without a minimum, e.g. with LLM on short series
+                try:
+                    expected = run_pymser(series, LLM, batch_size, uncertainty)
+                except (IndexError, ValueError):
+                    skipped += 1
+                    continue
+                results = run_vectorized(series[:, np.newaxis], LLM, batch_size, uncertainty)
+                checks += 1
+
+                different = [key for key in KEYS
+                             if not np.isclose(expected[key], results[key][0], rtol=1e-9)]
+                if different:
+                    mismatches += 1
+                    print(f'Mismatch on {name} (LLM={LLM}, batch size {batch_size}, '
+                          f'{uncertainty}): {different}')
+
+            expected = run_pymser(nan_series, LLM, batch_size, uncertainty)
+            results = run_vectorized(nan_series[:, np.newaxis], LLM, batch_size, uncertainty)
+            checks += 1
+            if not all(np.isnan(expected[key]) and np.isnan(results[key][0])
+                       for key in ['average', 'uncertainty']):
+                mismatches += 1
+                print(f'Mismatch on NaN (LLM={LLM}, batch size {batch_size}, {uncertainty})')
+
+# Global rule: every observable of a pressure is averaged from the start found on N_ads,
+# including the all-zero loadings of absent components and columns with non-finite values
+for i in range(arg.Series):
+    n = int(rng.integers(100, 500))
+    N_ads = random_series(n)
+    nan_column = random_series(n)
+    nan_column[n // 2] = np.nan
+    data = np.column_stack([N_ads, random_series(n), np.round(N_ads), np.zeros(n),
+                            np.full(n, 3.0), nan_column])
+
+    for LLM in [False, True]:
+        for uncertainty in ['SD', 'SE', 'uSD', 'uSE']:
+            with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                try:
+                    t0 = equilibrate_observable(data[:, 0], LLM, 5, uncertainty, False)['t0']
+                except (IndexError, ValueError):
+                    skipped += 1
+                    continue
+                expected = [average_observable(column, t0, uncertainty) for column in data.T]
+                results = equilibrate_block(data, 0, LLM, 5, uncertainty, False)
+            checks += 1
+
+            different = [(column, key) for column in range(data.shape[1]) for key in BLOCK_KEYS
+                         if not np.isclose(expected[column][key], results[column][key],
+                                           rtol=1e-9, equal_nan=True)]
+            if different:
+                mismatches += 1
+                print(f'Mismatch on global block {i} (LLM={LLM}, {uncertainty}): {different}')
+
+print(f'Equivalence: {checks - mismatches} of {checks} checks match pymser, {skipped} series '
+      f'skipped where pymser fails')
+
+# Time both engines on all observables of a pressure
+data = np.column_stack([random_series(arg.Cycles) for _ in range(arg.Observables)])
+
+start = time.perf_counter()
+for column in data.T:
+    run_pymser(column, False, 1, 'uSD')
+pymser_time = time.perf_counter() - start
+
+start = time.perf_counter()
+run_vectorized(data, False, 1, 'uSD')
+vectorized_time = time.perf_counter() - start
+
+print(f'Benchmark with {arg.Cycles} cycles x {arg.Observables} observables: '
+      f'pymser {pymser_time:.2f} s, vectorized {vectorized_time:.2f} s '
+      f'({pymser_time / vectorized_time:.1f}x)')
+
+if mismatches:
+    sys.exit(1)
@@ -9,9 +9,10 @@ import json
 import os
 
 import numpy as np
-from modules.calculate_properties import (calculate_directional_self_diffusivity,
-                                          calculate_NumberOfMolecules, calculate_UnitCells)
+from modules.calculate_properties import (CellGeometry, calculate_NumberOfMolecules,
+                                          calculate_self_diffusivity, calculate_UnitCells)
 from modules.InChIKey import InChIKey
+from modules.msd import read_msd
 from RASPA2 import parse
 
 # Required parameters
@@ -68,11 +69,14 @@ raspa_out_filename = glob.glob('output_{0}_*_{1:.6f}_0.data'.format(arg.Framewor
 # Automatically calculate the number of molecules in the supercell
 cif_filename = os.path.join(arg.output_folder, arg.FrameworkName + '.cif')
 
+# Read the unit cell geometry once for all calculations
+cell_geometry = CellGeometry.from_cif(cif_filename)
+
 # Calculate number of unit cell repetitions in the supercell
-arg.UnitCells = calculate_UnitCells(cif_filename, arg.LargestCutoff)
+arg.UnitCells = calculate_UnitCells(cell_geometry, arg.LargestCutoff)
 
 if arg.NumberOfMolecules is None:
-    arg.NumberOfMolecules = calculate_NumberOfMolecules(cif_filename,
+    arg.NumberOfMolecules = calculate_NumberOfMolecules(cell_geometry,
                                                         arg.LargestCutoff,
                                                         arg.UnitCells)
 
@@ -128,15 +132,11 @@ for i, gas in enumerate(arg.FlueGasComposition):
     msd_filename = os.path.join(arg.output_folder, f'msd_self_{gas}_{i}.dat')
 
     # Read the diffusion files
-    time, msd_t, msd_x, msd_y, msd_z, _, _ = np.genfromtxt(msd_filename,
-                                                           skip_header=6,
-                                                           delimiter=' ').T
+    time, msd_t, msd_x, msd_y, msd_z = read_msd(msd_filename)
 
     # Calculate the self-diffusivity
-    Dx, Dx_SD = calculate_directional_self_diffusivity(time, msd_x, arg.FrameworkName + '.cif')
-    Dy, Dy_SD = calculate_directional_self_diffusivity(time, msd_y, arg.FrameworkName + '.cif')
-    Dz, Dz_SD = calculate_directional_self_diffusivity(time, msd_z, arg.FrameworkName + '.cif')
-    Ds, Ds_SD = calculate_directional_self_diffusivity(time, msd_t, arg.FrameworkName + '.cif')
+    (Dx, Dy, Dz, Ds), (Dx_SD, Dy_SD, Dz_SD, Ds_SD) = calculate_self_diffusivity(
+        time, np.column_stack([msd_x, msd_y, msd_z, msd_t]), cell_geometry)
 
     # Divide Ds and Ds_SD by 3 to account to the fact that the simulation is in 3D
     if not isinstance(Ds, type(None)):
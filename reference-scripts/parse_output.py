@@ -6,10 +6,11 @@
 import argparse
 import glob
 import json
-import math
 import os
 
-from RASPA2 import parse
+from modules.parallel import starmap
+from modules.raspa_output import parse_output_file
+from modules.timeseries import TIMESERIES_FILENAME, write_timeseries
 
 # Required parameters
 parser = argparse.ArgumentParser(description='Parse output of RASPA simulation.')
@@ -55,68 +56,58 @@ parser.add_argument('--ExternalTemperature',
                     metavar='EXTERNAL_TEMPERATURE',
                     help='External temperature [Kelvin].')
 parser.add_argument('--ExternalPressure',
+                    type=str,
+                    action='store',
+                    required=False,
+                    default="101325",
+                    metavar='EXTERNAL_PRESSURE(S)',
+                    help='External pressure [Pascal]. Accepts a comma-separated list of values.')
+parser.add_argument('--Workers',
                     type=int,
+                    default=None,
                     action='store',
                     required=False,
-                    default=101325,
-                    metavar='EXTERNAL_PRESSURE',
-                    help='External pressure [Pascal].')
+                    metavar='WORKERS',
+                    help='Number of parallel processes. Defaults to the CPUs available.')
+parser.add_argument('--WriteCSV',
+                    default=False,
+                    required=False,
+                    action='store_true',
+                    help='Also export the time series of each pressure as raspa_*.csv files.')
 arg = parser.parse_args()
 
-# Read file into string
-input_file_name = glob.glob('{0}/output_{1}_*_{2:.6f}_{3:g}.data'.format(arg.output_folder,
-                                                                         arg.FrameworkName,
-                                                                         arg.ExternalTemperature,
-                                                                         arg.ExternalPressure))[0]
-with open(os.path.join(arg.output_folder, input_file_name), 'r') as f:
-    raspa_string = f.read()
-
-# Parse string into dictionary and list
-raspa_dict = parse(raspa_string)
-raspa_list = raspa_string.split('\n')
-
-# Extract number of unit cells in the supercell
-unit_cells = [int(line.split(':')[1]) for line in raspa_list if 'Number of unitcells' in line]
-
-# Calculate mol/kg conversion factor for the supercell
-to_mol_kg = raspa_dict['MoleculeDefinitions']['Conversion factor molecules/unit cell -> mol/kg'][0]
-to_mol_kg /= math.prod(unit_cells)
+# Manipulate ExternalPressure string
+externalPressures = list(map(float, arg.ExternalPressure.split(',')))
 
-# Build header string
-header = 'cycle,\tstep,\tN_ads'
-for component in range(len(arg.FlueGasComposition)):
-    cycle_key = f'Current cycle: 0 out of {arg.NumberOfCycles}'
-    component_key = f'Component {component}'
-    molecule_name = raspa_dict[cycle_key][component_key][0]
-    header += (
-        f',\t{molecule_name}_[molecules/uc]'
-        f',\t{molecule_name}_[mol/kg]'
-    )
-csv_output = header + '\n'
+# Find the output files of all pressures in a single listing of the output folder
+output_files = glob.glob('{0}/output_{1}_*_{2:.6f}_*.data'.format(arg.output_folder,
+                                                                  arg.FrameworkName,
+                                                                  arg.ExternalTemperature))
 
-# For each cycle
-steps = 0
-for cycle in range(0, arg.NumberOfCycles, arg.PrintEvery):
-    cycle_key = f'Current cycle: {cycle} out of {arg.NumberOfCycles}'
-    number_of_adsorbates = int(raspa_dict[cycle_key]['Number of Adsorbates'][0])
-    steps += max(20, number_of_adsorbates)
-    line = (
-        f'{cycle},\t'
-        f'{steps},\t'
-        f'{number_of_adsorbates}'
-    )
+tasks = []
+for pressure in externalPressures:
+    input_file_name = [file for file in output_files
+                       if file.endswith(f'_{arg.ExternalTemperature:.6f}_{pressure:g}.data')][0]
+    if arg.WriteCSV:
+        csv_filename = os.path.join(arg.output_folder,
+                                    f'raspa_{arg.ExternalTemperature:.6f}_{pressure:.0f}.csv')
+    else:
+        csv_filename = None
+    tasks.append((input_file_name,
+                  len(arg.FlueGasComposition),
+                  arg.NumberOfCycles,
+                  arg.PrintEvery,
+                  csv_filename))
 
-    # For each component
-    for component in range(len(arg.FlueGasComposition)):
-        component_key = f'Component {component}'
-        number_of_molecules = int(raspa_dict[cycle_key][component_key][2].split('/')[0])
-        line += (
-            f',\t{number_of_molecules:7}'
-            f',\t{number_of_molecules * to_mol_kg:.7f}'
-        )
-    csv_output += line + '\n'
+# Parse all pressures with a process pool sized to the available CPUs
+blocks = starmap(parse_output_file, tasks, arg.Workers)
 
-# Write string into file
-output_file_name = f'raspa_{arg.ExternalTemperature:.6f}_{arg.ExternalPressure}.csv'
-with open(os.path.join(arg.output_folder, output_file_name), 'w') as f:
-    f.write(csv_output)
+# Write the time series of all pressures into a single binary file
+metadata = {'framework': arg.FrameworkName,
+            'temperature': arg.ExternalTemperature,
+            'components': list(arg.FlueGasComposition),
+            'columns': list(blocks[0])}
+write_timeseries(os.path.join(arg.output_folder, TIMESERIES_FILENAME),
+                 metadata,
+                 externalPressures,
+                 blocks)
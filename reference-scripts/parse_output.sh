@@ -4,7 +4,7 @@
 # © Copyright IBM Corp. 2021 All Rights Reserved
 
 # Parse input parameters
-while getopts o:n:p:c:t: flag
+while getopts o:n:p:c:t:x flag
 do
     case "${flag}" in
         o) OutputFolder=${OPTARG};;
@@ -12,20 +12,23 @@ do
         p) ExternalPressures=${OPTARG};;
         c) FlueGasComposition=${OPTARG};;
         t) ExternalTemperature=${OPTARG};;
+        x) WriteCSV="--WriteCSV";;
     esac
 done
 
 echo -e "\nDecompressing RASPA output files..."
 tar --no-overwrite-dir -xvzf output_data.tgz -C ${OutputFolder}
 
-echo -e "\nParse RASPA data files into CSV files..."
-for ExternalPressure in $(echo $ExternalPressures | sed 's/,/ /g'); do
-    parse_output.py --FrameworkName ${FrameworkName} \
-                    --ExternalPressure ${ExternalPressure} \
-                    --FlueGasComposition ${FlueGasComposition} \
-                    --ExternalTemperature ${ExternalTemperature} \
-                    ${OutputFolder};
-done
+echo -e "\nParse RASPA data files into time series file..."
+parse_output.py ${WriteCSV} \
+                --FrameworkName ${FrameworkName} \
+                --ExternalPressure ${ExternalPressures} \
+                --FlueGasComposition ${FlueGasComposition} \
+                --ExternalTemperature ${ExternalTemperature} \
+                ${OutputFolder}
 
-echo -e "\nCompressing RASPA CSV files..."
-tar -cvzf raspa_csv.tgz -C ${OutputFolder} raspa_*.csv
+# Only compress CSV files if they were requested
+if [[ -n "${WriteCSV}" ]]; then
+    echo -e "\nCompressing RASPA CSV files..."
+    tar -cvzf raspa_csv.tgz -C ${OutputFolder} raspa_*.csv
+fi
@@ -0,0 +1,69 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+import json
+
+from modules.aggregate import COMPRESSION_MODES, export_aggregate, read_records
+
+# Required parameters
+parser = argparse.ArgumentParser(description='Read or re-export the records of some materials '
+                                             'of an aggregate isotherm or diffusion tarball.')
+parser.add_argument('archive',
+                    type=str,
+                    action='store',
+                    metavar='ARCHIVE',
+                    help='Aggregate tarball, e.g. isotherms.tgz or diffusion.tgz.')
+parser.add_argument('--FrameworkName',
+                    type=str,
+                    required=True,
+                    action='store',
+                    nargs='+',
+                    metavar='FRAMEWORK_NAME',
+                    help='Names of the materials.')
+
+# Optional parameters
+parser.add_argument('--Property',
+                    type=str,
+                    default='isotherm',
+                    action='store',
+                    required=False,
+                    metavar='PROPERTY',
+                    choices=['isotherm', 'diffusion'],
+                    help='Property stored in the tarball: isotherm or diffusion.')
+parser.add_argument('--Export',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='EXPORT',
+                    help='Write the records to a new tarball instead of printing them.')
+parser.add_argument('--Compression',
+                    type=str,
+                    default='bgz',
+                    action='store',
+                    required=False,
+                    metavar='COMPRESSION',
+                    choices=list(COMPRESSION_MODES),
+                    help='Compression codec of EXPORT: none, gz, bz2, xz or bgz.')
+arg = parser.parse_args()
+
+member_suffix = f'-{arg.Property}.json'
+
+if arg.Export is not None:
+    n_materials = export_aggregate(arg.archive,
+                                   arg.FrameworkName,
+                                   member_suffix,
+                                   arg.Export,
+                                   compression=arg.Compression)
+    print(f'Exported {n_materials} of {len(arg.FrameworkName)} materials to {arg.Export}')
+
+else:
+    records = read_records(arg.archive, arg.FrameworkName, member_suffix)
+    for framework_name in arg.FrameworkName:
+        if framework_name in records:
+            print(json.dumps({'material': framework_name, 'property': records[framework_name]}))
+        else:
+            print(f'Warning! {framework_name} not found in {arg.archive}.')
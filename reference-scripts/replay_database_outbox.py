@@ -0,0 +1,77 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+import sys
+
+import requests
+
+from modules.objectid_cache import OBJECTID_CACHE_FILENAME, ObjectIDCache, default_cache_filename
+from modules.outbox import replay
+
+# Required parameters
+parser = argparse.ArgumentParser(description='Send the pending records of database outboxes.')
+parser.add_argument('outbox_files',
+                    type=str,
+                    nargs='+',
+                    action='store',
+                    metavar='OUTBOX_FILES',
+                    help='Outbox files written by the write-to-database stages.')
+
+# Optional parameters
+parser.add_argument('--MaxRetries',
+                    type=int,
+                    default=5,
+                    action='store',
+                    required=False,
+                    metavar='MAX_RETRIES',
+                    help='Number of retries of each call to the database-api.')
+parser.add_argument('--Backoff',
+                    type=float,
+                    default=1.0,
+                    action='store',
+                    required=False,
+                    metavar='BACKOFF',
+                    help='Delay before the first retry in seconds, doubled on each retry.')
+parser.add_argument('--MaxBackoff',
+                    type=float,
+                    default=60.0,
+                    action='store',
+                    required=False,
+                    metavar='MAX_BACKOFF',
+                    help='Maximum delay between retries in seconds.')
+parser.add_argument('--ObjectIDCache',
+                    type=str,
+                    default=default_cache_filename(),
+                    action='store',
+                    required=False,
+                    metavar='OBJECTID_CACHE',
+                    help='Cache of the material ObjectIDs shared by the write stages. Defaults '
+                         f'to $DATABASE_OBJECTID_CACHE, or {OBJECTID_CACHE_FILENAME} in '
+                         '$INSTANCE_DIR or the current directory.')
+arg = parser.parse_args()
+
+# Share a single HTTP session among all outboxes
+session = requests.Session()
+cache = ObjectIDCache(arg.ObjectIDCache)
+
+total = {'sent': 0, 'rejected': 0, 'pending': 0}
+for outbox_filename in arg.outbox_files:
+    summary = replay(outbox_filename,
+                     session=session,
+                     max_retries=arg.MaxRetries,
+                     backoff=arg.Backoff,
+                     max_backoff=arg.MaxBackoff,
+                     cache=cache)
+    print(f'{outbox_filename}: {summary}')
+
+    for status in total:
+        total[status] += summary[status]
+
+print(f'Total: {total}')
+
+# Exit with an error while records are left pending, so that the replay can be scheduled again
+if total['pending'] > 0:
+    sys.exit(1)
@@ -0,0 +1,74 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+import glob
+import os
+import sys
+
+from modules.parallel import available_cpus
+from modules.pressure_runs import (INPUT_FILENAME, PRESSURE_RUNS_FOLDER, gather_outputs,
+                                   run_ladder, run_simulations)
+
+# Required parameters
+parser = argparse.ArgumentParser(description='Run the per-pressure RASPA GCMC simulations written '
+                                             'by monte_carlo.py --FanOut at the same time, or '
+                                             'by monte_carlo.py --Ladder one after the other.')
+parser.add_argument('output_folder',
+                    type=str,
+                    action='store',
+                    metavar='OUTPUT_FOLDER',
+                    help='Directory for storing output files.')
+
+# Optional parameters
+parser.add_argument('--Workers',
+                    type=int,
+                    default=available_cpus(),
+                    action='store',
+                    required=False,
+                    metavar='WORKERS',
+                    help='Number of simulations run at the same time. Defaults to the number of '
+                         'CPUs available to the container.')
+parser.add_argument('--Simulate',
+                    type=str,
+                    default='simulate',
+                    action='store',
+                    required=False,
+                    metavar='SIMULATE',
+                    help='RASPA executable.')
+parser.add_argument('--Ladder',
+                    required=False,
+                    action='store_true',
+                    help='Run the pressures in increasing order, starting each one from the final '
+                         'molecule positions of the previous one.')
+arg = parser.parse_args()
+
+folders = sorted(os.path.dirname(input_file)
+                 for input_file in glob.glob(os.path.join(arg.output_folder,
+                                                          PRESSURE_RUNS_FOLDER,
+                                                          '*',
+                                                          INPUT_FILENAME)))
+
+if arg.Ladder:
+    print(f'Running {len(folders)} simulations as a pressure ladder')
+    exit_codes = run_ladder(arg.output_folder,
+                            [os.path.basename(folder) for folder in folders],
+                            arg.Simulate)
+else:
+    print(f'Running {len(folders)} simulations with {min(arg.Workers, len(folders))} workers')
+    exit_codes = run_simulations(folders, arg.Workers, arg.Simulate)
+
+for folder, exit_code in zip(folders, exit_codes):
+    if exit_code != 0:
+        print(f'Error! The simulation in {folder} exited with code {exit_code}.')
+
+# Move the outputs to the layout of a simulation of all pressures, for ParseOutput. The pressure
+# ladder gathers them after every simulation
+gathered = gather_outputs(arg.output_folder)
+print(f'Gathered {gathered} outputs into Output/System_0')
+
+# The folders of unfinished simulations are kept to be resumed
+if glob.glob(os.path.join(arg.output_folder, PRESSURE_RUNS_FOLDER, '*', INPUT_FILENAME)):
+    sys.exit(1)
@@ -0,0 +1,128 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+import json
+import time
+
+from modules.bulk_upload import read_aggregate, upload_records
+from modules.objectid_cache import (OBJECTID_CACHE_FILENAME, ObjectIDCache, default_cache_filename,
+                                    read_cif_files)
+
+# Required parameters
+parser = argparse.ArgumentParser(description='Upload aggregate isotherm or diffusion tarballs '
+                                             'to the database.')
+parser.add_argument('archives',
+                    type=str,
+                    nargs='+',
+                    action='store',
+                    metavar='ARCHIVES',
+                    help='Aggregate tarballs or consolidated files, e.g. isotherms.tgz or '
+                         'diffusion.jsonl.')
+
+# Optional parameters
+parser.add_argument('--CifFiles',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='CIF_FILES',
+                    help='cif_files.dat with Source/Name lines, used to find the source of '
+                         'each material.')
+parser.add_argument('--FrameworkSource',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='FRAMEWORK_SOURCE',
+                    help='Source of the materials not listed in CIF_FILES.')
+parser.add_argument('--Concurrency',
+                    type=int,
+                    default=8,
+                    action='store',
+                    required=False,
+                    metavar='CONCURRENCY',
+                    help='Maximum number of requests in flight.')
+parser.add_argument('--RateLimit',
+                    type=float,
+                    default=0.0,
+                    action='store',
+                    required=False,
+                    metavar='RATE_LIMIT',
+                    help='Maximum number of requests per second. No limit by default.')
+parser.add_argument('--MaxRetries',
+                    type=int,
+                    default=5,
+                    action='store',
+                    required=False,
+                    metavar='MAX_RETRIES',
+                    help='Number of retries of each call to the database-api.')
+parser.add_argument('--Report',
+                    type=str,
+                    default='upload_status.jsonl',
+                    action='store',
+                    required=False,
+                    metavar='REPORT',
+                    help='JSON lines file with the status of every record.')
+parser.add_argument('--ObjectIDCache',
+                    type=str,
+                    default=default_cache_filename(),
+                    action='store',
+                    required=False,
+                    metavar='OBJECTID_CACHE',
+                    help='Cache of the material ObjectIDs shared by the write stages. Defaults '
+                         f'to $DATABASE_OBJECTID_CACHE, or {OBJECTID_CACHE_FILENAME} in '
+                         '$INSTANCE_DIR or the current directory. Warmed from CIF_FILES with a '
+                         'single listing call.')
+arg = parser.parse_args()
+
+# Map the material names to their sources
+cache = ObjectIDCache(arg.ObjectIDCache)
+sources = {}
+if arg.CifFiles is not None:
+    materials = read_cif_files(arg.CifFiles)
+    sources = dict(materials)
+
+    # Resolve the ObjectIDs of all materials at once
+    missing = cache.warm(materials)
+    print(f'ObjectID cache: {len(cache)} materials, {missing} not found in the database')
+
+records = []
+for archive in arg.archives:
+    for name, thermoProp in read_aggregate(archive):
+        source = sources.get(name, arg.FrameworkSource)
+        if source is None:
+            print(f'Error! Source of {name} not found. Use --CifFiles or --FrameworkSource.')
+            exit(1)
+        records.append((name, source, thermoProp))
+
+print(f'Uploading {len(records)} records with concurrency {arg.Concurrency}')
+
+start = time.monotonic()
+with open(arg.Report, 'w') as report:
+
+    def write_status(status: dict) -> None:
+        report.write(json.dumps(status) + '\n')
+        print(f"{status['name']} ({status['source']}): {status['status']}"
+              f" {status.get('status_code', '')} {status['elapsed']:.3f} s")
+
+    statuses = upload_records(records,
+                              concurrency=arg.Concurrency,
+                              rate=arg.RateLimit,
+                              max_retries=arg.MaxRetries,
+                              callback=write_status,
+                              cache=cache)
+elapsed = time.monotonic() - start
+
+# Summary of the upload
+counts = {}
+for status in statuses:
+    counts[status['status']] = counts.get(status['status'], 0) + 1
+print(f'Statuses: {counts}')
+print(f'Uploaded {len(statuses)} records in {elapsed:.2f} s '
+      f'({len(statuses) / max(elapsed, 1e-9):.1f} records/s)')
+
+if counts.get('failed', 0) > 0:
+    exit(1)
@@ -0,0 +1,37 @@
+#!/usr/bin/env -S python -B
+
+# SPDX-License-Identifier: Apache2.0
+# © Copyright IBM Corp. 2024 All Rights Reserved
+
+import argparse
+
+from modules.objectid_cache import (OBJECTID_CACHE_FILENAME, ObjectIDCache, default_cache_filename,
+                                    read_cif_files)
+
+# Required parameters
+parser = argparse.ArgumentParser(description='Cache the database ObjectIDs of the materials of a '
+                                             'cif_files.dat with a single listing call.')
+parser.add_argument('cif_files',
+                    type=str,
+                    action='store',
+                    metavar='CIF_FILES',
+                    help='cif_files.dat with Source/Name lines.')
+
+# Optional parameters
+parser.add_argument('--ObjectIDCache',
+                    type=str,
+                    default=default_cache_filename(),
+                    action='store',
+                    required=False,
+                    metavar='OBJECTID_CACHE',
+                    help='Cache of the material ObjectIDs shared by the write stages. Defaults '
+                         f'to $DATABASE_OBJECTID_CACHE, or {OBJECTID_CACHE_FILENAME} in '
+                         '$INSTANCE_DIR or the current directory.')
+arg = parser.parse_args()
+
+materials = read_cif_files(arg.cif_files)
+cache = ObjectIDCache(arg.ObjectIDCache)
+missing = cache.warm(materials)
+
+print(f'{arg.ObjectIDCache}: {len(cache)} materials cached, '
+      f'{missing} of {len(materials)} not found in the database')
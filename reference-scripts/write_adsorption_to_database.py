@@ -7,19 +7,18 @@ import argparse
 import io
 import json
 import os
+import sys
 
 import pandas as pd
 
 from modules.copy_files import save_to_disk
-from modules.database_api_calls import get_objectID, post_tDependentProp
+from modules.database_api_calls import database_api_configured, tDependentProp
+from modules.objectid_cache import OBJECTID_CACHE_FILENAME, ObjectIDCache, default_cache_filename
+from modules.outbox import OUTBOX_FILENAME, enqueue, replay
 
 from modules.InChIKey import InChIKey
 
-if (os.environ.get("INGRESS_SUBDOMAIN") is None or os.environ.get("INGRESS_SUBDOMAIN") == ""
-        or os.environ.get("INGRESS_SUBDOMAIN") == "${INGRESS}"):
-    ingress_subdomain = False
-else:
-    ingress_subdomain = True
+ingress_subdomain = database_api_configured()
 
 # Required parameters
 parser = argparse.ArgumentParser(description='Write adsorption figures-of-merit to database.')
@@ -79,13 +78,30 @@ parser.add_argument('--FlueGasComposition',
                     default={'CO2': 1.0},
                     metavar='FLUE_GAS_COMPOSITION',
                     help='Dictionary containing flue gas component names and fractions.')
+parser.add_argument('--Outbox',
+                    type=str,
+                    default=os.environ.get('DATABASE_OUTBOX'),
+                    action='store',
+                    required=False,
+                    metavar='OUTBOX',
+                    help='Outbox file where the records are spooled before being sent. '
+                         f'Defaults to $DATABASE_OUTBOX or OUTPUT_FOLDER/{OUTBOX_FILENAME}.')
+parser.add_argument('--ObjectIDCache',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='OBJECTID_CACHE',
+                    help='Cache of the material ObjectIDs shared by the write stages. Defaults '
+                         f'to $DATABASE_OBJECTID_CACHE, or {OBJECTID_CACHE_FILENAME} in '
+                         '$INSTANCE_DIR or OUTPUT_FOLDER.')
 arg = parser.parse_args()
 
-if ingress_subdomain:
-    # Get MongoDB objectIDs for the material
-    objectID = get_objectID(arg.FrameworkName, arg.FrameworkSource)
+if arg.Outbox is None:
+    arg.Outbox = os.path.join(arg.output_folder, OUTBOX_FILENAME)
 
-    print(f'Name: {arg.FrameworkName}, Source: {arg.FrameworkSource}, ObjectID: {objectID}')
+if arg.ObjectIDCache is None:
+    arg.ObjectIDCache = default_cache_filename(arg.output_folder)
 
 # Manipulate ExternalPressure string
 externalPressures = list(map(float, arg.ExternalPressure.split(',')))
@@ -129,16 +145,18 @@ for pressure in externalPressures:
 
 print(f'data: {data}\n')
 
-if ingress_subdomain:
-    # Issue POST call
-    response = post_tDependentProp(objectID,
-                                   name,
-                                   provenance,
-                                   arg.ExternalTemperature,
-                                   composition,
-                                   data)
+# Spool the record to the outbox
+key = enqueue(arg.Outbox,
+              't-dependent',
+              arg.FrameworkName,
+              arg.FrameworkSource,
+              tDependentProp(name, provenance, arg.ExternalTemperature, composition, data))
+print(f'Name: {arg.FrameworkName}, Source: {arg.FrameworkSource}, Outbox key: {key}')
 
-    print(f'response: {response.json()}')
+if ingress_subdomain:
+    # Send the pending records of the outbox
+    summary = replay(arg.Outbox, cache=ObjectIDCache(arg.ObjectIDCache))
+    print(f'Outbox: {summary}')
 
 save_to_disk(name,
              'isotherm.json',
@@ -147,3 +165,9 @@ save_to_disk(name,
              arg.ExternalTemperature,
              data,
              composition)
+
+# Fail the stage while records are not in the database, as the direct POST calls did. They stay in
+# the outbox, to be sent by the next run of the stage or by replay_database_outbox.py
+if ingress_subdomain and (summary['pending'] or summary['rejected']):
+    sys.exit(f"Error! {summary['pending']} records pending and {summary['rejected']} rejected in "
+             f'{arg.Outbox}.')
@@ -6,8 +6,13 @@
 import argparse
 import os
 import json
+import sys
 
-from modules.database_api_calls import (get_objectID, post_tDependentProp)
+from modules.database_api_calls import database_api_configured, tDependentProp
+from modules.objectid_cache import OBJECTID_CACHE_FILENAME, ObjectIDCache, default_cache_filename
+from modules.outbox import OUTBOX_FILENAME, enqueue, replay
+
+ingress_subdomain = database_api_configured()
 
 # Required parameters
 parser = argparse.ArgumentParser(description='Write diffusion figures-of-merit to database.')
@@ -44,22 +49,54 @@ parser.add_argument('--FrameworkSource',
                              'simperler_2005',
                              'database_zeolite_structures'],
                     help='Source of the CIF file describing the nanoporous material structure.')
+parser.add_argument('--Outbox',
+                    type=str,
+                    default=os.environ.get('DATABASE_OUTBOX'),
+                    action='store',
+                    required=False,
+                    metavar='OUTBOX',
+                    help='Outbox file where the records are spooled before being sent. '
+                         f'Defaults to $DATABASE_OUTBOX or OUTPUT_FOLDER/{OUTBOX_FILENAME}.')
+parser.add_argument('--ObjectIDCache',
+                    type=str,
+                    default=None,
+                    action='store',
+                    required=False,
+                    metavar='OBJECTID_CACHE',
+                    help='Cache of the material ObjectIDs shared by the write stages. Defaults '
+                         f'to $DATABASE_OBJECTID_CACHE, or {OBJECTID_CACHE_FILENAME} in '
+                         '$INSTANCE_DIR or OUTPUT_FOLDER.')
 arg = parser.parse_args()
 
-# Get MongoDB objectIDs for the material
-objectID = get_objectID(arg.FrameworkName, arg.FrameworkSource)
-print(f'Name: {arg.FrameworkName}, Source: {arg.FrameworkSource}, ObjectID: {objectID}')
+if arg.Outbox is None:
+    arg.Outbox = os.path.join(arg.output_folder, OUTBOX_FILENAME)
+
+if arg.ObjectIDCache is None:
+    arg.ObjectIDCache = default_cache_filename(arg.output_folder)
 
 # Read the results from the json file
 with open(os.path.join(arg.output_folder, 'diffusion.json'), 'r') as f:
     results = json.load(f)
 
-# Issue POST call
-response = post_tDependentProp(objectID,
-                               results['name'],
-                               results['provenance'],
-                               results['temperature'],
-                               results['composition'],
-                               results['data'])
+# Spool the record to the outbox
+key = enqueue(arg.Outbox,
+              't-dependent',
+              arg.FrameworkName,
+              arg.FrameworkSource,
+              tDependentProp(results['name'],
+                             results['provenance'],
+                             results['temperature'],
+                             results['composition'],
+                             results['data']))
+print(f'Name: {arg.FrameworkName}, Source: {arg.FrameworkSource}, Outbox key: {key}')
+
+if ingress_subdomain:
+    # Send the pending records of the outbox
+    summary = replay(arg.Outbox, cache=ObjectIDCache(arg.ObjectIDCache))
+    print(f'Outbox: {summary}')
 
-print(f'response: {response.json()}')
+# Fail the stage while records are not in the database, as the direct POST calls did. They stay in
+# the outbox, to be sent by the next run of the stage or by replay_database_outbox.py
+if ingress_subdomain and (summary['pending'] or summary['rejected']):
+    sys.exit(f"Error! {summary['pending']} records pending and {summary['rejected']} rejected in "
+             f'{arg.Outbox}.')